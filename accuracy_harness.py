@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from typing import Dict, Any, List, Optional
+
+from ocr_engine import OCREngineError
+from text_metrics import character_errors, normalize_text, word_errors
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = ['clean', 'noise', 'rotate', 'blur', 'low_contrast', 'noise_rotate']
+
+DEFAULT_CONFIGS = [
+    {"name": "psm1", "engine_options": {"config": "--psm 1"}},
+    {"name": "psm3", "engine_options": {"config": "--psm 3"}},
+    {"name": "psm4", "engine_options": {"config": "--psm 4"}},
+    {"name": "psm6", "engine_options": {"config": "--psm 6"}},
+]
+
+_WORDS = (
+    "the of and to in is was for that on as with by at from his an were are which this be or has had not "
+    "first one their its new after who they have her she two been other when there all during into school "
+    "time may years more most only over city some world would where later up such used many can state "
+    "about national out known university united then made also between both century under american "
+    "system number three part government however people several high including group through same well "
+    "invoice total amount payment date account order customer delivery address reference quantity price "
+    "report section figure table page volume issue record department committee council review meeting"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(5, 12))]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), str(rng.randint(1, 99999)))
+    words[0] = words[0].capitalize()
+    return " ".join(words) + rng.choice([".", ".", ",", ";", ":"])
+
+
+def _render_page(text_lines: List[str], variant: str, dpi: int, rng: random.Random, font_path: Optional[str]):
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+    # US Letter with one-inch margins; 11 pt text
+    width, height = int(8.5 * dpi), int(11 * dpi)
+    font_size = int(11 * dpi / 72)
+    font = ImageFont.truetype(font_path, font_size) if font_path else ImageFont.load_default(size=font_size)
+    image = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    line_height = int(font_size * 1.5)
+    for index, line in enumerate(text_lines):
+        draw.text((dpi, dpi + index * line_height), line, fill=0, font=font)
+
+    if variant == 'low_contrast':
+        image = image.point(lambda value: 140 + value * 100 // 255)
+    if variant == 'blur':
+        image = image.filter(ImageFilter.GaussianBlur(radius=dpi / 200))
+    if variant in ('rotate', 'noise_rotate'):
+        image = image.rotate(rng.uniform(-3, 3), resample=Image.BICUBIC, expand=True, fillcolor=255)
+    if variant in ('noise', 'noise_rotate'):
+        pixels = np.asarray(image, dtype=np.float32)
+        noise_rng = np.random.default_rng(rng.randrange(2 ** 32))
+        pixels = pixels + noise_rng.normal(0, 25, pixels.shape)
+        speckles = noise_rng.random(pixels.shape)
+        pixels[speckles < 0.002] = 0
+        pixels[speckles > 0.998] = 255
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    return image
+
+
+def generate_corpus(directory: str, count: int = 24, seed: int = 0, dpi: int = 200, formats: Optional[List[str]] = None,
+                    font_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Render pages of known text, cycling through the noise/rotation variants; writes manifest.json."""
+    formats = formats or ['png']
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    manifest = []
+    for index in range(count):
+        variant = VARIANTS[index % len(VARIANTS)]
+        lines = [_sentence(rng) for _ in range(rng.randint(8, 24))]
+        image = _render_page(lines, variant, dpi, rng, font_path)
+        for file_format in formats:
+            file_name = f"sample_{index:04d}.{file_format}"
+            ground_truth = f"sample_{index:04d}.gt.txt"
+            image.save(os.path.join(directory, file_name), resolution=dpi)
+            manifest.append({"file": file_name, "ground_truth": ground_truth, "variant": variant, "dpi": dpi})
+        with open(os.path.join(directory, ground_truth), 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+    with open(os.path.join(directory, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_corpus(directory: str) -> List[Dict[str, Any]]:
+    with open(os.path.join(directory, "manifest.json"), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    samples = []
+    for entry in manifest:
+        with open(os.path.join(directory, entry["ground_truth"]), 'r', encoding='utf-8') as f:
+            reference = f.read()
+        samples.append({**entry, "path": os.path.join(directory, entry["file"]), "reference": reference})
+    return samples
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+async def evaluate_config(name: str, engine_options: Dict[str, Any], samples: List[Dict[str, Any]],
+                          concurrency: int = 4) -> Dict[str, Any]:
+    from tesseract_engine import TesseractEngine
+
+    engine = TesseractEngine(engine_options)
+    semaphore = asyncio.Semaphore(concurrency)
+    totals = {"char_errors": 0, "chars": 0, "word_errors": 0, "words": 0, "pages": 0, "failures": 0}
+    by_variant: Dict[str, Dict[str, int]] = {}
+    latencies = []
+
+    async def evaluate(sample: Dict[str, Any]):
+        async with semaphore:
+            start_time = time.monotonic()
+            try:
+                result = await engine.run_ocr(sample["path"])
+                hypothesis = result["text"]
+                totals["pages"] += len(result.get("pages") or []) or 1
+            except OCREngineError as e:
+                logger.warning("%s failed on %s: %s", name, sample["file"], e)
+                hypothesis = ""
+                totals["failures"] += 1
+            latencies.append(time.monotonic() - start_time)
+        reference = sample["reference"]
+        counts = {
+            "char_errors": character_errors(reference, hypothesis),
+            "chars": len(normalize_text(reference)),
+            "word_errors": word_errors(reference, hypothesis),
+            "words": len(reference.split()),
+        }
+        variant_totals = by_variant.setdefault(sample["variant"], {key: 0 for key in counts})
+        for key, value in counts.items():
+            totals[key] += value
+            variant_totals[key] += value
+
+    start_time = time.monotonic()
+    await asyncio.gather(*(evaluate(sample) for sample in samples))
+    wall_seconds = time.monotonic() - start_time
+    latencies.sort()
+    return {
+        "name": name,
+        "engine_options": engine_options,
+        "files": len(samples),
+        "failures": totals["failures"],
+        "wall_seconds": wall_seconds,
+        "pages_per_sec": totals["pages"] / wall_seconds if wall_seconds > 0 else None,
+        "latency_p50": _percentile(latencies, 0.50),
+        "latency_p95": _percentile(latencies, 0.95),
+        "cer": totals["char_errors"] / max(1, totals["chars"]),
+        "wer": totals["word_errors"] / max(1, totals["words"]),
+        "by_variant": {
+            variant: {
+                "cer": counts["char_errors"] / max(1, counts["chars"]),
+                "wer": counts["word_errors"] / max(1, counts["words"]),
+            }
+            for variant, counts in sorted(by_variant.items())
+        },
+    }
+
+
+def mark_pareto(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flag configurations no other configuration beats on both throughput and CER."""
+    for result in results:
+        result["pareto"] = not any(
+            other is not result
+            and (other["pages_per_sec"] or 0) >= (result["pages_per_sec"] or 0)
+            and other["cer"] <= result["cer"]
+            and ((other["pages_per_sec"] or 0) > (result["pages_per_sec"] or 0) or other["cer"] < result["cer"])
+            for other in results
+        )
+    return sorted(results, key=lambda result: (result["cer"], -(result["pages_per_sec"] or 0)))
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    rows = [("config", "pages/s", "CER %", "WER %", "p50 s", "p95 s", "fail", "pareto")]
+    for result in results:
+        rows.append((
+            result["name"],
+            f"{result['pages_per_sec']:.2f}" if result["pages_per_sec"] is not None else "-",
+            f"{result['cer'] * 100:.2f}",
+            f"{result['wer'] * 100:.2f}",
+            f"{result['latency_p50']:.2f}" if result["latency_p50"] is not None else "-",
+            f"{result['latency_p95']:.2f}" if result["latency_p95"] is not None else "-",
+            str(result["failures"]),
+            "*" if result.get("pareto") else "",
+        ))
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def find_regressions(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], max_increase: float) -> List[str]:
+    previous = {result["name"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        for metric in ("cer", "wer"):
+            if result[metric] - before[metric] > max_increase:
+                regressions.append(
+                    f"{result['name']}: {metric.upper()} {before[metric] * 100:.2f}% -> {result[metric] * 100:.2f}%"
+                )
+    return regressions
+
+
+async def run_harness(corpus_dir: str, configs: List[Dict[str, Any]], concurrency: int = 4) -> List[Dict[str, Any]]:
+    samples = load_corpus(corpus_dir)
+    results = []
+    for config in configs:
+        # Configurations run one after another so each gets the whole machine
+        results.append(await evaluate_config(config["name"], config.get("engine_options", {}), samples, concurrency))
+    return mark_pareto(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure OCR accuracy (CER/WER) against throughput per engine configuration")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = subparsers.add_parser("generate", help="Render a ground-truth corpus")
+    generate_parser.add_argument("corpus_dir", help="Directory to write images, .gt.txt files and manifest.json")
+    generate_parser.add_argument("--count", type=int, default=24, help="Number of pages")
+    generate_parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same corpus)")
+    generate_parser.add_argument("--dpi", type=int, default=200, help="Rendering resolution")
+    generate_parser.add_argument("--formats", default="png", help="Comma-separated output formats, e.g. png,tif,pdf")
+    generate_parser.add_argument("--font", help="TrueType font file (defaults to Pillow's built-in font)")
+
+    run_parser = subparsers.add_parser("run", help="Evaluate engine configurations on a corpus")
+    run_parser.add_argument("corpus_dir", help="Corpus directory created by 'generate'")
+    run_parser.add_argument("--configs", help="JSON file: list of {\"name\": ..., \"engine_options\": {...}}")
+    run_parser.add_argument("--concurrency", type=int, default=4, help="Files OCRed concurrently per configuration")
+    run_parser.add_argument("--output", help="Write the full results (including per-variant scores) to this JSON file")
+    run_parser.add_argument("--baseline", help="Earlier --output file; exit non-zero if accuracy regressed")
+    run_parser.add_argument("--max-regression", type=float, default=0.005,
+                            help="Allowed absolute CER/WER increase over the baseline")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.command == "generate":
+        manifest = generate_corpus(args.corpus_dir, args.count, args.seed, args.dpi, args.formats.split(","), args.font)
+        print(f"Wrote {len(manifest)} file(s) to {args.corpus_dir}")
+    else:
+        configs = DEFAULT_CONFIGS
+        if args.configs:
+            with open(args.configs, 'r', encoding='utf-8') as f:
+                configs = json.load(f)
+        results = asyncio.run(run_harness(args.corpus_dir, configs, args.concurrency))
+        print(format_table(results))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                regressions = find_regressions(results, json.load(f), args.max_regression)
+            if regressions:
+                print("Accuracy regressions:\n  " + "\n  ".join(regressions))
+                sys.exit(1)
@@ -0,0 +1,297 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import stat
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from collections import Counter, OrderedDict
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Members are addressed as "<archive path>!/<member name>", so the pair is a unique key everywhere
+ARCHIVE_SEPARATOR = "!/"
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+# Leading bytes of the compressed tarball formats tarfile reads
+_TAR_COMPRESSION = ((b"\x1f\x8b", gzip.open), (b"BZh", bz2.open), (b"\xfd7zXZ\x00", lzma.open))
+# Where compressed tarballs are decompressed to; None is the system temporary directory
+_spool_dir: Optional[str] = None
+
+
+def is_archive_file(file_path: str) -> bool:
+    return file_path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def is_archive_member(path: str) -> bool:
+    return ARCHIVE_SEPARATOR in path
+
+
+def split_archive_path(path: str) -> Tuple[str, str]:
+    archive_path, member_name = path.split(ARCHIVE_SEPARATOR, 1)
+    return archive_path, member_name
+
+
+def make_member_path(archive_path: str, member_name: str) -> str:
+    return f"{archive_path}{ARCHIVE_SEPARATOR}{member_name}"
+
+
+class _MemberReader(io.RawIOBase):
+    """Read-only window onto size bytes at offset of a file, opened separately per reader."""
+
+    def __init__(self, path: str, offset: int, size: int):
+        super().__init__()
+        self._file = open(path, 'rb')
+        self._offset = offset
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        remaining = self._size - self._position
+        if remaining <= 0:
+            return 0
+        with memoryview(buffer) as view:
+            self._file.seek(self._offset + self._position)
+            count = self._file.readinto(view[:remaining])
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._position = offset
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    status = os.stat(path)
+    return status.st_mtime_ns, status.st_size
+
+
+class _ArchiveHandle:
+    def __init__(self, archive_path: str):
+        self.archive_path = archive_path
+        self.signature = _file_signature(archive_path)
+        self.lock = threading.Lock()
+        self.zip_file: Optional[zipfile.ZipFile] = None
+        self.tar_file: Optional[tarfile.TarFile] = None
+        # The uncompressed tar that member offsets point into
+        self.tar_path = archive_path
+        self._spool: Optional[str] = None
+        if zipfile.is_zipfile(archive_path):
+            self.zip_file = zipfile.ZipFile(archive_path)
+            self.members = {info.filename: info for info in self.zip_file.infolist() if not info.is_dir()}
+            return
+        decompress = self._tar_decompressor(archive_path)
+        if decompress is not None:
+            # Reading members of a compressed stream out of order restarts decompression for every
+            # backward seek; decompressing once to a temporary plain tar keeps access linear
+            if _spool_dir:
+                os.makedirs(_spool_dir, exist_ok=True)
+            with decompress(archive_path, 'rb') as source, tempfile.NamedTemporaryFile(
+                    prefix="multiocr-", suffix=".tar", dir=_spool_dir, delete=False) as spool:
+                self._spool = spool.name
+                shutil.copyfileobj(source, spool, 1 << 20)
+            self.tar_path = self._spool
+        self.tar_file = tarfile.open(self.tar_path)
+        self.members = {info.name: info for info in self.tar_file.getmembers() if info.isfile()}
+
+    @staticmethod
+    def _tar_decompressor(archive_path: str):
+        with open(archive_path, 'rb') as f:
+            header = f.read(6)
+        return next((opener for magic, opener in _TAR_COMPRESSION if header.startswith(magic)), None)
+
+    @property
+    def spooled(self) -> bool:
+        return self._spool is not None
+
+    def is_stale(self) -> bool:
+        try:
+            return _file_signature(self.archive_path) != self.signature
+        except OSError:
+            return True
+
+    def member_stat(self, member_name: str) -> os.stat_result:
+        info = self.members[member_name]
+        if self.zip_file is not None:
+            size = info.file_size
+            modification_time = time.mktime(info.date_time + (0, 0, -1))
+        else:
+            size = info.size
+            modification_time = float(info.mtime)
+        # Shaped like os.stat so members flow through the same metadata path as real files
+        return os.stat_result((stat.S_IFREG | 0o444, 0, 0, 1, 0, 0, size,
+                               modification_time, modification_time, modification_time))
+
+    def open_member(self, member_name: str) -> BinaryIO:
+        if member_name not in self.members:
+            raise FileNotFoundError(f"No member {member_name} in {self.archive_path}")
+        info = self.members[member_name]
+        if self.zip_file is not None:
+            with self.lock:
+                # ZipExtFile streams and seeks within the member without extracting it
+                return self.zip_file.open(info)
+        if not info.issparse():
+            # A regular member is a contiguous byte range; each reader gets its own file descriptor
+            return io.BufferedReader(_MemberReader(self.tar_path, info.offset_data, info.size))
+        # Sparse members need tarfile to fill the holes, and share its one stream
+        with self.lock, self.tar_file.extractfile(info) as member:
+            return io.BytesIO(member.read())
+
+    def close(self):
+        if self.zip_file is not None:
+            self.zip_file.close()
+        if self.tar_file is not None:
+            self.tar_file.close()
+        if self._spool is not None:
+            # Readers still open keep their descriptor; the data goes away with the last one
+            try:
+                os.unlink(self._spool)
+            except OSError:
+                pass
+            self._spool = None
+
+
+class _ArchiveCache:
+    """Keeps recently used archives open so their member index is parsed only once.
+
+    A handle is reopened when the archive's size or modification time changed, so a
+    replaced archive is never read through offsets from its old index. Archives with
+    queued members are pinned: a decompressed tarball is not evicted (and decompressed
+    again) between discovering its members and processing them.
+    """
+
+    def __init__(self, max_open: int = 8):
+        self.max_open = max_open
+        self._handles: "OrderedDict[str, _ArchiveHandle]" = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, archive_path: str) -> _ArchiveHandle:
+        with self._lock:
+            handle = self._handles.get(archive_path)
+            if handle is not None:
+                if not handle.is_stale():
+                    self._handles.move_to_end(archive_path)
+                    return handle
+                del self._handles[archive_path]
+                handle.close()
+        handle = _ArchiveHandle(archive_path)
+        with self._lock:
+            existing = self._handles.get(archive_path)
+            if existing is not None and existing.signature == handle.signature:
+                handle.close()
+                return existing
+            if existing is not None:
+                existing.close()
+            self._handles[archive_path] = handle
+            self._evict()
+        return handle
+
+    def _evict(self):
+        # Least recently used first, never the one just handed out; cheap-to-reopen handles go even
+        # when pinned, spooled ones only when not
+        while len(self._handles) > self.max_open:
+            candidates = list(self._handles.items())[:-1]
+            evictable = next((path for path, handle in candidates
+                              if not handle.spooled or not self._pins.get(path)), None)
+            if evictable is None:
+                break
+            self._handles.pop(evictable).close()
+
+    def pin(self, archive_path: str, count: int = 1):
+        with self._lock:
+            self._pins[archive_path] = self._pins.get(archive_path, 0) + count
+
+    def unpin(self, archive_path: str):
+        with self._lock:
+            remaining = self._pins.get(archive_path, 0) - 1
+            if remaining > 0:
+                self._pins[archive_path] = remaining
+            else:
+                self._pins.pop(archive_path, None)
+                self._evict()
+
+    def close_all(self):
+        with self._lock:
+            for handle in self._handles.values():
+                handle.close()
+            self._handles.clear()
+            self._pins.clear()
+
+
+_archive_cache = _ArchiveCache()
+
+
+def iter_archive_members(archive_path: str, supported_file_types: List[str],
+                         max_member_depth: int) -> Iterator[Tuple[str, os.stat_result]]:
+    """Yield (virtual path, stat) for supported members no deeper than max_member_depth directories."""
+    handle = _archive_cache.get(archive_path)
+    for member_name in handle.members:
+        member_depth = member_name.strip("/").count("/")
+        if member_depth > max_member_depth or is_archive_file(member_name):
+            continue
+        if os.path.splitext(member_name)[1].lower() in supported_file_types:
+            yield make_member_path(archive_path, member_name), handle.member_stat(member_name)
+
+
+def stat_input(path: str) -> os.stat_result:
+    if is_archive_member(path):
+        archive_path, member_name = split_archive_path(path)
+        try:
+            return _archive_cache.get(archive_path).member_stat(member_name)
+        except KeyError:
+            raise FileNotFoundError(f"No member {member_name} in {archive_path}")
+    return os.stat(path)
+
+
+def open_input(path: str) -> BinaryIO:
+    """Open a real file or an archive member for binary reading."""
+    if is_archive_member(path):
+        archive_path, member_name = split_archive_path(path)
+        return _archive_cache.get(archive_path).open_member(member_name)
+    return open(path, 'rb')
+
+
+def pin_archive_members(paths: Iterable[str]):
+    """Keep the archives of queued members open until release_archive_member() was called for each."""
+    counts = Counter(split_archive_path(path)[0] for path in paths if is_archive_member(path))
+    for archive_path, count in counts.items():
+        _archive_cache.pin(archive_path, count)
+
+
+def release_archive_member(path: str):
+    if is_archive_member(path):
+        _archive_cache.unpin(split_archive_path(path)[0])
+
+
+def set_spool_dir(spool_dir: Optional[str]):
+    """Directory compressed tarballs are decompressed to (default: the system temporary directory)."""
+    global _spool_dir
+    _spool_dir = spool_dir
+
+
+def close_archives():
+    _archive_cache.close_all()
+
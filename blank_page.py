@@ -0,0 +1,74 @@
+from typing import TYPE_CHECKING, Dict, Any
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+DEFAULT_SAMPLE_SIZE = 512
+# Scanner edges, punch holes and staple shadows live in the margins
+DEFAULT_MARGIN = 0.05
+DEFAULT_INK_CONTRAST = 60
+# A row is part of a text line when some stretch this wide (share of the page width) is this dense with ink;
+# words pack ink together, dust and speckle scatter it
+DEFAULT_LINE_WINDOW = 0.1
+DEFAULT_LINE_DENSITY = 0.1
+# Consecutive such rows a page needs to hold text; an 8 pt line spans several even after downsampling
+DEFAULT_MIN_LINE_ROWS = 3
+
+
+def _longest_run(flags) -> int:
+    longest = current = 0
+    for flag in flags:
+        current = current + 1 if flag else 0
+        longest = max(longest, current)
+    return longest
+
+
+def measure_page(image: "Image.Image", sample_size: int = DEFAULT_SAMPLE_SIZE, margin: float = DEFAULT_MARGIN,
+                 ink_contrast: int = DEFAULT_INK_CONTRAST, line_window: float = DEFAULT_LINE_WINDOW,
+                 line_density: float = DEFAULT_LINE_DENSITY) -> Dict[str, float]:
+    """Ink-pixel ratio and tallest run of inked rows of a page, measured on a box-downsampled greyscale copy.
+
+    A whole-page ink ratio cannot tell a page with one short line of text from a dusty blank
+    scan; a text line, however, inks several consecutive rows while dust does not.
+    """
+    import numpy as np
+
+    gray = image if image.mode == 'L' else image.convert('L')
+    factor = max(1, max(gray.size) // sample_size)
+    if factor > 1:
+        gray = gray.reduce(factor)
+    pixels = np.asarray(gray, dtype=np.uint8)
+
+    height, width = pixels.shape
+    margin_y, margin_x = int(height * margin), int(width * margin)
+    pixels = pixels[margin_y:height - margin_y or None, margin_x:width - margin_x or None]
+    if pixels.size == 0:
+        return {"ink_ratio": 0.0, "line_rows": 0}
+
+    # Ink is anything clearly darker than the paper, so grey or yellowed paper still reads as blank
+    background = float(np.median(pixels))
+    ink = pixels < background - ink_contrast
+    # Densest window of each row, from running ink counts
+    window = max(1, min(pixels.shape[1], int(pixels.shape[1] * line_window)))
+    counts = np.concatenate([np.zeros((ink.shape[0], 1), dtype=np.int64), np.cumsum(ink, axis=1)], axis=1)
+    densest = (counts[:, window:] - counts[:, :-window]).max(axis=1)
+    inked_rows = densest >= max(2, int(window * line_density))
+    return {"ink_ratio": float(np.count_nonzero(ink)) / pixels.size, "line_rows": _longest_run(inked_rows)}
+
+
+def is_blank_page(measurements: Dict[str, float], min_line_rows: int = DEFAULT_MIN_LINE_ROWS) -> bool:
+    return measurements["line_rows"] < min_line_rows
+
+
+def classify_page(image: "Image.Image", options: Dict[str, Any]) -> Dict[str, Any]:
+    """Measure a page and decide blankness using the blank_* keys of an engine's options."""
+    measurements = measure_page(
+        image,
+        options.get('blank_sample_size', DEFAULT_SAMPLE_SIZE),
+        options.get('blank_margin', DEFAULT_MARGIN),
+        options.get('blank_ink_contrast', DEFAULT_INK_CONTRAST),
+        options.get('blank_line_window', DEFAULT_LINE_WINDOW),
+        options.get('blank_line_density', DEFAULT_LINE_DENSITY),
+    )
+    measurements["blank"] = is_blank_page(measurements, options.get('blank_min_line_rows', DEFAULT_MIN_LINE_ROWS))
+    return measurements
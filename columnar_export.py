@@ -0,0 +1,225 @@
+import argparse
+import logging
+import os
+from typing import Dict, Any, List, Optional
+
+# pyarrow is optional and slow to import, so it is loaded when an exporter is created
+pa = None
+pq = None
+
+from output_formatter import iter_result_files
+from result_compression import load_result
+
+logger = logging.getLogger(__name__)
+
+# Arrow output uses the IPC stream format, which allows per-batch dictionaries
+EXPORT_FORMATS = {'parquet': '.parquet', 'arrow': '.arrows'}
+
+# Low-cardinality text columns are dictionary-encoded in both Arrow and Parquet
+_DICTIONARY_COLUMNS = ['source_path', 'file_type', 'engine', 'engine_version', 'lang']
+
+
+def _import_pyarrow():
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Columnar export requires the 'pyarrow' package")
+        pa, pq = pyarrow, pyarrow.parquet
+
+
+def _page_schema():
+    dictionary_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('source_path', dictionary_string),
+        ('file_type', dictionary_string),
+        ('file_size', pa.int64()),
+        ('modification_time', pa.float64()),
+        ('engine', dictionary_string),
+        ('engine_version', dictionary_string),
+        ('lang', dictionary_string),
+        ('processing_time', pa.float64()),
+        ('page_number', pa.int32()),
+        ('text', pa.large_string()),
+        ('confidence', pa.float64()),
+        ('error', pa.string()),
+    ])
+
+
+def _word_schema():
+    dictionary_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('source_path', dictionary_string),
+        ('engine', dictionary_string),
+        ('page_number', pa.int32()),
+        ('word_index', pa.int32()),
+        ('text', pa.string()),
+        ('confidence', pa.float64()),
+        ('left', pa.int32()),
+        ('top', pa.int32()),
+        ('width', pa.int32()),
+        ('height', pa.int32()),
+    ])
+
+
+class _TableWriter:
+    def __init__(self, path: str, export_format: str, schema):
+        self.path = path
+        self.export_format = export_format
+        self.schema = schema
+        self._sink = None
+        self._writer = None
+
+    def write(self, columns: Dict[str, List[Any]]):
+        batch = pa.RecordBatch.from_pydict(columns, schema=self.schema)
+        if self._writer is None:
+            # Open lazily so a run without word boxes never creates an empty words file
+            if self.export_format == 'parquet':
+                self._writer = pq.ParquetWriter(
+                    self.path, self.schema, compression='zstd',
+                    use_dictionary=[name for name in self.schema.names if name in _DICTIONARY_COLUMNS]
+                )
+            else:
+                self._sink = pa.OSFile(self.path, 'wb')
+                self._writer = pa.ipc.new_stream(self._sink, self.schema)
+        if self.export_format == 'parquet':
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+
+class ColumnarExporter:
+    """Streams page- and word-level OCR results into Parquet or Arrow IPC row groups."""
+
+    def __init__(self, output_prefix: str, export_format: str = 'parquet', row_group_size: int = 10000):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        _import_pyarrow()
+        directory = os.path.dirname(output_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.row_group_size = row_group_size
+        extension = EXPORT_FORMATS[export_format]
+        self.page_schema = _page_schema()
+        self.word_schema = _word_schema()
+        self._pages = _TableWriter(f"{output_prefix}_pages{extension}", export_format, self.page_schema)
+        self._words = _TableWriter(f"{output_prefix}_words{extension}", export_format, self.word_schema)
+        self._page_rows = self._empty_columns(self.page_schema)
+        self._word_rows = self._empty_columns(self.word_schema)
+
+    @staticmethod
+    def _empty_columns(schema) -> Dict[str, List[Any]]:
+        return {name: [] for name in schema.names}
+
+    def add_result(self, source_path: str, results: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None):
+        metadata = metadata or {}
+        for engine_name, engine_result in results.items():
+            if not isinstance(engine_result, dict):
+                continue
+            engine_metadata = engine_result.get("metadata") or {}
+            pages = engine_result.get("pages") or [{"page_number": None, "text": engine_result.get("text")}]
+            if "error" in engine_result:
+                pages = [{"page_number": None, "text": None}]
+
+            for page in pages:
+                self._append(self._page_rows, {
+                    'source_path': source_path,
+                    'file_type': metadata.get("file_type"),
+                    'file_size': metadata.get("file_size"),
+                    'modification_time': metadata.get("modification_time"),
+                    'engine': engine_name,
+                    'engine_version': engine_metadata.get("tesseract_version") or engine_metadata.get("engine_version"),
+                    'lang': engine_metadata.get("lang"),
+                    'processing_time': engine_metadata.get("processing_time"),
+                    'page_number': page.get("page_number"),
+                    'text': page.get("text"),
+                    'confidence': page.get("confidence"),
+                    'error': engine_result.get("error"),
+                })
+                for word_index, word in enumerate(page.get("words") or []):
+                    self._append(self._word_rows, {
+                        'source_path': source_path,
+                        'engine': engine_name,
+                        'page_number': page.get("page_number"),
+                        'word_index': word_index,
+                        'text': word.get("text"),
+                        'confidence': word.get("confidence"),
+                        'left': word.get("left"),
+                        'top': word.get("top"),
+                        'width': word.get("width"),
+                        'height': word.get("height"),
+                    })
+
+        if len(self._page_rows['source_path']) >= self.row_group_size:
+            self._flush_pages()
+        if len(self._word_rows['source_path']) >= self.row_group_size:
+            self._flush_words()
+
+    @staticmethod
+    def _append(columns: Dict[str, List[Any]], row: Dict[str, Any]):
+        for name, values in columns.items():
+            values.append(row.get(name))
+
+    def _flush_pages(self):
+        if self._page_rows['source_path']:
+            self._pages.write(self._page_rows)
+            self._page_rows = self._empty_columns(self.page_schema)
+
+    def _flush_words(self):
+        if self._word_rows['source_path']:
+            self._words.write(self._word_rows)
+            self._word_rows = self._empty_columns(self.word_schema)
+
+    def flush(self):
+        self._flush_pages()
+        self._flush_words()
+
+    def close(self):
+        self.flush()
+        self._pages.close()
+        self._words.close()
+
+
+def export_output_dir(output_dir: str, output_prefix: str, export_format: str = 'parquet',
+                      row_group_size: int = 10000, zstd_dictionary: Optional[str] = None) -> int:
+    """Convert an existing output directory, holding at most one row group in memory."""
+    exporter = ColumnarExporter(output_prefix, export_format, row_group_size)
+    exported = 0
+    try:
+        for result_path, metadata_path in iter_result_files(output_dir):
+            try:
+                results = load_result(result_path, zstd_dictionary)
+                metadata = load_result(metadata_path, zstd_dictionary) if os.path.exists(metadata_path) else {}
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable result %s: %s", result_path, e)
+                continue
+            exporter.add_result(metadata.get("file_path") or result_path, results, metadata)
+            exported += 1
+    finally:
+        exporter.close()
+    return exported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export OCR output to Parquet or Arrow for analytics")
+    parser.add_argument("output_dir", help="Output directory containing OCR results (any layout or compression)")
+    parser.add_argument("output_prefix", help="Prefix for the _pages/_words export files")
+    parser.add_argument("--format", default="parquet", choices=list(EXPORT_FORMATS), help="Export file format")
+    parser.add_argument("--row-group-size", type=int, default=10000, help="Rows buffered per row group")
+    parser.add_argument("--zstd-dictionary", help="Dictionary zstd-compressed results were written with")
+
+    args = parser.parse_args()
+    count = export_output_dir(args.output_dir, args.output_prefix, args.format, args.row_group_size, args.zstd_dictionary)
+    print(f"Exported {count} file(s) to {args.output_prefix}_pages{EXPORT_FORMATS[args.format]}")
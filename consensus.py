@@ -0,0 +1,289 @@
+import bisect
+import string
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+CONSENSUS_KEY = "consensus"
+# Below this many DP cells a full table is cheaper than recursing further
+_FULL_TABLE_CELLS = 4096
+# Words of following context that must match for a word to anchor the alignment
+_ANCHOR_CONTEXT = 3
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+
+class Token:
+    __slots__ = ("text", "key", "confidence", "line_break")
+
+    def __init__(self, text: str, confidence: float, line_break: bool = False):
+        self.text = text
+        # Case and punctuation differences still count as the same word when aligning
+        self.key = text.lower().translate(_PUNCTUATION) or text
+        self.confidence = confidence
+        self.line_break = line_break
+
+
+def _substitution_cost(first: Token, second: Token) -> float:
+    if first.text == second.text:
+        return 0.0
+    return 0.25 if first.key == second.key else 1.0
+
+
+def _full_alignment(a: Sequence[Token], b: Sequence[Token]) -> List[Tuple[Optional[int], Optional[int]]]:
+    rows, columns = len(a) + 1, len(b) + 1
+    cost = [[0.0] * columns for _ in range(rows)]
+    for i in range(rows):
+        cost[i][0] = float(i)
+    for j in range(columns):
+        cost[0][j] = float(j)
+    for i in range(1, rows):
+        for j in range(1, columns):
+            cost[i][j] = min(cost[i - 1][j] + 1, cost[i][j - 1] + 1,
+                             cost[i - 1][j - 1] + _substitution_cost(a[i - 1], b[j - 1]))
+    pairs = []
+    i, j = len(a), len(b)
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and cost[i][j] == cost[i - 1][j - 1] + _substitution_cost(a[i - 1], b[j - 1]):
+            pairs.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif i > 0 and cost[i][j] == cost[i - 1][j] + 1:
+            pairs.append((i - 1, None))
+            i -= 1
+        else:
+            pairs.append((None, j - 1))
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+
+def _last_row(a: Sequence[Token], b: Sequence[Token]) -> List[float]:
+    previous = [float(j) for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [float(i)]
+        token = a[i - 1]
+        for j in range(1, len(b) + 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + _substitution_cost(token, b[j - 1])))
+        previous = current
+    return previous
+
+
+def _hirschberg(a: Sequence[Token], b: Sequence[Token]) -> List[Tuple[Optional[int], Optional[int]]]:
+    """Optimal alignment in O(len(a) + len(b)) memory by splitting on the middle row."""
+    if not a:
+        return [(None, j) for j in range(len(b))]
+    if not b:
+        return [(i, None) for i in range(len(a))]
+    if len(a) * len(b) <= _FULL_TABLE_CELLS or len(a) == 1:
+        return _full_alignment(a, b)
+
+    middle = len(a) // 2
+    left = _last_row(a[:middle], b)
+    right = _last_row(a[middle:][::-1], b[::-1])
+    split = min(range(len(b) + 1), key=lambda j: left[j] + right[len(b) - j])
+    head = _hirschberg(a[:middle], b[:split])
+    tail = _hirschberg(a[middle:], b[split:])
+    return head + [(None if i is None else i + middle, None if j is None else j + split) for i, j in tail]
+
+
+def _unique_anchors(a: Sequence[Token], b: Sequence[Token]) -> List[Tuple[int, int]]:
+    """Positions whose word and next two words occur exactly once in each text, in an order
+    consistent with both (patience diff over word trigrams)."""
+    def unique_positions(tokens: Sequence[Token]) -> Dict[Tuple[str, ...], int]:
+        positions: Dict[Tuple[str, ...], int] = {}
+        # Shortened contexts at the very end would always be unique; in repetitive text they were
+        # the only anchors, so every recursion level peeled off a single word
+        for index in range(len(tokens) - _ANCHOR_CONTEXT + 1):
+            context = tuple(token.key for token in tokens[index:index + _ANCHOR_CONTEXT])
+            positions[context] = -1 if context in positions else index
+        return {context: index for context, index in positions.items() if index >= 0}
+
+    in_a, in_b = unique_positions(a), unique_positions(b)
+    candidates = sorted((index, in_b[context]) for context, index in in_a.items() if context in in_b)
+
+    # Longest increasing subsequence on the b positions
+    tails: List[int] = []
+    tail_indices: List[int] = []
+    predecessors: List[int] = []
+    for index, (_, position) in enumerate(candidates):
+        slot = bisect.bisect_left(tails, position)
+        predecessors.append(tail_indices[slot - 1] if slot > 0 else -1)
+        if slot == len(tails):
+            tails.append(position)
+            tail_indices.append(index)
+        else:
+            tails[slot] = position
+            tail_indices[slot] = index
+    anchors = []
+    index = tail_indices[-1] if tail_indices else -1
+    while index >= 0:
+        anchors.append(candidates[index])
+        index = predecessors[index]
+    anchors.reverse()
+    return anchors
+
+
+def align(a: Sequence[Token], b: Sequence[Token]) -> List[Tuple[Optional[int], Optional[int]]]:
+    """Word alignment of two token lists as (index in a, index in b) pairs, None marking a gap.
+
+    Long inputs are first cut at words with a unique shared context, recursively, so the
+    quadratic-time step only ever sees short segments; within a segment Hirschberg keeps
+    memory linear, so even whole documents never need an O(len(a) * len(b)) table.
+    """
+    # Identical leading and trailing words always align with each other
+    prefix = 0
+    while prefix < min(len(a), len(b)) and a[prefix].text == b[prefix].text:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(a), len(b)) - prefix and a[-1 - suffix].text == b[-1 - suffix].text:
+        suffix += 1
+    if prefix or suffix:
+        middle = align(a[prefix:len(a) - suffix], b[prefix:len(b) - suffix])
+        return ([(index, index) for index in range(prefix)]
+                + [(None if i is None else i + prefix, None if j is None else j + prefix) for i, j in middle]
+                + [(len(a) - suffix + index, len(b) - suffix + index) for index in range(suffix)])
+
+    if len(a) * len(b) <= _FULL_TABLE_CELLS:
+        return _hirschberg(a, b)
+    anchors = _unique_anchors(a, b)
+    if not anchors:
+        return _hirschberg(a, b)
+    pairs: List[Tuple[Optional[int], Optional[int]]] = []
+    start_a = start_b = 0
+    for anchor_a, anchor_b in anchors + [(len(a), len(b))]:
+        # Words unique within a segment may repeat across the whole text, so segments are cut again
+        segment = align(a[start_a:anchor_a], b[start_b:anchor_b])
+        pairs.extend((None if i is None else i + start_a, None if j is None else j + start_b) for i, j in segment)
+        if anchor_a < len(a):
+            pairs.append((anchor_a, anchor_b))
+        start_a, start_b = anchor_a + 1, anchor_b + 1
+    return pairs
+
+
+def _normalized_confidence(value: Optional[float]) -> Optional[float]:
+    if value is None:
+        return None
+    return value / 100.0 if value > 1 else value
+
+
+def _page_tokens(page: Dict[str, Any], fallback_confidence: float) -> List[Token]:
+    page_confidence = _normalized_confidence(page.get("confidence"))
+    default = page_confidence if page_confidence is not None else fallback_confidence
+    tokens = []
+    for line in (page.get("text") or "").splitlines():
+        words = line.split()
+        for index, word in enumerate(words):
+            tokens.append(Token(word, default, line_break=index == len(words) - 1))
+
+    # Word-level confidences apply when the engine's word list is the page text split up
+    words = [word for word in page.get("words") or [] if (word.get("text") or "").strip()]
+    if len(words) == len(tokens) and all(word["text"] == token.text for word, token in zip(words, tokens)):
+        for word, token in zip(words, tokens):
+            confidence = _normalized_confidence(word.get("confidence"))
+            if confidence is not None:
+                token.confidence = confidence
+    return tokens
+
+
+def _mean_confidence(tokens: List[Token]) -> float:
+    return sum(token.confidence for token in tokens) / len(tokens) if tokens else 0.0
+
+
+def _vote(pivot: List[Token], others: List[Tuple[List[Token], float]], pivot_weight: float) -> Tuple[str, float]:
+    """Merge token lists aligned against the pivot; returns (text, fraction of unanimous positions)."""
+    # votes[i]: pivot position i; insertions[i]: words other engines put before pivot position i
+    votes: List[Dict[str, List[Any]]] = [{} for _ in pivot]
+    insertions: List[Dict[Tuple[str, ...], float]] = [{} for _ in range(len(pivot) + 1)]
+    # Engines that put nothing between two pivot words vote against any insertion there
+    no_insertion = [pivot_weight * _mean_confidence(pivot)] * (len(pivot) + 1)
+    for index, token in enumerate(pivot):
+        votes[index][token.key] = [pivot_weight * token.confidence, token]
+
+    for tokens, weight in others:
+        reliability = weight * _mean_confidence(tokens)
+        inserted_at = set()
+        pending: List[Token] = []
+        for pivot_index, other_index in align(pivot, tokens) + [(len(pivot), None)]:
+            if pivot_index is None:
+                pending.append(tokens[other_index])
+                continue
+            if pending:
+                phrase = tuple(token.text for token in pending)
+                insertions[pivot_index][phrase] = insertions[pivot_index].get(phrase, 0.0) + weight * _mean_confidence(pending)
+                inserted_at.add(pivot_index)
+                pending = []
+            if pivot_index == len(pivot):
+                break
+            if other_index is None:
+                # This engine saw nothing here: a vote for dropping the pivot word
+                votes[pivot_index].setdefault("", [0.0, None])[0] += reliability
+            else:
+                token = tokens[other_index]
+                votes[pivot_index].setdefault(token.key, [0.0, token])[0] += weight * token.confidence
+        for index in range(len(pivot) + 1):
+            if index not in inserted_at:
+                no_insertion[index] += reliability
+
+    lines: List[List[str]] = [[]]
+    unanimous = 0
+    for index in range(len(pivot) + 1):
+        if insertions[index]:
+            phrase, support = max(insertions[index].items(), key=lambda item: item[1])
+            if support > no_insertion[index]:
+                lines[-1].extend(phrase)
+        if index == len(pivot):
+            break
+        if index and pivot[index - 1].line_break:
+            # Started only now, so words voted in at the end of a line stay on that line
+            lines.append([])
+        candidates = votes[index]
+        if len(candidates) == 1:
+            unanimous += 1
+        key, (_, token) = max(candidates.items(), key=lambda item: (item[1][0], item[0] == pivot[index].key))
+        if key:
+            # Prefer the exact spelling from the pivot when it only differs in case/punctuation
+            lines[-1].append(pivot[index].text if key == pivot[index].key else token.text)
+
+    text = "\n".join(" ".join(words) for words in lines if words)
+    return text, unanimous / len(pivot) if pivot else 1.0
+
+
+def build_consensus(results: Dict[str, Any], weights: Optional[Dict[str, float]] = None,
+                    default_confidence: float = 0.5) -> Optional[Dict[str, Any]]:
+    """Vote a merged text out of every successful engine result; None with fewer than two."""
+    weights = weights or {}
+    usable = {
+        name: result for name, result in results.items()
+        if name != CONSENSUS_KEY and isinstance(result, dict) and "error" not in result and result.get("text") is not None
+    }
+    if len(usable) < 2:
+        return None
+
+    def pages_of(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return result.get("pages") or [{"page_number": 1, "text": result["text"]}]
+
+    page_counts = {len(pages_of(result)) for result in usable.values()}
+    page_wise = len(page_counts) == 1
+    documents = {}
+    for name, result in usable.items():
+        fallback = _normalized_confidence(result.get("confidence"))
+        fallback = fallback if fallback is not None else default_confidence
+        pages = pages_of(result)
+        if not page_wise:
+            # Engines split pages differently; align the whole document as one sequence
+            pages = [{"page_number": 1, "text": "\n".join(page.get("text") or "" for page in pages)}]
+        documents[name] = [_page_tokens(page, fallback) for page in pages]
+
+    # The engine with the most confident words anchors the alignment
+    pivot_name = max(documents, key=lambda name: (
+        weights.get(name, 1.0) * _mean_confidence([token for page in documents[name] for token in page]), name
+    ))
+    merged_pages = []
+    for page_index, pivot_tokens in enumerate(documents[pivot_name]):
+        others = [(documents[name][page_index], weights.get(name, 1.0)) for name in documents if name != pivot_name]
+        text, agreement = _vote(pivot_tokens, others, weights.get(pivot_name, 1.0))
+        merged_pages.append({"page_number": page_index + 1, "text": text, "agreement": agreement})
+
+    return {
+        "text": "\f".join(page["text"] for page in merged_pages),
+        "confidence": None,
+        "pages": merged_pages,
+        "metadata": {"engine_name": CONSENSUS_KEY, "engines": sorted(usable), "pivot": pivot_name, "page_aligned": page_wise},
+    }
@@ -0,0 +1,218 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+HEALTH_WINDOWS = {"1m": 60, "5m": 300, "15m": 900}
+
+
+class _HealthBucket:
+    __slots__ = ("start", "successes", "failures", "timeouts", "pages", "latencies", "latency_count")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.pages = 0
+        self.latencies: List[float] = []
+        self.latency_count = 0
+
+
+class EngineHealthTracker:
+    """Rolling, time-bucketed success/latency/throughput stats for one engine."""
+
+    def __init__(self, bucket_seconds: int = 10, horizon_seconds: int = 900,
+                 max_latency_samples: int = 256, min_samples: int = 10, clock=time.monotonic):
+        self.bucket_seconds = bucket_seconds
+        self.horizon_seconds = horizon_seconds
+        self.max_latency_samples = max_latency_samples
+        self.min_samples = min_samples
+        self.clock = clock
+        self.buckets: deque = deque()
+        self.first_record_time: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, success: bool, latency: float, pages: int = 1, timed_out: bool = False):
+        now = self.clock()
+        with self._lock:
+            bucket = self._current_bucket(now)
+            if success:
+                bucket.successes += 1
+                bucket.pages += pages
+            else:
+                bucket.failures += 1
+                if timed_out:
+                    bucket.timeouts += 1
+
+            # Reservoir sampling keeps per-bucket memory bounded on busy engines
+            bucket.latency_count += 1
+            if len(bucket.latencies) < self.max_latency_samples:
+                bucket.latencies.append(latency)
+            else:
+                slot = random.randrange(bucket.latency_count)
+                if slot < self.max_latency_samples:
+                    bucket.latencies[slot] = latency
+
+    def _current_bucket(self, now: float) -> _HealthBucket:
+        if self.first_record_time is None:
+            self.first_record_time = now
+        start = now - (now % self.bucket_seconds)
+        if not self.buckets or self.buckets[-1].start != start:
+            self.buckets.append(_HealthBucket(start))
+        while self.buckets and self.buckets[0].start <= now - self.horizon_seconds - self.bucket_seconds:
+            self.buckets.popleft()
+        return self.buckets[-1]
+
+    def _buckets_in_window(self, window_seconds: int, now: float) -> List[_HealthBucket]:
+        cutoff = now - window_seconds
+        return [bucket for bucket in self.buckets if bucket.start + self.bucket_seconds > cutoff]
+
+    def counts(self, window_seconds: int = 60) -> Dict[str, int]:
+        now = self.clock()
+        with self._lock:
+            buckets = self._buckets_in_window(window_seconds, now)
+            successes = sum(bucket.successes for bucket in buckets)
+            failures = sum(bucket.failures for bucket in buckets)
+            timeouts = sum(bucket.timeouts for bucket in buckets)
+        return {"requests": successes + failures, "successes": successes, "failures": failures, "timeouts": timeouts}
+
+    def snapshot(self, window_seconds: int = 60) -> Dict[str, Any]:
+        now = self.clock()
+        with self._lock:
+            buckets = self._buckets_in_window(window_seconds, now)
+            successes = sum(bucket.successes for bucket in buckets)
+            failures = sum(bucket.failures for bucket in buckets)
+            timeouts = sum(bucket.timeouts for bucket in buckets)
+            pages = sum(bucket.pages for bucket in buckets)
+            latencies = sorted(latency for bucket in buckets for latency in bucket.latencies)
+            first_record_time = self.first_record_time
+
+        requests = successes + failures
+        elapsed = window_seconds
+        if first_record_time is not None:
+            elapsed = max(min(window_seconds, now - first_record_time), 1e-6)
+
+        return {
+            "requests": requests,
+            "successes": successes,
+            "failures": failures,
+            "timeouts": timeouts,
+            "success_rate": successes / requests if requests else None,
+            "latency_p50": _percentile(latencies, 0.50),
+            "latency_p90": _percentile(latencies, 0.90),
+            "latency_p99": _percentile(latencies, 0.99),
+            "pages_per_sec": pages / elapsed if requests else 0.0,
+        }
+
+    def snapshots(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self.snapshot(seconds) for name, seconds in HEALTH_WINDOWS.items()}
+
+    def get_status(self) -> str:
+        counts = self.counts(HEALTH_WINDOWS["1m"])
+        if counts["requests"] < self.min_samples:
+            # Too little recent traffic; fall back to the widest window
+            counts = self.counts(HEALTH_WINDOWS["15m"])
+        if not counts["requests"]:
+            return "YELLOW"  # No operations performed yet
+
+        success_rate = counts["successes"] / counts["requests"]
+        if success_rate == 1.0 and counts["requests"] >= self.min_samples:
+            return "GREEN"
+        elif success_rate >= 0.7:
+            return "YELLOW"
+        else:
+            return "RED"
+
+
+class MemoryBudget:
+    """Memory, in MB, shared by every engine drawing on it; a call waits until its share is free."""
+
+    def __init__(self, total_mb: int):
+        self.total_mb = max(1, total_mb)
+        self.reserved_mb = 0
+        self._condition = asyncio.Condition()
+
+    def _share(self, amount_mb: int) -> int:
+        # A call needing more than the whole budget still runs, just alone
+        return min(max(0, amount_mb), self.total_mb)
+
+    async def reserve(self, amount_mb: int):
+        amount_mb = self._share(amount_mb)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.reserved_mb + amount_mb <= self.total_mb)
+            self.reserved_mb += amount_mb
+
+    async def release(self, amount_mb: int):
+        async with self._condition:
+            self.reserved_mb -= self._share(amount_mb)
+            self._condition.notify_all()
+
+
+class AdaptiveLimiter:
+    """Concurrency gate for one engine whose limit shrinks as its recent success rate drops.
+
+    With a memory budget, every call also reserves memory_per_call_mb from it, so engines
+    sharing the budget cannot together hold more pages in memory than it allows.
+    """
+
+    def __init__(self, tracker: EngineHealthTracker, max_concurrency: int, min_concurrency: int = 1,
+                 window_seconds: int = HEALTH_WINDOWS["1m"], min_samples: int = 5,
+                 memory_budget: Optional[MemoryBudget] = None, memory_per_call_mb: int = 0):
+        self.tracker = tracker
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.memory_budget = memory_budget
+        self.memory_per_call_mb = memory_per_call_mb
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        counts = self.tracker.counts(self.window_seconds)
+        if counts["requests"] < self.min_samples:
+            return self.max_concurrency
+
+        # Full concurrency at 100% success, scaling down to the floor at 50% or worse
+        success_rate = counts["successes"] / counts["requests"]
+        scale = max(0.0, (success_rate - 0.5) / 0.5)
+        return max(self.min_concurrency, min(self.max_concurrency, round(self.max_concurrency * scale)))
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        if self.memory_budget is not None:
+            try:
+                await self.memory_budget.reserve(self.memory_per_call_mb)
+            except BaseException:
+                await self._release_slot()
+                raise
+
+    async def release(self):
+        if self.memory_budget is not None:
+            await self.memory_budget.release(self.memory_per_call_mb)
+        await self._release_slot()
+
+    async def _release_slot(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
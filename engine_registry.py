@@ -0,0 +1,95 @@
+import importlib
+import json
+import logging
+from typing import Dict, Any, List, NamedTuple, Optional
+
+from ocr_engine import OCREngine, ResourceProfile
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "multiocr.engines"
+
+
+class EngineSpec(NamedTuple):
+    name: str
+    target: str  # "module:Class"; the module is imported only when the engine is created
+    profile: Optional[ResourceProfile] = None  # overrides the class's resource_profile
+    options: Optional[Dict[str, Any]] = None
+
+
+# Built-in engines; plugins add more through entry points or a config file
+BUILTIN_ENGINES = {
+    "tesseract": EngineSpec("tesseract", "tesseract_engine:TesseractEngine"),
+}
+
+
+class EngineRegistry:
+    """Engines by name, from the built-ins, the 'multiocr.engines' entry point group and an optional JSON config.
+
+    Config file format (later sources override earlier ones by name):
+
+        {"engines": {"vision": {"class": "vision_engine:VisionEngine",
+                                "profile": {"kind": "io", "max_concurrency": 16, "memory_per_page_mb": 20},
+                                "options": {"timeout": 30}}}}
+    """
+
+    def __init__(self, config_path: Optional[str] = None, use_entry_points: bool = True):
+        self.specs: Dict[str, EngineSpec] = dict(BUILTIN_ENGINES)
+        if use_entry_points:
+            self._discover_entry_points()
+        if config_path:
+            self.load_config(config_path)
+
+    def _discover_entry_points(self):
+        from importlib.metadata import entry_points
+        try:
+            discovered = entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:
+            # Python < 3.10 returns a dict of groups
+            discovered = entry_points().get(ENTRY_POINT_GROUP, [])
+        for entry_point in discovered:
+            # Only the "module:Class" string is read here; nothing is imported until the engine is used
+            self.specs[entry_point.name] = EngineSpec(entry_point.name, entry_point.value)
+
+    def load_config(self, config_path: str):
+        with open(config_path, encoding='utf-8') as f:
+            config = json.load(f)
+        for name, entry in config.get("engines", {}).items():
+            if "class" not in entry:
+                raise ValueError(f"Engine '{name}' in {config_path} has no 'class' (\"module:Class\")")
+            profile = ResourceProfile(**entry["profile"]) if "profile" in entry else None
+            if profile is not None and profile.kind not in ("cpu", "io"):
+                raise ValueError(f"Engine '{name}' in {config_path}: profile kind must be 'cpu' or 'io'")
+            self.specs[name] = EngineSpec(name, entry["class"], profile, entry.get("options"))
+
+    def register(self, spec: EngineSpec):
+        self.specs[spec.name] = spec
+
+    def available(self) -> List[str]:
+        return sorted(self.specs)
+
+    def load_class(self, name: str) -> type:
+        try:
+            spec = self.specs[name]
+        except KeyError:
+            raise ValueError(f"Unknown OCR engine '{name}' (available: {', '.join(self.available())})")
+        module_name, _, class_name = spec.target.partition(":")
+        engine_class = getattr(importlib.import_module(module_name), class_name)
+        if not (isinstance(engine_class, type) and issubclass(engine_class, OCREngine)):
+            raise TypeError(f"{spec.target} is not an OCREngine subclass")
+        return engine_class
+
+    def create(self, name: str, engine_options: Optional[Dict[str, Any]] = None) -> OCREngine:
+        """Import and instantiate an engine; run options override the spec's defaults."""
+        engine_class = self.load_class(name)
+        spec = self.specs[name]
+        engine = engine_class({**(spec.options or {}), **(engine_options or {})})
+        if spec.profile is not None:
+            engine.resource_profile = spec.profile
+        logger.debug("Loaded OCR engine", extra={"engine": name, "resource_profile": engine.resource_profile._asdict()})
+        return engine
+
+
+def create_engines(names: List[str], engine_options: Dict[str, Any], config_path: Optional[str] = None) -> List[OCREngine]:
+    registry = EngineRegistry(config_path)
+    return [registry.create(name, engine_options) for name in names]
@@ -0,0 +1,67 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_memory_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def default_cache_path() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "multiocr", "engine_versions.json")
+
+
+def _load(cache_path: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        return entries if isinstance(entries, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _store(cache_path: str, entries: Dict[str, Dict[str, Any]]):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+        os.replace(temporary_path, cache_path)
+    except OSError as e:
+        # The cache is only an optimisation; a read-only home directory must not break OCR
+        logger.debug("Cannot write engine version cache %s: %s", cache_path, e)
+
+
+def get_binary_version(binary: str, probe: Callable[[], str], cache_path: Optional[str] = None) -> str:
+    """Return probe() for the binary, re-running it only when the resolved executable's size or mtime changes."""
+    resolved = shutil.which(binary)
+    if resolved is None:
+        # Let the probe raise its own "not installed" error
+        return probe()
+    resolved = os.path.realpath(resolved)
+    stat_result = os.stat(resolved)
+    signature = {"size": stat_result.st_size, "mtime_ns": stat_result.st_mtime_ns}
+    cache_path = cache_path or default_cache_path()
+
+    with _lock:
+        entry = _memory_cache.get(resolved)
+        if entry is None or entry["signature"] != signature:
+            entry = _load(cache_path).get(resolved)
+        if entry is not None and entry.get("signature") == signature:
+            _memory_cache[resolved] = entry
+            return entry["version"]
+
+    version = probe()
+    with _lock:
+        entry = {"signature": signature, "version": version}
+        _memory_cache[resolved] = entry
+        entries = _load(cache_path)
+        entries[resolved] = entry
+        _store(cache_path, entries)
+    logger.debug("Detected engine version", extra={"binary": resolved, "version": version})
+    return version
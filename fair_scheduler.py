@@ -0,0 +1,154 @@
+import heapq
+import os
+import time
+from collections import deque
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+
+class InputSource:
+    def __init__(self, path: str, weight: float = 1.0, priority: int = 0, name: Optional[str] = None):
+        if weight <= 0:
+            raise ValueError(f"Source weight must be positive, got {weight}")
+        self.path = path
+        self.weight = weight
+        self.priority = priority
+        self.name = name or os.path.basename(os.path.normpath(path)) or path
+        self.default_name = name is None
+        self.files_total = 0
+        self.files_done = 0
+        self.files_failed = 0
+        self.first_started_at: Optional[float] = None
+        self.last_finished_at: Optional[float] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "InputSource":
+        # "path", "path@weight" or "path@weight@priority"
+        parts = spec.split("@")
+        numeric = []
+        while len(parts) > 1 and len(numeric) < 2:
+            try:
+                numeric.insert(0, float(parts[-1]))
+            except ValueError:
+                break
+            parts.pop()
+        path = "@".join(parts)
+        weight = numeric[0] if numeric else 1.0
+        priority = int(numeric[1]) if len(numeric) > 1 else 0
+        return cls(path, weight, priority)
+
+    def mark_started(self):
+        if self.first_started_at is None:
+            self.first_started_at = time.time()
+
+    def mark_finished(self, failed: bool):
+        self.files_done += 1
+        if failed:
+            self.files_failed += 1
+        self.last_finished_at = time.time()
+
+    def get_stats(self) -> Dict[str, Any]:
+        files_per_sec = None
+        if self.first_started_at is not None and self.last_finished_at is not None:
+            elapsed = self.last_finished_at - self.first_started_at
+            if elapsed > 0:
+                files_per_sec = self.files_done / elapsed
+        return {
+            "path": self.path,
+            "weight": self.weight,
+            "priority": self.priority,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "files_failed": self.files_failed,
+            "files_per_sec": files_per_sec,
+        }
+
+
+def make_names_unique(sources: List[InputSource]):
+    """Lengthen default names that collide ('inbox' from a/inbox and b/inbox) to 'a/inbox' and 'b/inbox'.
+
+    Explicit names are left alone, so colliding explicit names still fail in add_source.
+    """
+    taken = {source.name for source in sources if not source.default_name}
+    clashing: Dict[str, List[InputSource]] = {}
+    for source in sources:
+        if source.default_name:
+            clashing.setdefault(source.name, []).append(source)
+    for name, group in clashing.items():
+        if len(group) == 1 and name not in taken:
+            continue
+        parts = {id(source): os.path.normpath(os.path.abspath(source.path)).split(os.sep) for source in group}
+        for depth in range(2, max(len(components) for components in parts.values()) + 1):
+            candidates = ["/".join(parts[id(source)][-depth:]) for source in group]
+            if len(set(candidates)) == len(candidates) and not taken.intersection(candidates):
+                break
+        for index, (source, candidate) in enumerate(zip(group, candidates)):
+            # The same path given twice is still two sources
+            source.name = candidate if candidates.count(candidate) == 1 else f"{candidate}#{index + 1}"
+        taken.update(source.name for source in group)
+
+
+class WeightedFairQueue:
+    """Start-time fair queuing across sources; higher priority tiers are always drained first."""
+
+    def __init__(self):
+        self._pending: Dict[str, deque] = {}
+        self._sources: Dict[str, InputSource] = {}
+        self._finish_tags: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._heap: List[Tuple[int, float, int, str]] = []
+        self._sequence = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def qsize(self) -> int:
+        return self._size
+
+    def add_source(self, source: InputSource, items: List[Any]):
+        if source.name in self._sources and self._sources[source.name] is not source:
+            raise ValueError(f"Duplicate input source name: {source.name}")
+        self._sources[source.name] = source
+        pending = self._pending.setdefault(source.name, deque())
+        was_idle = not pending
+        pending.extend(items)
+        source.files_total += len(items)
+        self._size += len(items)
+        if was_idle and pending:
+            self._schedule(source.name)
+
+    def _schedule(self, name: str):
+        source = self._sources[name]
+        # A source that went idle restarts at the current virtual time instead of banking credit
+        start_tag = max(self._virtual_time, self._finish_tags.get(name, 0.0))
+        self._finish_tags[name] = start_tag + 1.0 / source.weight
+        self._sequence += 1
+        heapq.heappush(self._heap, (-source.priority, start_tag, self._sequence, name))
+
+    def get_nowait(self) -> Tuple[InputSource, Any]:
+        if not self._heap:
+            raise IndexError("pop from an empty WeightedFairQueue")
+        _, start_tag, _, name = heapq.heappop(self._heap)
+        self._virtual_time = max(self._virtual_time, start_tag)
+        item = self._pending[name].popleft()
+        self._size -= 1
+        if self._pending[name]:
+            self._schedule(name)
+        return self._sources[name], item
+
+    @property
+    def sources(self) -> List[InputSource]:
+        return list(self._sources.values())
+
+
+def order_small_files_first(file_paths: List[str], size_of: Optional[Callable[[str], int]] = None) -> List[str]:
+    def stat_size(file_path: str) -> int:
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return 0
+
+    return sorted(file_paths, key=size_of or stat_size)
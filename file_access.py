@@ -0,0 +1,39 @@
+import hashlib
+from typing import BinaryIO, Iterator
+
+from archive_input import open_input
+
+# Large enough to amortize syscalls, small enough that RSS stays flat for multi-GB inputs
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+
+def iter_chunks(path: str, buffer_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[memoryview]:
+    """Stream a file or archive member as memoryviews over one reused buffer.
+
+    Each chunk is only valid until the next one is requested; copy it (bytes(chunk)) to keep it.
+    """
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open_input(path) as f:
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            yield view[:count]
+
+
+def hash_input(path: str, algorithm: str = "sha256", buffer_size: int = DEFAULT_BUFFER_SIZE) -> str:
+    """Hex digest of a file or archive member, computed incrementally."""
+    digest = hashlib.new(algorithm)
+    for chunk in iter_chunks(path, buffer_size):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_input(path: str, destination: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> int:
+    copied = 0
+    for chunk in iter_chunks(path, buffer_size):
+        destination.write(chunk)
+        copied += len(chunk)
+    return copied
+
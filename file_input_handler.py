@@ -1,18 +1,54 @@
+import logging
 import os
-from typing import List, Dict, Any
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from ocr_engine import OCREngineError
+from archive_input import (
+    is_archive_file, is_archive_member, iter_archive_members, pin_archive_members, split_archive_path, stat_input
+)
+from file_access import DEFAULT_BUFFER_SIZE, hash_input
+
+logger = logging.getLogger(__name__)
 
 class FileInputHandler:
-    def __init__(self, input_path: str, supported_file_types: List[str], max_depth: int = 6):
+    def __init__(self, input_path: str, supported_file_types: List[str], max_depth: int = 6, stat_workers: int = 0,
+                 expand_archives: bool = False, content_hash: Optional[str] = None, read_buffer_size: int = DEFAULT_BUFFER_SIZE):
         self.input_path = input_path
         self.supported_file_types = supported_file_types
         self.max_depth = max_depth
+        # ZIP/TAR files are treated as directories one level below where they sit
+        self.expand_archives = expand_archives
+        # With stat_workers > 0, stats are collected concurrently after the walk (useful on NFS)
+        self.stat_workers = stat_workers
+        self.file_stats: Dict[str, os.stat_result] = {}
+        # Hash algorithm (e.g. 'sha256') for a content hash in the metadata; inputs are streamed, never loaded whole
+        self.content_hash = content_hash
+        self.read_buffer_size = read_buffer_size
 
     def get_files_to_process(self) -> List[str]:
-        if os.path.isfile(self.input_path):
-            return [self.input_path] if self._is_supported_file(self.input_path) else []
-        elif os.path.isdir(self.input_path):
-            return self._get_files_from_directory(self.input_path)
+        try:
+            input_stat = os.stat(self.input_path)
+        except OSError:
+            raise OCREngineError(f"Invalid input path: {self.input_path}", "Input Validation", "error")
+
+        if os.path.isabs(self.input_path):
+            root = self.input_path
+        else:
+            root = os.path.abspath(self.input_path)
+
+        if stat.S_ISREG(input_stat.st_mode):
+            if self.expand_archives and is_archive_file(root):
+                return self._get_files_from_archive(root, 0)
+            if not self._is_supported_file(root):
+                return []
+            self.file_stats[root] = input_stat
+            return [root]
+        elif stat.S_ISDIR(input_stat.st_mode):
+            files_to_process = self._get_files_from_directory(root)
+            if self.stat_workers:
+                self.prefetch_stats(files_to_process)
+            return files_to_process
         else:
             raise OCREngineError(f"Invalid input path: {self.input_path}", "Input Validation", "error")
 
@@ -22,25 +58,109 @@ class FileInputHandler:
 
     def _get_files_from_directory(self, directory: str, current_depth: int = 0) -> List[str]:
         if current_depth > self.max_depth:
+            logger.debug("Skipping directory beyond max depth", extra={"directory": directory, "depth": current_depth})
+            return []
+
+        files_to_process = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                # is_file()/is_dir() come from the directory listing; stat() is the only extra syscall
+                if entry.is_file() and self._is_supported_file(entry.name):
+                    files_to_process.append(entry.path)
+                    if not self.stat_workers:
+                        try:
+                            self.file_stats[entry.path] = entry.stat()
+                        except OSError:
+                            pass
+                elif self.expand_archives and is_archive_file(entry.name) and entry.is_file():
+                    files_to_process.extend(self._get_files_from_archive(entry.path, current_depth))
+                elif entry.is_dir():
+                    files_to_process.extend(self._get_files_from_directory(entry.path, current_depth + 1))
+        return files_to_process
+
+    def _get_files_from_archive(self, archive_path: str, current_depth: int) -> List[str]:
+        # The archive counts as one directory level; its internal folders count like real ones
+        max_member_depth = self.max_depth - (current_depth + 1)
+        if max_member_depth < 0:
             return []
 
         files_to_process = []
-        for entry in os.scandir(directory):
-            if entry.is_file() and self._is_supported_file(entry.path):
-                files_to_process.append(entry.path)
-            elif entry.is_dir():
-                files_to_process.extend(self._get_files_from_directory(entry.path, current_depth + 1))
+        try:
+            for member_path, member_stat in iter_archive_members(archive_path, self.supported_file_types, max_member_depth):
+                files_to_process.append(member_path)
+                self.file_stats[member_path] = member_stat
+        except Exception as e:
+            logger.warning("Skipping unreadable archive %s: %s", archive_path, e)
+        # Pinned before the next archive is opened, so discovering many compressed tarballs does not
+        # evict (and later decompress again) the first ones; the caller releases every returned member
+        pin_archive_members(files_to_process)
         return files_to_process
 
+    def expand_path(self, file_path: str) -> List[str]:
+        """Files to process for one path reported by a folder watcher, honouring filters and max_depth."""
+        root = os.path.abspath(self.input_path)
+        relative_path = os.path.relpath(file_path, root)
+        if relative_path.startswith(os.pardir):
+            return []
+        current_depth = relative_path.count(os.sep)
+        if current_depth > self.max_depth:
+            return []
+        if self.expand_archives and is_archive_file(file_path):
+            return self._get_files_from_archive(file_path, current_depth)
+        return [file_path] if self._is_supported_file(file_path) else []
+
+    def prefetch_stats(self, file_paths: List[str]):
+        missing = [file_path for file_path in file_paths if file_path not in self.file_stats]
+        with ThreadPoolExecutor(max_workers=self.stat_workers or 8) as executor:
+            for file_path, stat_result in zip(missing, executor.map(self._stat_or_none, missing)):
+                if stat_result is not None:
+                    self.file_stats[file_path] = stat_result
+
+    @staticmethod
+    def _stat_or_none(file_path: str) -> Optional[os.stat_result]:
+        try:
+            return stat_input(file_path)
+        except OSError:
+            return None
+
+    def get_file_stat(self, file_path: str) -> os.stat_result:
+        stat_result = self.file_stats.get(file_path)
+        if stat_result is None:
+            try:
+                stat_result = stat_input(file_path)
+            except FileNotFoundError:
+                raise OCREngineError(f"File not found: {file_path}", "File System", "error")
+            except OSError as e:
+                raise OCREngineError(f"Cannot stat file {file_path}: {e}", "File System", "error")
+            self.file_stats[file_path] = stat_result
+        return stat_result
+
+    def get_file_size(self, file_path: str) -> int:
+        try:
+            return self.get_file_stat(file_path).st_size
+        except OCREngineError:
+            return 0
+
     def extract_metadata(self, file_path: str) -> Dict[str, Any]:
-        if not os.path.exists(file_path):
-            raise OCREngineError(f"File not found: {file_path}", "File System", "error")
-        
-        return {
+        stat_result = self.get_file_stat(file_path)
+        # Metadata is extracted once per file; release the cached stat so long runs stay lean
+        self.file_stats.pop(file_path, None)
+
+        logger.debug("Extracting metadata", extra={"file_path": file_path})
+        metadata = {
             "file_name": os.path.basename(file_path),
-            "file_path": os.path.abspath(file_path),
-            "file_size": os.path.getsize(file_path),
-            "creation_time": os.path.getctime(file_path),
-            "modification_time": os.path.getmtime(file_path),
+            "file_path": file_path if os.path.isabs(file_path) else os.path.abspath(file_path),
+            "file_size": stat_result.st_size,
+            "creation_time": stat_result.st_ctime,
+            "modification_time": stat_result.st_mtime,
             "file_type": os.path.splitext(file_path)[1].lower()
         }
+        if is_archive_member(file_path):
+            metadata["archive_path"], metadata["archive_member"] = split_archive_path(metadata["file_path"])
+        if self.content_hash:
+            try:
+                metadata["content_hash"] = hash_input(file_path, self.content_hash, self.read_buffer_size)
+            except OSError as e:
+                raise OCREngineError(f"Cannot read file {file_path}: {e}", "File System", "error")
+            metadata["hash_algorithm"] = self.content_hash
+        return metadata
@@ -0,0 +1,299 @@
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class FileDebouncer:
+    """Holds candidate paths until their size and mtime stop changing, so partial writes are not picked up."""
+
+    def __init__(self, on_ready: Callable[[str], None], settle_seconds: float = 2.0):
+        self.on_ready = on_ready
+        self.settle_seconds = settle_seconds
+        self._pending: Dict[str, Tuple[Optional[Tuple[int, int]], float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, path: str):
+        # Any new event restarts the settle timer
+        self._pending[path] = (None, time.monotonic())
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        interval = max(0.05, self.settle_seconds / 2)
+        while True:
+            await asyncio.sleep(interval)
+            if self._pending:
+                # Only the stat calls leave the loop thread; touch() keeps writing _pending meanwhile
+                checked = dict(self._pending)
+                signatures = await asyncio.to_thread(_stat_signatures, list(checked))
+                for path in self._settle(checked, signatures):
+                    self.on_ready(path)
+
+    def _settle(self, checked: Dict[str, Tuple[Optional[Tuple[int, int]], float]],
+                signatures: Dict[str, Optional[Tuple[int, int]]]) -> List[str]:
+        now = time.monotonic()
+        ready = []
+        for path, signature in signatures.items():
+            if self._pending.get(path) is not checked[path]:
+                # Touched again while being checked: the newer event wins
+                continue
+            last_signature, last_change = checked[path]
+            if signature is None:
+                # Deleted or renamed away before it settled
+                del self._pending[path]
+            elif signature != last_signature:
+                self._pending[path] = (signature, now)
+            elif now - last_change >= self.settle_seconds:
+                del self._pending[path]
+                ready.append(path)
+        return ready
+
+
+def _stat_signatures(paths: List[str]) -> Dict[str, Optional[Tuple[int, int]]]:
+    signatures = {}
+    for path in paths:
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            signatures[path] = None
+            continue
+        signatures[path] = (stat_result.st_size, stat_result.st_mtime_ns)
+    return signatures
+
+
+def _directory_depth(root: str, directory: str) -> int:
+    relative_path = os.path.relpath(directory, root)
+    return 0 if relative_path == os.curdir else relative_path.count(os.sep) + 1
+
+
+def _scan_tree(root: str, max_depth: int) -> Dict[str, Tuple[int, int]]:
+    snapshot = {}
+    stack = [(root, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat_result = entry.stat()
+                            snapshot[entry.path] = (stat_result.st_size, stat_result.st_mtime_ns)
+                        elif entry.is_dir() and depth < max_depth:
+                            stack.append((entry.path, depth + 1))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return snapshot
+
+
+class PollingWatcher:
+    """Portable fallback: periodically diff a (size, mtime) snapshot of the tree."""
+
+    def __init__(self, root: str, on_candidate: Callable[[str], None], max_depth: int = 6, poll_interval: float = 5.0):
+        self.root = root
+        self.on_candidate = on_candidate
+        self.max_depth = max_depth
+        self.poll_interval = poll_interval
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        # Baseline only; files already present are handled by the caller's initial scan
+        self._snapshot = await asyncio.to_thread(_scan_tree, self.root, self.max_depth)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            snapshot = await asyncio.to_thread(_scan_tree, self.root, self.max_depth)
+            for path, signature in snapshot.items():
+                if self._snapshot.get(path) != signature:
+                    self.on_candidate(path)
+            self._snapshot = snapshot
+
+
+class InotifyWatcher:
+    """Event-driven watcher using Linux inotify through libc, with one watch per directory."""
+
+    def __init__(self, root: str, on_candidate: Callable[[str], None], max_depth: int = 6):
+        self.root = root
+        self.on_candidate = on_candidate
+        self.max_depth = max_depth
+        self._libc = _load_libc()
+        self._fd = -1
+        self._watches: Dict[int, str] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._buffer = b""
+
+    @staticmethod
+    def is_supported() -> bool:
+        return sys.platform.startswith("linux") and _load_libc() is not None
+
+    async def start(self):
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._loop = asyncio.get_running_loop()
+        await asyncio.to_thread(self._add_tree, self.root)
+        self._loop.add_reader(self._fd, self._read_events)
+
+    async def stop(self):
+        if self._fd >= 0:
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = -1
+            self._watches.clear()
+
+    def _add_watch(self, directory: str) -> bool:
+        watch_descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if watch_descriptor < 0:
+            logger.warning("Cannot watch directory %s: %s", directory, os.strerror(ctypes.get_errno()))
+            return False
+        self._watches[watch_descriptor] = directory
+        return True
+
+    def _add_tree(self, directory: str, report_files: bool = False):
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            if _directory_depth(self.root, current) > self.max_depth or not self._add_watch(current):
+                continue
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif report_files and entry.is_file():
+                            # Files created before the new directory's watch was in place
+                            self._report(entry.path)
+            except OSError:
+                continue
+
+    def _rescan(self):
+        for path in _scan_tree(self.root, self.max_depth):
+            self._report(path)
+
+    def _report(self, path: str):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self.on_candidate, path)
+
+    def _read_events(self):
+        try:
+            self._buffer += os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(self._buffer):
+            watch_descriptor, mask, _, name_length = _EVENT_HEADER.unpack_from(self._buffer, offset)
+            end = offset + _EVENT_HEADER.size + name_length
+            if end > len(self._buffer):
+                break
+            name = self._buffer[offset + _EVENT_HEADER.size:end].rstrip(b"\0")
+            offset = end
+            self._handle_event(watch_descriptor, mask, os.fsdecode(name))
+        self._buffer = self._buffer[offset:]
+
+    def _handle_event(self, watch_descriptor: int, mask: int, name: str):
+        if mask & IN_Q_OVERFLOW:
+            logger.warning("inotify queue overflowed; rescanning %s", self.root)
+            self._loop.run_in_executor(None, self._rescan)
+            return
+        if mask & IN_IGNORED:
+            self._watches.pop(watch_descriptor, None)
+            return
+
+        directory = self._watches.get(watch_descriptor)
+        if directory is None or not name:
+            return
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._loop.run_in_executor(None, self._add_tree, path, True)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE):
+            self.on_candidate(path)
+
+
+_libc_cache: List[Optional[ctypes.CDLL]] = []
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    if not _libc_cache:
+        libc = None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        except (OSError, AttributeError):
+            libc = None
+        _libc_cache.append(libc)
+    return _libc_cache[0]
+
+
+class FolderWatcher:
+    """Reports files under root once they have been created or modified and have stopped changing."""
+
+    def __init__(self, root: str, on_file_ready: Callable[[str], None], max_depth: int = 6,
+                 settle_seconds: float = 2.0, poll_interval: float = 5.0, use_inotify: bool = True):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.debouncer = FileDebouncer(on_file_ready, settle_seconds)
+        if use_inotify and InotifyWatcher.is_supported():
+            self.backend = InotifyWatcher(root, self.debouncer.touch, max_depth)
+        else:
+            self.backend = PollingWatcher(root, self.debouncer.touch, max_depth, poll_interval)
+
+    async def start(self):
+        try:
+            await self.backend.start()
+        except OSError as e:
+            # e.g. fs.inotify.max_user_watches exhausted
+            logger.warning("inotify unavailable for %s (%s); falling back to polling", self.root, e)
+            await self.backend.stop()
+            self.backend = PollingWatcher(self.root, self.debouncer.touch, self.backend.max_depth, self.poll_interval)
+            await self.backend.start()
+        self.debouncer.start()
+        logger.info("Watching folder", extra={"root": self.root, "backend": type(self.backend).__name__})
+
+    async def stop(self):
+        await self.backend.stop()
+        await self.debouncer.stop()
@@ -0,0 +1,76 @@
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Script names as reported by Tesseract's OSD for each traineddata language
+LANGUAGE_SCRIPTS = {
+    "eng": "Latin", "deu": "Latin", "fra": "Latin", "spa": "Latin", "ita": "Latin", "por": "Latin",
+    "nld": "Latin", "pol": "Latin", "ces": "Latin", "swe": "Latin", "dan": "Latin", "nor": "Latin",
+    "fin": "Latin", "tur": "Latin", "ron": "Latin", "hun": "Latin", "vie": "Latin", "ind": "Latin",
+    "rus": "Cyrillic", "ukr": "Cyrillic", "bul": "Cyrillic", "srp": "Cyrillic",
+    "ell": "Greek", "ara": "Arabic", "fas": "Arabic", "urd": "Arabic", "heb": "Hebrew",
+    "hin": "Devanagari", "mar": "Devanagari", "tha": "Thai", "kor": "Hangul",
+    "chi_sim": "Han", "chi_tra": "Han", "jpn": "Japanese",
+}
+
+# Frequent function words; a handful of hits is enough to tell languages of one script apart
+STOPWORDS = {
+    "eng": {"the", "and", "of", "to", "in", "is", "that", "for", "it", "with", "as", "was", "on", "are", "this", "by", "be", "from"},
+    "deu": {"der", "die", "und", "das", "ist", "nicht", "mit", "den", "von", "sich", "auf", "ein", "eine", "dem", "für", "auch", "wird"},
+    "fra": {"le", "la", "les", "et", "des", "est", "une", "du", "que", "pour", "dans", "pas", "sur", "qui", "au", "avec", "sont"},
+    "spa": {"el", "la", "los", "las", "y", "que", "del", "en", "por", "una", "con", "para", "es", "se", "su", "al", "como"},
+    "ita": {"il", "di", "che", "la", "e", "per", "del", "della", "un", "una", "non", "sono", "con", "gli", "nel", "le", "si"},
+    "por": {"o", "os", "as", "que", "não", "uma", "do", "da", "dos", "das", "em", "para", "com", "se", "por", "é", "mais"},
+    "nld": {"de", "het", "een", "en", "van", "is", "dat", "niet", "op", "te", "zijn", "voor", "met", "die", "ook", "aan"},
+    "pol": {"i", "w", "nie", "się", "na", "jest", "że", "do", "to", "z", "jak", "ale", "od", "po", "co", "są"},
+    "rus": {"и", "в", "не", "на", "что", "с", "по", "это", "как", "для", "из", "он", "к", "но", "от", "за"},
+    "ukr": {"і", "в", "не", "на", "що", "з", "це", "як", "до", "та", "для", "від", "за", "але", "його", "її"},
+}
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def candidate_languages(lang: str) -> List[str]:
+    """The languages of a Tesseract lang string such as 'eng+deu+fra'."""
+    return [language for language in lang.split("+") if language]
+
+
+def languages_for_script(script: Optional[str], candidates: List[str]) -> List[str]:
+    # Unknown scripts (and languages we have no script for) keep every candidate
+    matching = [language for language in candidates if LANGUAGE_SCRIPTS.get(language) == script]
+    return matching or list(candidates)
+
+
+def spans_several_scripts(candidates: List[str]) -> bool:
+    return len({LANGUAGE_SCRIPTS.get(language, language) for language in candidates}) > 1
+
+
+def osd_image(image: "Image.Image", max_side: int = 2000) -> "Image.Image":
+    # OSD only needs enough resolution to see glyph shapes
+    factor = -(-max(image.size) // max_side)
+    return image.reduce(factor) if factor > 1 else image
+
+
+def parse_osd(osd: Dict[str, Any]) -> Tuple[Optional[str], float]:
+    """(script, confidence) from pytesseract image_to_osd(output_type=DICT)."""
+    return osd.get("script"), float(osd.get("script_conf") or 0.0)
+
+
+def guess_language(text: str, candidates: List[str], min_hits: int = 3) -> Optional[str]:
+    """The candidate whose stopwords occur most often in the text, or None when there is too little evidence."""
+    words = Counter(word.lower() for word in _WORD.findall(text))
+    scores = {
+        language: sum(count for word, count in words.items() if word in STOPWORDS[language])
+        for language in candidates if language in STOPWORDS
+    }
+    if not scores:
+        return None
+    best = max(scores, key=lambda language: (scores[language], -candidates.index(language)))
+    ranked = sorted(scores.values(), reverse=True)
+    # Require a clear winner: shared stopwords ("la", "de", "in") must not decide it
+    if scores[best] < min_hits or (len(ranked) > 1 and scores[best] < 1.5 * ranked[1]):
+        return None
+    return best
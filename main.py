@@ -1,28 +1,243 @@
 import asyncio
 import argparse
+import hashlib
+import logging
+import os
+import signal
+import sys
+from typing import List
 from ocr_engine_manager import OCREngineManager
-from tesseract_engine import TesseractEngine
+from output_formatter import OUTPUT_LAYOUTS
+from result_compression import COMPRESSION_SUFFIXES
+from status_server import StatusServer
+from fair_scheduler import InputSource
+from search_index import SearchIndex
+from columnar_export import ColumnarExporter, EXPORT_FORMATS
+from structured_logging import setup_logging
+from ocr_daemon import submit_job
+from run_profiler import RunProfiler
+from retry_policy import RetryPolicy, DeadLetterQueue
+from engine_registry import EngineRegistry
 
-async def main(input_path: str, output_dir: str, max_depth: int):
+async def main(input_paths: List[str], output_dir: str, max_depth: int, max_concurrency: int, *,
+               page_timeout: float = None, status_port: int = None, small_files_first: bool = False,
+               index_db: str = None, output_layout: str = 'flat', compression: str = 'none',
+               zstd_dictionary: str = None, export_prefix: str = None, export_format: str = 'parquet',
+               stat_workers: int = 0, expand_archives: bool = False, watch: bool = False,
+               settle_seconds: float = 2.0, poll_interval: float = 5.0, use_inotify: bool = True,
+               tile_size: int = None, profile_prefix: str = None, profile_sample_rate: float = 0.1,
+               profile_top: int = 20, consensus: bool = False, tesseract_configs: List[str] = None,
+               max_attempts: int = 3, retry_base_delay: float = 1.0, dead_letter_path: str = None,
+               retry_failed: bool = False, lang: str = 'eng', detect_language: bool = False, content_hash: str = None,
+               engine_names: List[str] = None, engine_config: str = None, skip_blank_pages: bool = False,
+               archive_spool_dir: str = None):
     # Initialize OCREngineManager
-    manager = OCREngineManager(output_dir)
+    search_index = SearchIndex(index_db) if index_db else None
+    manager = OCREngineManager(
+        output_dir, max_concurrency, search_index, output_layout, compression, zstd_dictionary, stat_workers, expand_archives,
+        content_hash, archive_spool_dir
+    )
+    manager.set_retry_policy(RetryPolicy(max_attempts, retry_base_delay))
+    dead_letters = DeadLetterQueue(dead_letter_path or os.path.join(output_dir, "failed_files.jsonl"))
+    manager.attach_dead_letter_queue(dead_letters)
+    exporter = ColumnarExporter(export_prefix, export_format) if export_prefix else None
+    if exporter is not None:
+        manager.register_result_sink(exporter)
 
-    # Register Tesseract engine
-    tesseract_engine = TesseractEngine()
-    manager.register_engine(tesseract_engine)
+    # Engines come from the registry and are imported only when selected
+    engine_options = {'lang': lang}
+    if detect_language:
+        engine_options['language_detection'] = True
+    if page_timeout:
+        engine_options['timeout'] = page_timeout
+        engine_options['timeout_fallback_scale'] = 0.5
+    if tile_size:
+        engine_options['tile_size'] = tile_size
+    if skip_blank_pages:
+        engine_options['blank_detection'] = True
+    if consensus:
+        # Per-word confidences are what the consensus vote weighs
+        engine_options['word_confidences'] = True
+    registry = EngineRegistry(engine_config)
+    for engine_name in engine_names or ["tesseract"]:
+        manager.register_engine(registry.create(engine_name, engine_options))
+    for spec in tesseract_configs or []:
+        name, _, config = spec.partition("=")
+        manager.register_engine(registry.create("tesseract", {**engine_options, 'name': f"Tesseract[{name}]", 'config': config}))
+    if consensus:
+        manager.enable_consensus()
 
-    # Process files
-    await manager.process_files(input_path, max_depth)
+    profiler = RunProfiler(profile_prefix, profile_sample_rate, profile_top) if profile_prefix else None
+    if profiler is not None:
+        manager.attach_profiler(profiler)
+        profiler.start()
+
+    # Process files from every input source, optionally exposing live progress over HTTP
+    sources = [InputSource.parse(spec) for spec in input_paths]
+    if retry_failed:
+        run = manager.retry_dead_letters()
+    elif watch:
+        # Run as a daemon until SIGINT/SIGTERM; in-flight files are finished before exiting
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, stop_event.set)
+        run = manager.watch_sources(sources, max_depth, stop_event, settle_seconds, poll_interval, use_inotify)
+    else:
+        run = manager.process_sources(sources, max_depth, small_files_first)
+    if status_port is not None:
+        async with StatusServer(manager, port=status_port):
+            await run
+    else:
+        await run
+
+    if search_index is not None:
+        search_index.close()
+    if exporter is not None:
+        exporter.close()
+    if profiler is not None:
+        profiler.stop()
 
     # Print overall health
     print(f"Overall system health: {manager.get_overall_health()}")
+    if dead_letters.entries:
+        print(f"{len(dead_letters.entries)} file(s) failed; rerun with --retry-failed to retry them ({dead_letters.path})")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="MultiOCR System")
-    parser.add_argument("input_path", help="Path to input file or directory")
+    parser.add_argument("input_paths", nargs="*", metavar="input_path",
+                        help="Path to input file or directory, optionally suffixed @WEIGHT or @WEIGHT@PRIORITY (higher priority is drained first)")
     parser.add_argument("--output", default="ocr_output", help="Output directory for OCR results")
+    parser.add_argument("--output-layout", default="flat", choices=OUTPUT_LAYOUTS,
+                        help="flat: by file name (legacy); mirror: mirror the input tree; sharded: hash-prefixed subdirectories")
+    parser.add_argument("--compression", default="none", choices=list(COMPRESSION_SUFFIXES),
+                        help="Compress result and metadata files (read back with result_compression.load_result)")
+    parser.add_argument("--zstd-dictionary", help="Shared zstd dictionary trained with 'result_compression.py train'")
     parser.add_argument("--max-depth", type=int, default=6, help="Maximum depth for directory traversal")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Maximum number of files processed concurrently")
+    parser.add_argument("--page-timeout", type=float, help="Per-page OCR timeout in seconds (retried once at half resolution)")
+    parser.add_argument("--tile-size", type=int,
+                        help="OCR pages larger than 1.5x this many pixels as overlapping tiles in parallel (large drawings, newspapers)")
+    parser.add_argument("--skip-blank-pages", action="store_true",
+                        help="Do not OCR pages with no line of ink (separator sheets, blank backs of duplex scans)")
+    parser.add_argument("--status-port", type=int, help="Serve live run status and metrics over HTTP on this port")
+    parser.add_argument("--stat-workers", type=int, default=0,
+                        help="Collect file metadata with this many concurrent threads (helps on network filesystems)")
+    parser.add_argument("--hash-inputs", nargs="?", const="sha256", choices=sorted(hashlib.algorithms_guaranteed),
+                        metavar="ALGORITHM", help="Record a content hash of every input in its metadata (default algorithm: sha256)")
+    parser.add_argument("--archives", action="store_true",
+                        help="Read ZIP/TAR files as directories, streaming members without extracting them")
+    parser.add_argument("--archive-spool-dir",
+                        help="With --archives, decompress .tar.gz/.tar.bz2/.tar.xz inputs here (default: system temp directory)")
+    parser.add_argument("--small-files-first", action="store_true", help="Process smaller files first within each input source")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and process files as they appear or change in the input directories")
+    parser.add_argument("--settle-seconds", type=float, default=2.0,
+                        help="In watch mode, wait until a file has not changed for this long before processing it")
+    parser.add_argument("--poll-interval", type=float, default=5.0,
+                        help="In watch mode, rescan interval when inotify is unavailable")
+    parser.add_argument("--no-inotify", action="store_true", help="In watch mode, always poll instead of using inotify")
+    parser.add_argument("--index-db", help="Add results to this SQLite full-text index as they are produced")
+    parser.add_argument("--export-prefix", help="Also stream page/word results to <prefix>_pages/_words columnar files")
+    parser.add_argument("--export-format", default="parquet", choices=list(EXPORT_FORMATS), help="Columnar export format")
+    parser.add_argument("--profile", nargs="?", const="multiocr_profile", metavar="PREFIX",
+                        help="Time every file's stages and sample stacks of some files; writes PREFIX.collapsed "
+                             "(flame graph input) and PREFIX_report.json (slowest files)")
+    parser.add_argument("--profile-sample-rate", type=float, default=0.1,
+                        help="Fraction of files whose stacks are sampled when profiling")
+    parser.add_argument("--profile-top", type=int, default=20, help="Number of slowest files to report when profiling")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="Maximum attempts per engine and file for retryable errors (1 disables retries)")
+    parser.add_argument("--retry-base-delay", type=float, default=1.0,
+                        help="Initial retry backoff in seconds, doubled on each attempt")
+    parser.add_argument("--dead-letter", help="File recording files that still failed after retries "
+                                              "(default: <output>/failed_files.jsonl)")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Reprocess only the files recorded in the dead-letter file instead of scanning inputs")
+    parser.add_argument("--engine", action="append", dest="engines", metavar="NAME",
+                        help="OCR engine to run, repeatable (default: tesseract); see --engine-config for adding engines")
+    parser.add_argument("--engine-config",
+                        help="JSON file declaring extra engines and their resource profiles (see engine_registry.py)")
+    parser.add_argument("--lang", default="eng", help="Tesseract language(s), e.g. 'eng+deu+fra+spa'")
+    parser.add_argument("--detect-language", action="store_true",
+                        help="With several --lang languages, OCR each page with only the one it is written in")
+    parser.add_argument("--tesseract-config", action="append", default=[], metavar="NAME=CONFIG",
+                        help="Also run Tesseract with these extra options (e.g. 'psm6=--psm 6'); repeatable")
+    parser.add_argument("--consensus", action="store_true",
+                        help="Merge the results of all engines/configurations into an extra 'consensus' entry")
+    parser.add_argument("--daemon-socket",
+                        help="Submit the job to a resident 'ocr_daemon.py' on this socket (runs locally if none is listening)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Logging verbosity")
+    parser.add_argument("--log-file", help="Write JSON logs to this file instead of stderr")
 
     args = parser.parse_args()
+    setup_logging(getattr(logging, args.log_level), args.log_file)
+    if not args.input_paths and not args.retry_failed:
+        parser.error("at least one input_path is required unless --retry-failed is given")
+    if args.retry_failed and args.watch:
+        parser.error("--retry-failed cannot be combined with --watch")
+    for spec in args.tesseract_config:
+        if not spec.partition("=")[0] or "=" not in spec:
+            parser.error(f"--tesseract-config expects NAME=CONFIG, got {spec!r}")
+
+    if args.daemon_socket:
+        local_only = {
+            "--watch": args.watch, "--status-port": args.status_port is not None, "--page-timeout": args.page_timeout,
+            "--tile-size": args.tile_size, "--profile": args.profile, "--consensus": args.consensus,
+            "--tesseract-config": args.tesseract_config, "--retry-failed": args.retry_failed,
+            "--lang": args.lang != "eng", "--detect-language": args.detect_language,
+            "--engine": args.engines, "--engine-config": args.engine_config,
+            "--skip-blank-pages": args.skip_blank_pages,
+        }
+        conflicting = [flag for flag, used in local_only.items() if used]
+        if conflicting:
+            parser.error(f"--daemon-socket cannot be combined with {', '.join(conflicting)} "
+                         "(engine options are set when the daemon starts)")
+        # The daemon has its own working directory, so every path is sent absolute
+        sources = [InputSource.parse(spec) for spec in args.input_paths]
+        job = {
+            "command": "run",
+            "sources": [{"path": os.path.abspath(source.path), "weight": source.weight, "priority": source.priority}
+                        for source in sources],
+            "output_dir": os.path.abspath(args.output),
+            "output_layout": args.output_layout,
+            "compression": args.compression,
+            "zstd_dictionary": os.path.abspath(args.zstd_dictionary) if args.zstd_dictionary else None,
+            "max_depth": args.max_depth,
+            "max_concurrency": args.max_concurrency,
+            "stat_workers": args.stat_workers,
+            "expand_archives": args.archives,
+            "content_hash": args.hash_inputs,
+            "archive_spool_dir": os.path.abspath(args.archive_spool_dir) if args.archive_spool_dir else None,
+            "max_attempts": args.max_attempts,
+            "retry_base_delay": args.retry_base_delay,
+            "dead_letter_path": os.path.abspath(args.dead_letter) if args.dead_letter else None,
+            "small_files_first": args.small_files_first,
+            "index_db": os.path.abspath(args.index_db) if args.index_db else None,
+            "export_prefix": os.path.abspath(args.export_prefix) if args.export_prefix else None,
+            "export_format": args.export_format,
+        }
+        try:
+            response = submit_job(job, args.daemon_socket)
+        except OSError as e:
+            logging.getLogger(__name__).warning("OCR daemon unavailable (%s); running locally", e)
+        else:
+            if not response.get("ok"):
+                sys.exit(f"OCR daemon job failed: {response.get('error')}")
+            print(f"Overall system health: {response['overall_health']}")
+            sys.exit(0)
 
-    asyncio.run(main(args.input_path, args.output, args.max_depth))
+    asyncio.run(main(
+        args.input_paths, args.output, args.max_depth, args.max_concurrency,
+        page_timeout=args.page_timeout, status_port=args.status_port, small_files_first=args.small_files_first,
+        index_db=args.index_db, output_layout=args.output_layout, compression=args.compression,
+        zstd_dictionary=args.zstd_dictionary, export_prefix=args.export_prefix, export_format=args.export_format,
+        stat_workers=args.stat_workers, expand_archives=args.archives, archive_spool_dir=args.archive_spool_dir,
+        watch=args.watch, settle_seconds=args.settle_seconds, poll_interval=args.poll_interval,
+        use_inotify=not args.no_inotify, tile_size=args.tile_size, profile_prefix=args.profile,
+        profile_sample_rate=args.profile_sample_rate, profile_top=args.profile_top, consensus=args.consensus,
+        tesseract_configs=args.tesseract_config, max_attempts=args.max_attempts, retry_base_delay=args.retry_base_delay,
+        dead_letter_path=args.dead_letter, retry_failed=args.retry_failed, lang=args.lang,
+        detect_language=args.detect_language, content_hash=args.hash_inputs, engine_names=args.engines,
+        engine_config=args.engine_config, skip_blank_pages=args.skip_blank_pages,
+    ))
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Any, List, Optional, Tuple
+
+from ocr_engine import OCREngine, OCREngineError
+from engine_health import AdaptiveLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-file requests for one engine into run_ocr_batch calls.
+
+    A batch is dispatched once it is full or max_wait has passed since its first request, and only
+    when the engine's limiter grants a slot; under load, requests keep joining while batches wait
+    for a slot, so batch size grows with demand and idle latency stays at most max_wait.
+    """
+
+    def __init__(self, engine: OCREngine, limiter: AdaptiveLimiter, max_batch_size: int, max_wait: float = 0.01):
+        self.engine = engine
+        self.limiter = limiter
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.batches_dispatched = 0
+        self.files_dispatched = 0
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight = set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, file_path: str) -> Any:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((file_path, future))
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+        return await future
+
+    async def _dispatch_loop(self):
+        while True:
+            await self._has_pending.wait()
+            if len(self._pending) < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+            await self.limiter.acquire()
+            # Requests that arrived while waiting for a slot ride along
+            batch = [(path, future) for path, future in self._pending[:self.max_batch_size] if not future.done()]
+            del self._pending[:self.max_batch_size]
+            if len(self._pending) < self.max_batch_size:
+                self._batch_full.clear()
+            if not self._pending:
+                self._has_pending.clear()
+            if not batch:
+                await self.limiter.release()
+                continue
+            task = asyncio.create_task(self._run_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            self.batches_dispatched += 1
+            self.files_dispatched += len(batch)
+            try:
+                outcomes = await self.engine.run_ocr_batch([path for path, _ in batch])
+            except Exception as e:
+                error = e if isinstance(e, OCREngineError) else OCREngineError(
+                    f"Unexpected error in {self.engine.get_engine_name()}: {str(e)}", "OCR Engine", "error"
+                )
+                outcomes = [error] * len(batch)
+        finally:
+            await self.limiter.release()
+
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
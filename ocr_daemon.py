@@ -0,0 +1,181 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import tempfile
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), f"multiocr-{os.getuid()}.sock")
+
+
+def submit_job(job: Dict[str, Any], socket_path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Send one job to a running daemon and wait for its summary.
+
+    Deliberately uses only the standard library so the client side starts instantly.
+    Raises OSError (FileNotFoundError, ConnectionRefusedError) when no daemon is listening.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(json.dumps(job).encode('utf-8') + b"\n")
+        with client.makefile('rb') as response:
+            line = response.readline()
+    if not line:
+        raise ConnectionError(f"OCR daemon at {socket_path} closed the connection without a reply")
+    return json.loads(line)
+
+
+class OCRDaemon:
+    """Keeps initialized engines resident and runs jobs submitted over a Unix socket, one at a time."""
+
+    def __init__(self, engines: List[Any], socket_path: str = DEFAULT_SOCKET_PATH):
+        self.engines = engines
+        self.socket_path = socket_path
+        self.jobs_done = 0
+        self._job_lock = asyncio.Lock()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            # A stale socket from a crashed daemon would make bind() fail
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    probe.connect(self.socket_path)
+            except ConnectionRefusedError:
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(f"An OCR daemon is already listening on {self.socket_path}")
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        logger.info("OCR daemon listening", extra={
+            "socket_path": self.socket_path, "engines": [engine.get_engine_name() for engine in self.engines]
+        })
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            line = await reader.readline()
+            try:
+                request = json.loads(line)
+                response = await self._dispatch(request)
+            except ValueError as e:
+                logger.warning("Rejected OCR daemon request: %s", e)
+                response = {"ok": False, "error": str(e)}
+            except Exception as e:
+                logger.exception("OCR daemon job failed")
+                response = {"ok": False, "error": str(e)}
+            writer.write(json.dumps(response).encode('utf-8') + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        command = request.get("command", "run")
+        if command == "ping":
+            return {
+                "ok": True,
+                "engines": [engine.get_engine_name() for engine in self.engines],
+                "busy": self._job_lock.locked(),
+                "jobs_done": self.jobs_done,
+            }
+        if command == "run":
+            async with self._job_lock:
+                summary = await self._run_job(request)
+            self.jobs_done += 1
+            return {"ok": True, **summary}
+        raise ValueError(f"Unknown command: {command}")
+
+    async def _run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        from ocr_engine_manager import OCREngineManager
+        from fair_scheduler import InputSource
+        from search_index import SearchIndex
+        from retry_policy import RetryPolicy, DeadLetterQueue
+
+        search_index = SearchIndex(job["index_db"]) if job.get("index_db") else None
+        manager = OCREngineManager(
+            job["output_dir"], job.get("max_concurrency", 4), search_index, job.get("output_layout", "flat"),
+            job.get("compression", "none"), job.get("zstd_dictionary"), job.get("stat_workers", 0),
+            job.get("expand_archives", False), job.get("content_hash"), job.get("archive_spool_dir")
+        )
+        manager.set_retry_policy(RetryPolicy(job.get("max_attempts", 3), job.get("retry_base_delay", 1.0)))
+        manager.attach_dead_letter_queue(DeadLetterQueue(
+            job.get("dead_letter_path") or os.path.join(job["output_dir"], "failed_files.jsonl")
+        ))
+        exporter = None
+        if job.get("export_prefix"):
+            from columnar_export import ColumnarExporter
+            exporter = ColumnarExporter(job["export_prefix"], job.get("export_format", "parquet"))
+            manager.register_result_sink(exporter)
+        for engine in self.engines:
+            manager.register_engine(engine)
+
+        sources = [InputSource(source["path"], source.get("weight", 1.0), source.get("priority", 0))
+                   for source in job["sources"]]
+        try:
+            await manager.process_sources(sources, job.get("max_depth", 6), job.get("small_files_first", False))
+        finally:
+            if search_index is not None:
+                search_index.close()
+            if exporter is not None:
+                exporter.close()
+        return {"progress": manager.get_progress(), "overall_health": manager.get_overall_health()}
+
+
+async def serve(socket_path: str, engine_options: Dict[str, Any], engine_names: Optional[List[str]] = None,
+                engine_config: Optional[str] = None):
+    from engine_registry import create_engines
+
+    daemon = OCRDaemon(create_engines(engine_names or ["tesseract"], engine_options, engine_config), socket_path)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stop_event.set)
+    await daemon.start()
+    try:
+        await stop_event.wait()
+    finally:
+        await daemon.stop()
+
+
+if __name__ == "__main__":
+    from structured_logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Resident MultiOCR daemon; submit jobs with 'main.py --daemon-socket'")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket to listen on")
+    parser.add_argument("--page-timeout", type=float, help="Per-page OCR timeout in seconds (retried once at half resolution)")
+    parser.add_argument("--tile-size", type=int,
+                        help="OCR pages larger than 1.5x this many pixels as overlapping tiles in parallel (large drawings, newspapers)")
+    parser.add_argument("--skip-blank-pages", action="store_true",
+                        help="Do not OCR pages with no line of ink (separator sheets, blank backs of duplex scans)")
+    parser.add_argument("--engine", action="append", dest="engines", metavar="NAME",
+                        help="OCR engine to run, repeatable (default: tesseract)")
+    parser.add_argument("--engine-config", help="JSON file declaring extra engines and their resource profiles")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Logging verbosity")
+    parser.add_argument("--log-file", help="Write JSON logs to this file instead of stderr")
+
+    args = parser.parse_args()
+    setup_logging(getattr(logging, args.log_level), args.log_file)
+
+    engine_options = {}
+    if args.page_timeout:
+        engine_options['timeout'] = args.page_timeout
+        engine_options['timeout_fallback_scale'] = 0.5
+    if args.tile_size:
+        engine_options['tile_size'] = args.tile_size
+    if args.skip_blank_pages:
+        engine_options['blank_detection'] = True
+    asyncio.run(serve(args.socket, engine_options, args.engines, args.engine_config))
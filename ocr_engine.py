@@ -1,16 +1,43 @@
+import asyncio
+import contextvars
+import functools
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from concurrent.futures import Executor
+from typing import Dict, Any, List, NamedTuple, Optional
+
+from engine_health import EngineHealthTracker
+from run_profiler import profile_stage
 
 class OCREngineError(Exception):
     def __init__(self, message: str, category: str, severity: str):
         self.message = message
         self.category = category
         self.severity = severity
+        # Set by RetryPolicy to the number of attempts made before giving up
+        self.attempts = 1
         super().__init__(self.message)
 
+class ResourceProfile(NamedTuple):
+    """How an engine uses the machine, so the manager can size its workers and concurrency."""
+    kind: str = "cpu"  # "cpu": local compute competing for cores; "io": waits on network/disk (cloud APIs)
+    memory_per_page_mb: int = 200
+    max_concurrency: Optional[int] = None
+
 class OCREngine(ABC):
+    resource_profile = ResourceProfile()
+
     def __init__(self, engine_options: Dict[str, Any] = None):
         self.engine_options = engine_options or {}
+        self.health_tracker = EngineHealthTracker()
+        # Assigned by OCREngineManager from the resource profile; None uses the default executor
+        self.executor: Optional[Executor] = None
+
+    async def run_blocking(self, function, *args, **kwargs) -> Any:
+        """asyncio.to_thread on this engine's executor, so I/O-bound engines never occupy CPU workers."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, functools.partial(context.run, function, *args, **kwargs))
 
     @abstractmethod
     async def prepare_file(self, file_path: str) -> Any:
@@ -36,12 +63,73 @@ class OCREngine(ABC):
     def get_engine_health(self) -> str:
         pass
 
+    def get_file_timeout(self) -> Optional[float]:
+        return self.engine_options.get('file_timeout')
+
+    def get_health_stats(self) -> Dict[str, Any]:
+        return self.health_tracker.snapshots()
+
     async def run_ocr(self, file_path: str) -> Dict[str, Any]:
+        start_time = time.monotonic()
+        name = self.get_engine_name()
         try:
-            prepared_file = await self.prepare_file(file_path)
-            raw_results = await self.process_file(prepared_file)
-            return await self.parse_results(raw_results)
-        except OCREngineError:
+            with profile_stage(f"{name}.prepare"):
+                prepared_file = await self.prepare_file(file_path)
+            with profile_stage(f"{name}.process"):
+                raw_results = await self.process_file(prepared_file)
+            with profile_stage(f"{name}.parse"):
+                result = await self.parse_results(raw_results)
+        except OCREngineError as e:
+            self.health_tracker.record(False, time.monotonic() - start_time, timed_out=e.category == "Timeout")
             raise
         except Exception as e:
+            self.health_tracker.record(False, time.monotonic() - start_time)
             raise OCREngineError(f"Unexpected error during OCR process: {str(e)}", "OCR Engine", "critical")
+
+        pages = len(result.get("pages") or []) if isinstance(result, dict) else 0
+        self.health_tracker.record(True, time.monotonic() - start_time, pages=max(pages, 1))
+        return result
+
+    def get_max_batch_size(self) -> int:
+        # Engines whose per-call overhead (process start, model load, RPC) can be shared raise this
+        return 1
+
+    async def process_batch(self, prepared_files: List[Any]) -> List[Any]:
+        """Raw results for several prepared files, in order; override when the engine has a native batch call."""
+        return [await self.process_file(prepared_file) for prepared_file in prepared_files]
+
+    async def run_ocr_batch(self, file_paths: List[str]) -> List[Any]:
+        """run_ocr for several files at once; each entry is that file's result or its OCREngineError."""
+        start_time = time.monotonic()
+        outcomes: List[Any] = [None] * len(file_paths)
+        prepared = []
+        for index, file_path in enumerate(file_paths):
+            try:
+                prepared.append((index, await self.prepare_file(file_path)))
+            except OCREngineError as e:
+                outcomes[index] = e
+            except Exception as e:
+                outcomes[index] = OCREngineError(f"Unexpected error during OCR process: {str(e)}", "OCR Engine", "critical")
+
+        if prepared:
+            try:
+                raw_results = await self.process_batch([prepared_file for _, prepared_file in prepared])
+                for (index, _), raw_result in zip(prepared, raw_results):
+                    outcomes[index] = await self.parse_results(raw_result)
+            except OCREngineError as e:
+                for index, _ in prepared:
+                    outcomes[index] = e
+            except Exception as e:
+                error = OCREngineError(f"Unexpected error during OCR process: {str(e)}", "OCR Engine", "critical")
+                for index, _ in prepared:
+                    outcomes[index] = error
+
+        # Every file in the batch experienced the whole batch latency
+        latency = time.monotonic() - start_time
+        for outcome in outcomes:
+            if isinstance(outcome, OCREngineError):
+                self.health_tracker.record(False, latency, timed_out=outcome.category == "Timeout")
+            else:
+                pages = len(outcome.get("pages") or []) if isinstance(outcome, dict) else 0
+                self.health_tracker.record(True, latency, pages=max(pages, 1))
+        return outcomes
@@ -1,54 +1,412 @@
 import asyncio
+import logging
 import os
-from typing import List, Dict, Any
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import List, Dict, Any, Optional
 from ocr_engine import OCREngine, OCREngineError
 from file_input_handler import FileInputHandler
 from output_formatter import OutputFormatter
+from engine_health import AdaptiveLimiter, MemoryBudget
+from fair_scheduler import InputSource, WeightedFairQueue, make_names_unique, order_small_files_first
+from structured_logging import correlation_context
+from archive_input import close_archives, pin_archive_members, release_archive_member, set_spool_dir
+from folder_watcher import FolderWatcher
+from search_index import SearchIndex
+from micro_batching import MicroBatcher
+from run_profiler import RunProfiler, profile_stage
+from consensus import CONSENSUS_KEY, build_consensus
+from retry_policy import RetryPolicy, DeadLetterQueue
 import json
 
+logger = logging.getLogger(__name__)
+
 class OCREngineManager:
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, max_concurrency: int = 4, search_index: Optional[SearchIndex] = None,
+                 output_layout: str = 'flat', compression: str = 'none', zstd_dictionary: Optional[str] = None,
+                 stat_workers: int = 0, expand_archives: bool = False, content_hash: Optional[str] = None,
+                 archive_spool_dir: Optional[str] = None):
         self.engines: List[OCREngine] = []
-        self.output_formatter = OutputFormatter(output_dir)
+        self.stat_workers = stat_workers
+        self.expand_archives = expand_archives
+        if archive_spool_dir:
+            set_spool_dir(archive_spool_dir)
+        self.content_hash = content_hash
+        self.output_formatter = OutputFormatter(
+            output_dir, output_layout, compression=compression, zstd_dictionary=zstd_dictionary
+        )
+        self.result_sinks: List[Any] = []
+        if search_index is not None:
+            self.register_result_sink(search_index)
+        self.max_concurrency = max(1, max_concurrency)
+        self.engine_limiters: Dict[str, AdaptiveLimiter] = {}
+        self.batchers: Dict[str, MicroBatcher] = {}
+        self.profiler: Optional[RunProfiler] = None
+        self.consensus_weights: Optional[Dict[str, float]] = None
+        self.retry_policy = RetryPolicy()
+        # Shared by all CPU-bound engines: each page in flight reserves its profile's memory per page
+        self.memory_budget_mb = _default_memory_budget_mb()
+        self._memory_budget: Optional[MemoryBudget] = None
+        self.dead_letters: Optional[DeadLetterQueue] = None
+        # file path -> names of the engines a --retry-failed run reruns on it
+        self._retry_engines: Dict[str, List[str]] = {}
+        self._reset_progress()
+
+    def _reset_progress(self):
+        self.state = "idle"
+        self.files_total = 0
+        self.files_done = 0
+        self.files_failed = 0
+        self.files_in_progress = 0
+        self.run_started_at = None
+        self.run_finished_at = None
+        self._queue = None
+
+    def register_result_sink(self, sink: Any):
+        # Sinks (search index, columnar exporter, ...) receive every result as it is written
+        self.result_sinks.append(sink)
+
+    def attach_profiler(self, profiler: RunProfiler):
+        self.profiler = profiler
+
+    def set_retry_policy(self, retry_policy: RetryPolicy):
+        self.retry_policy = retry_policy
+
+    def attach_dead_letter_queue(self, dead_letters: DeadLetterQueue):
+        # Files that still fail after retries are recorded here for a later --retry-failed run
+        self.dead_letters = dead_letters
 
     def register_engine(self, engine: OCREngine):
         self.engines.append(engine)
+        profile = engine.resource_profile
+        if engine.executor is None:
+            # CPU-bound engines share workers sized to the cores; each I/O-bound engine gets its own,
+            # so hundreds of requests waiting on a cloud API never queue ahead of local OCR
+            engine.executor = _cpu_executor() if profile.kind == "cpu" else ThreadPoolExecutor(
+                max_workers=profile.max_concurrency or 32, thread_name_prefix=f"multiocr-{engine.get_engine_name()}"
+            )
+        concurrency = self.max_concurrency
+        if profile.max_concurrency:
+            concurrency = min(concurrency, profile.max_concurrency)
+        memory_budget = None
+        if profile.kind == "cpu" and self.memory_budget_mb:
+            if self._memory_budget is None:
+                self._memory_budget = MemoryBudget(self.memory_budget_mb)
+            memory_budget = self._memory_budget
+        logger.debug("Registered engine", extra={
+            "engine": engine.get_engine_name(), "resource_profile": profile._asdict(), "concurrency_limit": concurrency,
+            "memory_budget_mb": memory_budget.total_mb if memory_budget is not None else None,
+        })
+        self.engine_limiters[engine.get_engine_name()] = AdaptiveLimiter(
+            engine.health_tracker, concurrency, memory_budget=memory_budget,
+            memory_per_call_mb=profile.memory_per_page_mb if memory_budget is not None else 0
+        )
+
+    def enable_micro_batching(self, max_wait: float = 0.01):
+        # Only engines with a native batch call benefit; the rest keep one call per file
+        for engine in self.engines:
+            max_batch_size = engine.get_max_batch_size()
+            if max_batch_size > 1:
+                name = engine.get_engine_name()
+                self.batchers[name] = MicroBatcher(engine, self.engine_limiters[name], max_batch_size, max_wait)
+
+    def enable_consensus(self, weights: Optional[Dict[str, float]] = None):
+        # Adds a merged "consensus" result whenever at least two engines succeed on a file
+        self.consensus_weights = dict(weights or {})
+
+    async def disable_micro_batching(self):
+        for batcher in self.batchers.values():
+            await batcher.stop()
+        self.batchers.clear()
+
+    async def process_file(self, file_path: str) -> Dict[str, Any]:
+        """OCR one file with every registered engine without writing any output."""
+        with correlation_context(file_path):
+            return await self._process_file(file_path)
 
     async def process_files(self, input_path: str, max_depth: int = 6):
+        await self.process_sources([InputSource(input_path)], max_depth)
+
+    async def process_sources(self, sources: List[InputSource], max_depth: int = 6, small_files_first: bool = False):
         supported_file_types = set()
         for engine in self.engines:
             supported_file_types.update(engine.get_supported_file_types())
 
-        file_handler = FileInputHandler(input_path, list(supported_file_types), max_depth)
-        
+        make_names_unique(sources)
+        queue = WeightedFairQueue()
+        file_handlers: Dict[str, FileInputHandler] = {}
+        for source in sources:
+            file_handler = self._make_file_handler(source.path, supported_file_types, max_depth)
+            try:
+                # Directory walks can be slow on network filesystems; keep the event loop responsive
+                files_to_process = await asyncio.to_thread(file_handler.get_files_to_process)
+            except OCREngineError as e:
+                logger.error(
+                    "Error getting files to process: %s", e,
+                    extra={"input_source": source.name, "category": e.category, "severity": e.severity}
+                )
+                continue
+
+            if small_files_first:
+                # Improves median turnaround within a source; fairness across sources is unaffected
+                files_to_process = order_small_files_first(files_to_process, file_handler.get_file_size)
+            file_handlers[source.name] = file_handler
+            queue.add_source(source, files_to_process)
+
+        await self._run_queue(queue, file_handlers)
+
+    async def retry_dead_letters(self):
+        """Reprocess only the files recorded in the dead-letter queue, without rescanning the inputs."""
+        if self.dead_letters is None:
+            raise ValueError("No dead-letter queue attached")
+        supported_file_types = set()
+        for engine in self.engines:
+            supported_file_types.update(engine.get_supported_file_types())
+
+        queue = WeightedFairQueue()
+        file_handlers: Dict[str, FileInputHandler] = {}
+        files_by_source: Dict[str, List[str]] = {}
+        engine_names = {engine.get_engine_name() for engine in self.engines}
+        for entry in self.dead_letters.pending():
+            files_by_source.setdefault(entry["source_path"], []).append(entry["file_path"])
+            # Only the engines that failed run again; a file-level failure (unreadable input) reruns all
+            failed_engines = [name for name in entry.get("errors", {}) if name in engine_names]
+            if failed_engines and "file" not in entry.get("errors", {}):
+                self._retry_engines[entry["file_path"]] = failed_engines
+        for source_path, file_paths in files_by_source.items():
+            source = InputSource(source_path, name=source_path)
+            file_handlers[source.name] = self._make_file_handler(source_path, supported_file_types, 0)
+            queue.add_source(source, file_paths)
+            pin_archive_members(file_paths)
+        logger.info("Retrying failed files", extra={"files_total": len(queue), "dead_letter_file": self.dead_letters.path})
+
         try:
-            files_to_process = file_handler.get_files_to_process()
-        except OCREngineError as e:
-            print(f"Error getting files to process: {e}")
+            await self._run_queue(queue, file_handlers)
+        finally:
+            self._retry_engines.clear()
+
+    def _make_file_handler(self, path: str, supported_file_types: set, max_depth: int) -> FileInputHandler:
+        return FileInputHandler(
+            path, list(supported_file_types), max_depth, self.stat_workers, self.expand_archives, self.content_hash
+        )
+
+    async def _run_queue(self, queue: WeightedFairQueue, file_handlers: Dict[str, FileInputHandler]):
+        if not file_handlers:
             return
 
-        for file_path in files_to_process:
+        self._reset_progress()
+        self.state = "running"
+        self.files_total = len(queue)
+        self.run_started_at = time.time()
+        self._queue = queue
+        logger.info(
+            "Starting run",
+            extra={"files_total": self.files_total, "max_concurrency": self.max_concurrency, "input_sources": len(file_handlers)}
+        )
+
+        workers = [
+            asyncio.create_task(self._file_worker(queue, file_handlers))
+            for _ in range(min(self.max_concurrency, self.files_total))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            self.state = "finished"
+            self.run_finished_at = time.time()
+            for sink in self.result_sinks:
+                sink.flush()
+            close_archives()
+            if self.dead_letters is not None:
+                self.dead_letters.compact()
+            logger.info("Run finished", extra=self.get_progress())
+
+    async def _file_worker(self, queue: WeightedFairQueue, file_handlers: Dict[str, FileInputHandler]):
+        while not queue.empty():
+            source, file_path = queue.get_nowait()
+            await self._handle_file(source, file_path, file_handlers[source.name])
+
+    async def _handle_file(self, source: InputSource, file_path: str, file_handler: FileInputHandler):
+        source.mark_started()
+        self.files_in_progress += 1
+        failed = True
+        profiling = self.profiler.profile_file(file_path) if self.profiler is not None else nullcontext()
+        with correlation_context(file_path), profiling as profile:
+            start_time = time.monotonic()
             try:
-                metadata = file_handler.extract_metadata(file_path)
-                self.output_formatter.save_metadata(os.path.basename(file_path), metadata)
+                with profile_stage("extract_metadata"):
+                    metadata = await self.retry_policy.run(
+                        lambda: asyncio.to_thread(file_handler.extract_metadata, file_path), f"Reading {file_path}"
+                    )
+                self.output_formatter.save_metadata(file_path, metadata, source.path)
 
-                results = await self._process_file(file_path)
-                self.output_formatter.save_result(os.path.basename(file_path), results)
+                engine_names = self._retry_engines.pop(file_path, None)
+                previous_results = None
+                if engine_names is not None:
+                    # Results of the engines that succeeded last time are kept, not recomputed
+                    previous_results = await asyncio.to_thread(self.output_formatter.load_result, file_path, source.path)
+                results = await self._process_file(file_path, engine_names if previous_results else None, previous_results)
+                self.output_formatter.save_result(file_path, results, source.path)
+                with profile_stage("result_sinks"):
+                    self._publish_result(file_path, results, metadata)
+                if profile is not None:
+                    self.profiler.record_outcome(profile, metadata, results)
+                failed = bool(results) and all("error" in result for result in results.values())
+                self._record_failures(source, file_path, {
+                    name: result for name, result in results.items() if isinstance(result, dict) and "error" in result
+                })
+                logger.debug(
+                    "Processed file",
+                    extra={"input_source": source.name, "duration": time.monotonic() - start_time, "failed": failed}
+                )
             except OCREngineError as e:
-                print(f"Error processing file {file_path}: {e}")
+                logger.error(
+                    "Error processing file: %s", e,
+                    extra={"input_source": source.name, "category": e.category, "severity": e.severity}
+                )
+                self._record_failures(source, file_path, {"file": _error_entry(e)})
+            finally:
+                # Lets a decompressed archive be evicted once none of its queued members is left
+                release_archive_member(file_path)
+                self.files_in_progress -= 1
+                self.files_done += 1
+                if failed:
+                    self.files_failed += 1
+                source.mark_finished(failed)
 
-    async def _process_file(self, file_path: str) -> Dict[str, Any]:
-        results = {}
-        tasks = []
+    def _record_failures(self, source: InputSource, file_path: str, errors: Dict[str, Any]):
+        if self.dead_letters is None:
+            return
+        if errors:
+            self.dead_letters.record(file_path, source.path, errors)
+        else:
+            self.dead_letters.resolve(file_path)
 
+    async def watch_sources(self, sources: List[InputSource], max_depth: int = 6, stop_event: Optional[asyncio.Event] = None,
+                            settle_seconds: float = 2.0, poll_interval: float = 5.0, use_inotify: bool = True):
+        """Process existing files, then keep processing new or modified files until stop_event is set."""
+        stop_event = stop_event or asyncio.Event()
+        supported_file_types = set()
         for engine in self.engines:
-            task = asyncio.create_task(self._run_engine(engine, file_path))
+            supported_file_types.update(engine.get_supported_file_types())
+
+        make_names_unique(sources)
+        queue = WeightedFairQueue()
+        work_available = asyncio.Event()
+        queued_paths = set()
+        file_handlers: Dict[str, FileInputHandler] = {}
+
+        def enqueue(source: InputSource, file_paths: List[str]):
+            # A file already waiting in the queue is not queued twice; one being processed can be requeued
+            new_paths = [file_path for file_path in file_paths if file_path not in queued_paths]
+            for file_path in file_paths:
+                if file_path in queued_paths:
+                    release_archive_member(file_path)
+            if new_paths:
+                queued_paths.update(new_paths)
+                queue.add_source(source, new_paths)
+                self.files_total += len(new_paths)
+                work_available.set()
+
+        self._reset_progress()
+        self.state = "watching"
+        self.run_started_at = time.time()
+        self._queue = queue
+
+        watchers = []
+        for source in sources:
+            file_handler = self._make_file_handler(source.path, supported_file_types, max_depth)
+            try:
+                existing_files = await asyncio.to_thread(file_handler.get_files_to_process)
+            except OCREngineError as e:
+                logger.error("Error getting files to process: %s", e, extra={"input_source": source.name})
+                continue
+            file_handlers[source.name] = file_handler
+
+            # Skip files that already have a result so restarting the daemon does not redo work
+            pending_files = []
+            for file_path in existing_files:
+                if os.path.exists(self.output_formatter.get_result_path(file_path, source.path)):
+                    release_archive_member(file_path)
+                else:
+                    pending_files.append(file_path)
+            enqueue(source, pending_files)
+
+            if os.path.isdir(source.path):
+                watcher = FolderWatcher(
+                    os.path.abspath(source.path),
+                    lambda path, source=source, file_handler=file_handler: enqueue(source, file_handler.expand_path(path)),
+                    max_depth, settle_seconds, poll_interval, use_inotify
+                )
+                await watcher.start()
+                watchers.append(watcher)
+
+        async def worker():
+            while not stop_event.is_set():
+                if queue.empty():
+                    work_available.clear()
+                    await _wait_first(work_available, stop_event)
+                    continue
+                source, file_path = queue.get_nowait()
+                queued_paths.discard(file_path)
+                try:
+                    await self._handle_file(source, file_path, file_handlers[source.name])
+                except Exception:
+                    # A bug or unexpected error on one file must not silently stop this worker for good
+                    logger.exception("Unexpected error processing file", extra={"input_source": source.name, "file_path": file_path})
+
+        logger.info("Watching input sources", extra={"input_sources": len(file_handlers), "files_total": self.files_total})
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        try:
+            await stop_event.wait()
+            # In-flight files finish; queued ones are picked up again on the next start
+            await asyncio.gather(*workers)
+        finally:
+            for watcher in watchers:
+                await watcher.stop()
+            for task in workers:
+                task.cancel()
+            self.state = "finished"
+            self.run_finished_at = time.time()
+            for sink in self.result_sinks:
+                sink.flush()
+            close_archives()
+            if self.dead_letters is not None:
+                self.dead_letters.compact()
+            logger.info("Stopped watching", extra=self.get_progress())
+
+    def _publish_result(self, file_path: str, results: Dict[str, Any], metadata: Dict[str, Any]):
+        for sink in self.result_sinks:
+            try:
+                sink.add_result(file_path, results, metadata)
+            except Exception as e:
+                # Sinks are best-effort; the JSON result on disk remains the source of truth
+                logger.warning("Result sink %s failed: %s", type(sink).__name__, e)
+
+    async def _process_file(self, file_path: str, engine_names: Optional[List[str]] = None,
+                            previous_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run the engines (all, or only those named) on a file, on top of the results of an earlier run."""
+        results = {name: result for name, result in (previous_results or {}).items() if name != CONSENSUS_KEY}
+        engines = [engine for engine in self.engines if engine_names is None or engine.get_engine_name() in engine_names]
+        tasks = []
+
+        for engine in engines:
+            task = asyncio.create_task(self.retry_policy.run(
+                lambda engine=engine: self._run_engine(engine, file_path), f"{engine.get_engine_name()} on {file_path}"
+            ))
             tasks.append(task)
 
         completed_tasks = await asyncio.gather(*tasks, return_exceptions=True)
 
-        for engine, task_result in zip(self.engines, completed_tasks):
-            if isinstance(task_result, Exception):
+        for engine, task_result in zip(engines, completed_tasks):
+            if isinstance(task_result, OCREngineError):
+                logger.warning(
+                    "Engine %s failed: %s", engine.get_engine_name(), task_result,
+                    extra={"engine": engine.get_engine_name(), "category": task_result.category}
+                )
+                results[engine.get_engine_name()] = _error_entry(task_result)
+            elif isinstance(task_result, Exception):
                 results[engine.get_engine_name()] = {"error": str(task_result)}
             else:
                 # Ensure the result is JSON serializable
@@ -58,11 +416,38 @@ class OCREngineManager:
                 except TypeError:
                     results[engine.get_engine_name()] = {"error": "Result not JSON serializable"}
 
+        if self.consensus_weights is not None:
+            with profile_stage("consensus"):
+                consensus = await asyncio.to_thread(build_consensus, results, self.consensus_weights)
+            if consensus is not None:
+                results[CONSENSUS_KEY] = consensus
+
         return results
 
     async def _run_engine(self, engine: OCREngine, file_path: str) -> Dict[str, Any]:
+        batcher = self.batchers.get(engine.get_engine_name())
+        if batcher is not None:
+            # The batcher takes the limiter slot for the whole batch
+            file_timeout = engine.get_file_timeout()
+            try:
+                return await asyncio.wait_for(batcher.submit(file_path), file_timeout or None)
+            except asyncio.TimeoutError:
+                raise OCREngineError(
+                    f"{engine.get_engine_name()} timed out after {file_timeout}s on {file_path}", "Timeout", "error"
+                )
         try:
-            return await engine.run_ocr(file_path)
+            async with self.engine_limiters[engine.get_engine_name()]:
+                file_timeout = engine.get_file_timeout()
+                if not file_timeout:
+                    return await engine.run_ocr(file_path)
+                try:
+                    return await asyncio.wait_for(engine.run_ocr(file_path), file_timeout)
+                except asyncio.TimeoutError:
+                    # Backstop for engines that cannot enforce their own per-page timeout
+                    engine.health_tracker.record(False, file_timeout, timed_out=True)
+                    raise OCREngineError(
+                        f"{engine.get_engine_name()} timed out after {file_timeout}s on {file_path}", "Timeout", "error"
+                    )
         except OCREngineError as e:
             raise e
         except Exception as e:
@@ -80,6 +465,76 @@ class OCREngineManager:
         else:
             return "YELLOW"
 
+    def get_health_report(self) -> Dict[str, Any]:
+        engines = {}
+        for engine in self.engines:
+            limiter = self.engine_limiters[engine.get_engine_name()]
+            engines[engine.get_engine_name()] = {
+                "status": engine.get_engine_health(),
+                "concurrency_limit": limiter.limit,
+                "in_flight": limiter.in_flight,
+                "windows": engine.get_health_stats(),
+            }
+        return {"overall": self.get_overall_health(), "engines": engines}
+
+    def get_progress(self) -> Dict[str, Any]:
+        elapsed = None
+        files_per_sec = None
+        eta_seconds = None
+        if self.run_started_at is not None:
+            elapsed = (self.run_finished_at or time.time()) - self.run_started_at
+            if elapsed > 0:
+                files_per_sec = self.files_done / elapsed
+            remaining = self.files_total - self.files_done
+            if files_per_sec:
+                eta_seconds = remaining / files_per_sec
+
+        return {
+            "state": self.state,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "files_failed": self.files_failed,
+            "files_in_progress": self.files_in_progress,
+            "elapsed_seconds": elapsed,
+            "files_per_sec": files_per_sec,
+            "eta_seconds": eta_seconds,
+            "sources": {source.name: source.get_stats() for source in self._queue.sources} if self._queue is not None else {},
+        }
+
+_cpu_executor_instance: Optional[Executor] = None
+_cpu_executor_lock = threading.Lock()
+
+
+def _cpu_executor() -> Executor:
+    # Process-wide, so managers created per job (ocr_daemon) do not each start their own threads
+    global _cpu_executor_instance
+    with _cpu_executor_lock:
+        if _cpu_executor_instance is None:
+            _cpu_executor_instance = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="multiocr-cpu")
+        return _cpu_executor_instance
+
+
+def _default_memory_budget_mb() -> Optional[int]:
+    # Half of physical memory; None where the platform does not report it
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (2 * 1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _error_entry(error: OCREngineError) -> Dict[str, Any]:
+    return {"error": str(error), "category": error.category, "severity": error.severity, "attempts": error.attempts}
+
+
+async def _wait_first(*events: asyncio.Event):
+    waiters = [asyncio.create_task(event.wait()) for event in events]
+    try:
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+
 # Usage example
 async def main():
     manager = OCREngineManager("output_directory")
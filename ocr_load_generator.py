@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+async def post_file(host: str, port: int, path: str, file_name: str, data: bytes, timeout: float) -> Tuple[int, bytes]:
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(
+            f"POST {path}?filename={quote(file_name)} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Content-Type: application/octet-stream\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    status_line, _, rest = response.partition(b"\r\n")
+    body = rest.partition(b"\r\n\r\n")[2]
+    return int(status_line.split()[1]), body
+
+
+class LoadGenerator:
+    """Drives an ocr_server.py instance and records end-to-end latency per request.
+
+    Closed loop (default): `concurrency` clients each send the next request when the previous returns.
+    Open loop (rate > 0): Poisson arrivals at `rate` requests/s, with latency measured from the intended
+    send time so a stalled server shows up in p99 instead of silently lowering the offered load.
+    """
+
+    def __init__(self, url: str, files: List[str], concurrency: int = 8, rate: float = 0.0, timeout: float = 120.0):
+        parsed = urlsplit(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+        self.path = parsed.path or "/ocr"
+        self.payloads = []
+        for file_path in files:
+            with open(file_path, 'rb') as f:
+                self.payloads.append((os.path.basename(file_path), f.read()))
+        self.concurrency = concurrency
+        self.rate = rate
+        self.timeout = timeout
+        self.latencies: List[float] = []
+        self.status_counts: Counter = Counter()
+
+    async def _one_request(self, scheduled_at: float):
+        file_name, data = random.choice(self.payloads)
+        try:
+            status, _ = await post_file(self.host, self.port, self.path, file_name, data, self.timeout)
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            status = 0
+        self.status_counts[status] += 1
+        if status == 200:
+            self.latencies.append(time.monotonic() - scheduled_at)
+
+    async def run(self, requests: int) -> Dict[str, Any]:
+        start_time = time.monotonic()
+        if self.rate > 0:
+            tasks = []
+            next_at = start_time
+            for _ in range(requests):
+                next_at += random.expovariate(self.rate)
+                await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+                tasks.append(asyncio.create_task(self._one_request(next_at)))
+            await asyncio.gather(*tasks)
+        else:
+            remaining = iter(range(requests))
+
+            async def client():
+                for _ in remaining:
+                    await self._one_request(time.monotonic())
+
+            await asyncio.gather(*(client() for _ in range(self.concurrency)))
+        return self.summary(time.monotonic() - start_time)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": sum(self.status_counts.values()),
+            "status_counts": {str(status): count for status, count in sorted(self.status_counts.items())},
+            "elapsed_seconds": elapsed,
+            "throughput_per_sec": len(latencies) / elapsed if elapsed > 0 else None,
+            "latency_p50": _percentile(latencies, 0.50),
+            "latency_p90": _percentile(latencies, 0.90),
+            "latency_p99": _percentile(latencies, 0.99),
+            "latency_max": latencies[-1] if latencies else None,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test a running ocr_server.py and report latency percentiles")
+    parser.add_argument("files", nargs="+", help="Files to upload (picked at random per request)")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/ocr", help="OCR endpoint")
+    parser.add_argument("--requests", type=int, default=200, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop clients (ignored with --rate)")
+    parser.add_argument("--rate", type=float, default=0.0, help="Open-loop arrival rate in requests/s")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+
+    args = parser.parse_args()
+    generator = LoadGenerator(args.url, args.files, args.concurrency, args.rate, args.timeout)
+    print(json.dumps(asyncio.run(generator.run(args.requests)), indent=2))
@@ -0,0 +1,234 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import signal
+import tempfile
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from ocr_engine_manager import OCREngineManager
+from file_access import DEFAULT_BUFFER_SIZE
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/tiff": ".tif",
+    "image/gif": ".gif",
+    "application/pdf": ".pdf",
+}
+
+
+class OCRServer:
+    """HTTP endpoint for synchronous OCR of single uploads, sharing warm engines through an OCREngineManager.
+
+    POST /ocr with the file as the raw request body (Content-Type or ?filename= gives its type).
+    Concurrent uploads are coalesced into micro-batches for engines that support batching.
+    """
+
+    def __init__(self, manager: OCREngineManager, host: str = "127.0.0.1", port: int = 8000,
+                 max_queue_depth: int = 64, max_upload_bytes: int = 50 * 1024 * 1024, batch_wait: float = 0.01):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.max_queue_depth = max_queue_depth
+        self.max_upload_bytes = max_upload_bytes
+        self.batch_wait = batch_wait
+        self.requests_total = 0
+        self.requests_rejected = 0
+        self.requests_failed = 0
+        self.requests_in_flight = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._upload_dir: Optional[str] = None
+
+    async def start(self):
+        self._upload_dir = tempfile.mkdtemp(prefix="multiocr_uploads_")
+        self.manager.enable_micro_batching(self.batch_wait)
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("OCR server listening", extra={
+            "host": self.host, "port": self.port, "max_queue_depth": self.max_queue_depth,
+            "batching_engines": list(self.manager.batchers)
+        })
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.manager.disable_micro_batching()
+        if self._upload_dir is not None:
+            shutil.rmtree(self._upload_dir, ignore_errors=True)
+            self._upload_dir = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "requests_total": self.requests_total,
+            "requests_rejected": self.requests_rejected,
+            "requests_failed": self.requests_failed,
+            "requests_in_flight": self.requests_in_flight,
+            "max_queue_depth": self.max_queue_depth,
+            "batchers": {
+                name: {
+                    "queue_depth": batcher.queue_depth,
+                    "batches": batcher.batches_dispatched,
+                    "mean_batch_size": batcher.files_dispatched / batcher.batches_dispatched if batcher.batches_dispatched else None,
+                }
+                for name, batcher in self.manager.batchers.items()
+            },
+            "health": self.manager.get_health_report(),
+        }
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=10)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.decode("latin-1").split()
+            method, target = (parts[0], parts[1]) if len(parts) >= 2 else ("", "")
+            path, _, query = target.partition("?")
+            status_code, body, extra_headers = await self._route(method, path, parse_qs(query), headers, reader)
+            await self._respond(writer, status_code, body, extra_headers)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status_code: str, body: Dict[str, Any],
+                       extra_headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode()
+        head = f"HTTP/1.1 {status_code}\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+        for name, value in (extra_headers or {}).items():
+            head += f"{name}: {value}\r\n"
+        writer.write((head + "Connection: close\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+    async def _route(self, method: str, path: str, query: Dict[str, Any], headers: Dict[str, str],
+                     reader: asyncio.StreamReader) -> Tuple[str, Dict[str, Any], Optional[Dict[str, str]]]:
+        if path == "/ocr":
+            if method != "POST":
+                return "405 Method Not Allowed", {"error": "Use POST"}, None
+            return await self._handle_upload(query, headers, reader)
+        if method != "GET":
+            return "405 Method Not Allowed", {"error": "Method Not Allowed"}, None
+        if path in ("/", "/status"):
+            return "200 OK", self.get_status(), None
+        if path == "/health":
+            overall = self.manager.get_overall_health()
+            return ("503 Service Unavailable" if overall == "RED" else "200 OK"), {"health": overall}, None
+        return "404 Not Found", {"error": "Not Found"}, None
+
+    def _upload_extension(self, query: Dict[str, Any], headers: Dict[str, str]) -> Optional[str]:
+        filename = (query.get("filename") or [""])[0]
+        extension = os.path.splitext(filename)[1].lower()
+        if not extension:
+            extension = CONTENT_TYPE_EXTENSIONS.get(headers.get("content-type", "").split(";")[0].strip().lower(), "")
+        supported = {file_type for engine in self.manager.engines for file_type in engine.get_supported_file_types()}
+        return extension if extension in supported else None
+
+    async def _handle_upload(self, query: Dict[str, Any], headers: Dict[str, str],
+                             reader: asyncio.StreamReader) -> Tuple[str, Dict[str, Any], Optional[Dict[str, str]]]:
+        # Shed load before reading the body so an overloaded server does no work for rejected requests
+        if self.requests_in_flight >= self.max_queue_depth:
+            self.requests_rejected += 1
+            return "429 Too Many Requests", {"error": "OCR queue is full"}, {"Retry-After": "1"}
+        try:
+            content_length = int(headers.get("content-length", ""))
+        except ValueError:
+            return "411 Length Required", {"error": "Content-Length is required"}, None
+        if content_length > self.max_upload_bytes:
+            return "413 Payload Too Large", {"error": f"Uploads are limited to {self.max_upload_bytes} bytes"}, None
+        extension = self._upload_extension(query, headers)
+        if extension is None:
+            return "415 Unsupported Media Type", {"error": "Give a supported ?filename= or Content-Type"}, None
+
+        self.requests_in_flight += 1
+        self.requests_total += 1
+        upload_path = os.path.join(self._upload_dir, f"{uuid.uuid4().hex}{extension}")
+        start_time = time.monotonic()
+        try:
+            await asyncio.wait_for(_spool_body(reader, upload_path, content_length), timeout=60)
+            results = await self.manager.process_file(upload_path)
+            if results and all("error" in result for result in results.values()):
+                self.requests_failed += 1
+                return "422 Unprocessable Entity", {"results": results}, None
+            return "200 OK", {"results": results, "latency": time.monotonic() - start_time}, None
+        finally:
+            self.requests_in_flight -= 1
+            try:
+                os.unlink(upload_path)
+            except FileNotFoundError:
+                pass
+
+
+async def _spool_body(reader: asyncio.StreamReader, path: str, length: int, buffer_size: int = DEFAULT_BUFFER_SIZE):
+    # Streamed to disk chunk by chunk so concurrent large uploads do not each sit in memory whole
+    with open(path, 'wb') as f:
+        remaining = length
+        while remaining:
+            chunk = await reader.readexactly(min(buffer_size, remaining))
+            await asyncio.to_thread(f.write, chunk)
+            remaining -= len(chunk)
+
+
+async def serve(host: str, port: int, max_queue_depth: int, max_concurrency: int, batch_wait: float,
+                engine_options: Dict[str, Any], engine_names: Optional[List[str]] = None, engine_config: Optional[str] = None):
+    from engine_registry import create_engines
+
+    # Nothing is written to the output directory; results go back in the HTTP response
+    manager = OCREngineManager(tempfile.gettempdir(), max_concurrency)
+    for engine in create_engines(engine_names or ["tesseract"], engine_options, engine_config):
+        manager.register_engine(engine)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stop_event.set)
+    async with OCRServer(manager, host, port, max_queue_depth, batch_wait=batch_wait):
+        await stop_event.wait()
+
+
+if __name__ == "__main__":
+    from structured_logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Synchronous MultiOCR HTTP service (POST a file to /ocr)")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--max-queue-depth", type=int, default=64, help="Requests in flight before answering 429")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Concurrent engine calls (each may be a batch)")
+    parser.add_argument("--batch-wait", type=float, default=0.01, help="Seconds a request may wait for others to batch with")
+    parser.add_argument("--page-timeout", type=float, help="Per-page OCR timeout in seconds (retried once at half resolution)")
+    parser.add_argument("--engine", action="append", dest="engines", metavar="NAME",
+                        help="OCR engine to run, repeatable (default: tesseract)")
+    parser.add_argument("--engine-config", help="JSON file declaring extra engines and their resource profiles")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Logging verbosity")
+    parser.add_argument("--log-file", help="Write JSON logs to this file instead of stderr")
+
+    args = parser.parse_args()
+    setup_logging(getattr(logging, args.log_level), args.log_file)
+
+    engine_options = {}
+    if args.page_timeout:
+        engine_options['timeout'] = args.page_timeout
+        engine_options['timeout_fallback_scale'] = 0.5
+    asyncio.run(serve(args.host, args.port, args.max_queue_depth, args.max_concurrency, args.batch_wait, engine_options,
+                      args.engines, args.engine_config))
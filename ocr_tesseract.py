@@ -1,8 +1,8 @@
 import os
 import pytesseract
-from pdf2image import convert_from_path
 from PIL import Image
 from file_input_handler import FileInputHandler  # Import the input handler
+from pdf_rasterizer import analyze_pdf, choose_dpi, rasterize_page, refine_dpi, summarize_words
 
 class TesseractProcessor:
     def __init__(self, output_dir, filetypes_file='filetypes.txt', diagnostics=False):
@@ -22,7 +22,8 @@ class TesseractProcessor:
 
     def process_file(self, file_path):
         """
-        Processes a single file with Tesseract OCR. Converts PDFs to images if necessary.
+        Processes a single file with Tesseract OCR. PDF pages with a text layer are saved as-is;
+        the others are rasterized at a DPI chosen per page.
         :param file_path: Path to the file to be processed.
         """
         file_ext = os.path.splitext(file_path)[1].lower()
@@ -30,12 +31,15 @@ class TesseractProcessor:
         if file_ext == '.pdf':
             if self.diagnostics:
                 print(f"Converting PDF {file_path} to images...")
-            # Convert PDF to images
-            images = convert_from_path(file_path)
-            for i, image in enumerate(images):
-                image_path = os.path.join(self.output_dir, f"{os.path.basename(file_path)}_page_{i+1}.png")
-                image.save(image_path, 'PNG')
-                self._ocr_image(image, os.path.join(self.output_dir, f"{os.path.basename(file_path)}_page_{i+1}.txt"))
+            for pdf_page in analyze_pdf(file_path):
+                page_number = pdf_page["page_number"]
+                output_base = os.path.join(self.output_dir, f"{os.path.basename(file_path)}_page_{page_number}")
+                if pdf_page["text_layer"] is not None:
+                    # Born-digital page: the embedded text is exact, so skip OCR entirely
+                    with open(f"{output_base}.txt", 'w') as f:
+                        f.write(pdf_page["text_layer"])
+                    continue
+                self._ocr_pdf_page(file_path, page_number, choose_dpi(pdf_page["image_ppi"]), output_base)
         else:
             # If not PDF, assume it's an image
             self._ocr_image(file_path, os.path.join(self.output_dir, f"{os.path.basename(file_path)}.txt"))
@@ -56,6 +60,31 @@ class TesseractProcessor:
         for file_path in input_files:
             self.process_file(file_path)
 
+    def _ocr_pdf_page(self, file_path, page_number, dpi, output_base, low_confidence=60):
+        """
+        Runs Tesseract OCR on one rasterized PDF page, re-rasterizing at a higher DPI if confidence is low.
+        :param file_path: Path to the PDF file.
+        :param page_number: 1-based page number.
+        :param dpi: Initial rasterization DPI.
+        :param output_base: Output path without extension for the page image and text.
+        :param low_confidence: Mean word confidence below which the page is retried.
+        """
+        image = rasterize_page(file_path, page_number, dpi)
+        result = summarize_words(pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT))
+        if result["confidence"] is not None and result["confidence"] < low_confidence:
+            retry_dpi = refine_dpi(dpi, result["text_height"])
+            if retry_dpi:
+                if self.diagnostics:
+                    print(f"Low confidence on page {page_number}; re-rasterizing at {retry_dpi} DPI...")
+                retry_image = rasterize_page(file_path, page_number, retry_dpi)
+                retry = summarize_words(pytesseract.image_to_data(retry_image, output_type=pytesseract.Output.DICT))
+                if (retry["confidence"] or 0) > result["confidence"]:
+                    image, result = retry_image, retry
+
+        image.save(f"{output_base}.png", 'PNG')
+        with open(f"{output_base}.txt", 'w') as f:
+            f.write(result["text"])
+
     def _ocr_image(self, image_input, output_txt_path):
         """
         Runs Tesseract OCR on an image file and saves the results.
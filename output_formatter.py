@@ -1,22 +1,109 @@
 import os
-import json
-from typing import Dict, Any
+import hashlib
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from result_compression import ResultCodec, COMPRESSION_SUFFIXES, decode_result
+from run_profiler import profile_stage
+
+OUTPUT_LAYOUTS = ['flat', 'mirror', 'sharded']
+RESULT_SUFFIX = "_ocr_result.json"
+METADATA_SUFFIX = "_metadata.json"
+_RESULT_SUFFIXES = [RESULT_SUFFIX + suffix for suffix in COMPRESSION_SUFFIXES.values()]
 
 class OutputFormatter:
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, layout: str = 'flat', shard_depth: int = 2,
+                 compression: str = 'none', zstd_dictionary: Optional[str] = None):
+        if layout not in OUTPUT_LAYOUTS:
+            raise ValueError(f"Unknown output layout: {layout}")
         self.output_dir = output_dir
+        self.layout = layout
+        self.shard_depth = shard_depth
+        self.codec = ResultCodec(compression, zstd_dictionary=zstd_dictionary)
+        self.zstd_dictionary = zstd_dictionary
+        self._created_dirs = set()
         os.makedirs(self.output_dir, exist_ok=True)
 
-    def save_result(self, file_name: str, result: Dict[str, Any]):
-        base_name = os.path.splitext(file_name)[0]
-        output_path = os.path.join(self.output_dir, f"{base_name}_ocr_result.json")
-        
-        with open(output_path, 'w') as f:
-            json.dump(result, f, indent=2)
-
-    def save_metadata(self, file_name: str, metadata: Dict[str, Any]):
-        base_name = os.path.splitext(file_name)[0]
-        output_path = os.path.join(self.output_dir, f"{base_name}_metadata.json")
-        
-        with open(output_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+    def get_output_key(self, file_path: str) -> str:
+        # Stable, unique identifier for a source file regardless of layout
+        return hashlib.sha1(os.path.abspath(file_path).encode('utf-8', 'surrogateescape')).hexdigest()
+
+    def get_output_base(self, file_path: str, source_root: Optional[str] = None) -> str:
+        if self.layout == 'flat':
+            # Legacy layout: basename only, so identically named files in different folders collide
+            base_name = os.path.splitext(os.path.basename(file_path))[0]
+            return os.path.join(self.output_dir, base_name)
+
+        if self.layout == 'mirror':
+            relative_path = self._relative_source_path(file_path, source_root)
+            # Keep the extension so scan.png and scan.pdf in one folder stay distinct
+            return os.path.join(self.output_dir, relative_path)
+
+        key = self.get_output_key(file_path)
+        shards = [key[i * 2:i * 2 + 2] for i in range(self.shard_depth)]
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        return os.path.join(self.output_dir, *shards, f"{stem}_{key}")
+
+    def get_result_path(self, file_path: str, source_root: Optional[str] = None) -> str:
+        return self.get_output_base(file_path, source_root) + RESULT_SUFFIX + self.codec.suffix
+
+    def get_metadata_path(self, file_path: str, source_root: Optional[str] = None) -> str:
+        return self.get_output_base(file_path, source_root) + METADATA_SUFFIX + self.codec.suffix
+
+    def _relative_source_path(self, file_path: str, source_root: Optional[str]) -> str:
+        absolute_path = os.path.abspath(file_path)
+        if source_root:
+            absolute_root = os.path.abspath(source_root)
+            if absolute_root == absolute_path:
+                # A single-file input is its own root
+                absolute_root = os.path.dirname(absolute_root)
+            relative_path = os.path.relpath(absolute_path, absolute_root)
+            if not relative_path.startswith(os.pardir):
+                # Prefix with the root's name so several input roots can share one output tree, plus a
+                # short hash of its full path so a/inbox and b/inbox do not land in the same folder
+                root_key = self.get_output_key(absolute_root)[:8]
+                return os.path.join(f"{os.path.basename(absolute_root) or 'root'}_{root_key}", relative_path)
+        drive, path = os.path.splitdrive(absolute_path)
+        return os.path.join(drive.strip(':\\/') or "", path.lstrip(os.sep))
+
+    def _write_json(self, output_path: str, data: Dict[str, Any]):
+        directory = os.path.dirname(output_path)
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+
+        with open(output_path, 'wb') as f:
+            f.write(self.codec.encode(data))
+
+    def save_result(self, file_name: str, result: Dict[str, Any], source_root: Optional[str] = None):
+        with profile_stage("write_result"):
+            self._write_json(self.get_result_path(file_name, source_root), result)
+
+    def save_metadata(self, file_name: str, metadata: Dict[str, Any], source_root: Optional[str] = None):
+        with profile_stage("write_metadata"):
+            self._write_json(self.get_metadata_path(file_name, source_root), metadata)
+
+    def load_result(self, file_name: str, source_root: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The result previously saved for a file, or None if there is none or it cannot be read."""
+        try:
+            with open(self.get_result_path(file_name, source_root), 'rb') as f:
+                return decode_result(f.read(), self.zstd_dictionary)
+        except (OSError, ValueError):
+            return None
+
+
+def iter_result_files(output_dir: str) -> Iterator[Tuple[str, str]]:
+    """Yield (result_path, metadata_path) pairs for every result under output_dir, in any layout."""
+    stack = [output_dir]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    for suffix in _RESULT_SUFFIXES:
+                        if entry.name.endswith(suffix):
+                            compression_suffix = suffix[len(RESULT_SUFFIX):]
+                            base_path = entry.path[:-len(suffix)]
+                            yield entry.path, base_path + METADATA_SUFFIX + compression_suffix
+                            break
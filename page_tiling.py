@@ -0,0 +1,197 @@
+import math
+from statistics import median
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+# Words closer than this to a tile's inner edge are probably cut off
+EDGE_MARGIN = 2
+DUPLICATE_IOU = 0.5
+
+
+class Tile(NamedTuple):
+    row: int
+    column: int
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+
+def _axis_spans(length: int, tile_size: int, overlap: int) -> List[Tuple[int, int]]:
+    if length <= tile_size:
+        return [(0, length)]
+    count = math.ceil((length - overlap) / (tile_size - overlap))
+    # Spread tiles evenly so the last one is not a thin sliver
+    span = math.ceil((length + (count - 1) * overlap) / count)
+    return [(index * (span - overlap), min(length, index * (span - overlap) + span)) for index in range(count)]
+
+
+def plan_tiles(width: int, height: int, tile_size: int, overlap: int) -> List[Tile]:
+    """Row-major tiles of at most tile_size pixels; neighbours share `overlap` pixels."""
+    if overlap >= tile_size:
+        raise ValueError(f"Tile overlap ({overlap}) must be smaller than the tile size ({tile_size})")
+    return [
+        Tile(row, column, left, top, right, bottom)
+        for row, (top, bottom) in enumerate(_axis_spans(height, tile_size, overlap))
+        for column, (left, right) in enumerate(_axis_spans(width, tile_size, overlap))
+    ]
+
+
+def _touches_inner_edge(word: Dict[str, Any], tile: Tile, width: int, height: int) -> bool:
+    return ((tile.left > 0 and word["left"] - tile.left <= EDGE_MARGIN)
+            or (tile.right < width and tile.right - word["right"] <= EDGE_MARGIN)
+            or (tile.top > 0 and word["top"] - tile.top <= EDGE_MARGIN)
+            or (tile.bottom < height and tile.bottom - word["bottom"] <= EDGE_MARGIN))
+
+
+def tile_words(data: Dict[str, List[Any]], tile: Tile, width: int, height: int) -> List[Dict[str, Any]]:
+    """Words from pytesseract image_to_data(output_type=DICT) of one tile, in page coordinates.
+
+    Words touching an inner edge of the tile are marked "clipped": probably cut off, but kept,
+    since the neighbouring tile only has them whole when they fit inside the overlap.
+    """
+    words = []
+    for index, text in enumerate(data["text"]):
+        confidence = float(data["conf"][index])
+        if confidence < 0 or not text.strip():
+            continue
+        left = tile.left + data["left"][index]
+        top = tile.top + data["top"][index]
+        word = {
+            "text": text,
+            "confidence": confidence,
+            "left": left,
+            "top": top,
+            "right": left + data["width"][index],
+            "bottom": top + data["height"][index],
+            "line_key": (data["block_num"][index], data["par_num"][index], data["line_num"][index]),
+        }
+        word["clipped"] = _touches_inner_edge(word, tile, width, height)
+        words.append(word)
+    return words
+
+
+def _area(word: Dict[str, Any]) -> int:
+    return (word["right"] - word["left"]) * (word["bottom"] - word["top"])
+
+
+def _intersection(first: Dict[str, Any], second: Dict[str, Any]) -> int:
+    width = min(first["right"], second["right"]) - max(first["left"], second["left"])
+    height = min(first["bottom"], second["bottom"]) - max(first["top"], second["top"])
+    return width * height if width > 0 and height > 0 else 0
+
+
+def _iou(first: Dict[str, Any], second: Dict[str, Any]) -> float:
+    intersection = _intersection(first, second)
+    if not intersection:
+        return 0.0
+    return intersection / (_area(first) + _area(second) - intersection)
+
+
+def _drop_duplicates(tiles: List[Tile], words_by_tile: List[List[Dict[str, Any]]], cell: int) -> List[List[Dict[str, Any]]]:
+    """Keep one copy of every word seen by several tiles.
+
+    Words seen whole by two tiles (inside their overlap) keep the copy from the earlier tile.
+    A clipped word is dropped when another tile has it whole; a word wider than the overlap
+    is clipped in every tile, and then its largest fragment is kept.
+    """
+    grid: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    for tile, words in zip(tiles, words_by_tile):
+        for word in words:
+            word["tile"] = tile
+            word["dropped"] = False
+
+    def nearby(word: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # Every cell a word of at most one cell overlapping this one can have its center in
+        return [
+            other
+            for x in range((word["left"] - cell) // cell, (word["right"] + cell) // cell + 1)
+            for y in range((word["top"] - cell) // cell, (word["bottom"] + cell) // cell + 1)
+            for other in grid.get((x, y), [])
+            if other["tile"] != word["tile"] and not other["dropped"]
+        ]
+
+    for words in words_by_tile:
+        for word in words:
+            if word["clipped"]:
+                continue
+            if any(_iou(word, other) >= DUPLICATE_IOU for other in nearby(word)):
+                word["dropped"] = True
+            else:
+                center = ((word["left"] + word["right"]) // 2 // cell, (word["top"] + word["bottom"]) // 2 // cell)
+                grid.setdefault(center, []).append(word)
+
+    # Whole copies of a clipped word fit inside an overlap, so the grid finds them; the
+    # fragments of a word cut by every tile can be wider than that but are few, so they are scanned
+    fragments: List[Dict[str, Any]] = []
+    clipped = [word for words in words_by_tile for word in words if word["clipped"]]
+    for word in sorted(clipped, key=_area, reverse=True):
+        if (any(_intersection(word, other) >= _area(word) / 2 for other in nearby(word))
+                or any(other["tile"] != word["tile"] and _intersection(word, other) for other in fragments)):
+            word["dropped"] = True
+        else:
+            fragments.append(word)
+    return [[word for word in words if not word["dropped"]] for words in words_by_tile]
+
+
+def _group_lines(words: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    lines: Dict[Any, List[Dict[str, Any]]] = {}
+    for word in words:
+        lines.setdefault(word["line_key"], []).append(word)
+    return list(lines.values())
+
+
+def _continues(line: List[Dict[str, Any]], candidate: List[Dict[str, Any]]) -> bool:
+    # A text line crossing a vertical tile border is split in two; rejoin the halves
+    last, first = line[-1], candidate[0]
+    height = min(last["bottom"] - last["top"], first["bottom"] - first["top"])
+    vertical_overlap = min(last["bottom"], first["bottom"]) - max(last["top"], first["top"])
+    gap = first["left"] - last["right"]
+    return height > 0 and vertical_overlap >= height / 2 and -height <= gap <= 3 * height
+
+
+def stitch_tiles(tiles: List[Tile], tile_data: List[Dict[str, List[Any]]], width: int, height: int,
+                 overlap: int, include_words: bool = False) -> Dict[str, Any]:
+    """Reassemble per-tile OCR into page text; same keys as pdf_rasterizer.summarize_words."""
+    words_by_tile = [tile_words(data, tile, width, height) for tile, data in zip(tiles, tile_data)]
+    words_by_tile = _drop_duplicates(tiles, words_by_tile, max(1, overlap))
+
+    lines_by_tile = {(tile.row, tile.column): _group_lines(words) for tile, words in zip(tiles, words_by_tile)}
+    for tile in tiles:
+        for line in lines_by_tile[(tile.row, tile.column)]:
+            column = tile.column
+            while (tile.row, column + 1) in lines_by_tile:
+                candidates = lines_by_tile[(tile.row, column + 1)]
+                continuation = next((candidate for candidate in candidates if _continues(line, candidate)), None)
+                if continuation is None:
+                    break
+                candidates.remove(continuation)
+                line.extend(continuation)
+                column += 1
+
+    blocks = []
+    ordered_words = []
+    for tile in tiles:
+        paragraphs: List[List[str]] = []
+        previous_paragraph: Optional[Tuple[int, int]] = None
+        for line in lines_by_tile[(tile.row, tile.column)]:
+            paragraph = line[0]["line_key"][:2]
+            if paragraph != previous_paragraph:
+                paragraphs.append([])
+                previous_paragraph = paragraph
+            paragraphs[-1].append(" ".join(word["text"] for word in line))
+            ordered_words.extend(line)
+        blocks.extend("\n".join(paragraph) for paragraph in paragraphs)
+
+    summary = {
+        "text": "\n\n".join(blocks),
+        "confidence": sum(word["confidence"] for word in ordered_words) / len(ordered_words) if ordered_words else None,
+        "text_height": median(word["bottom"] - word["top"] for word in ordered_words) if ordered_words else None,
+    }
+    if include_words:
+        # In page text order, so consumers can pair them with the text's words
+        summary["words"] = [
+            {"text": word["text"], "confidence": word["confidence"], "left": word["left"], "top": word["top"],
+             "width": word["right"] - word["left"], "height": word["bottom"] - word["top"]}
+            for word in ordered_words
+        ]
+    return summary
@@ -0,0 +1,166 @@
+import logging
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from statistics import median
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Optional, Tuple
+
+from archive_input import is_archive_member
+from file_access import copy_input
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Tesseract is most accurate when capital letters are roughly 20-40 pixels tall
+TARGET_TEXT_HEIGHT = 30
+DEFAULT_DPI = 300
+MIN_DPI = 150
+MAX_DPI = 600
+
+
+@contextmanager
+def local_pdf_path(file_path: str) -> Iterator[str]:
+    """Poppler needs a real file; archive members are spooled to a temporary copy."""
+    if not is_archive_member(file_path):
+        yield file_path
+        return
+    with tempfile.NamedTemporaryFile(suffix='.pdf') as temporary_file:
+        copy_input(file_path, temporary_file)
+        temporary_file.flush()
+        yield temporary_file.name
+
+
+def _run_poppler(arguments: List[str], timeout: Optional[float]) -> str:
+    try:
+        completed = subprocess.run(arguments, capture_output=True, timeout=timeout or None, check=True)
+    except subprocess.TimeoutExpired as e:
+        # subprocess.run has already killed the hung tool
+        raise TimeoutError(f"{arguments[0]} timed out after {timeout}s") from e
+    return completed.stdout.decode('utf-8', errors='replace')
+
+
+def _is_usable_text(text: str, min_text_chars: int) -> bool:
+    stripped = "".join(text.split())
+    if len(stripped) < min_text_chars:
+        return False
+    # Broken font encodings extract as symbol soup; such pages still need OCR
+    alphanumeric = sum(1 for character in stripped if character.isalnum())
+    return alphanumeric / len(stripped) >= 0.5
+
+
+def _page_image_resolutions(pdf_path: str, timeout: Optional[float]) -> Dict[int, float]:
+    # pdfimages -list columns: page num type width height color comp bpc enc interp object ID x-ppi y-ppi size ratio
+    largest: Dict[int, Tuple[int, float]] = {}
+    for line in _run_poppler(["pdfimages", "-list", pdf_path], timeout).splitlines()[2:]:
+        columns = line.split()
+        if len(columns) < 14 or not columns[0].isdigit():
+            continue
+        try:
+            page_number, width, height = int(columns[0]), int(columns[3]), int(columns[4])
+            x_ppi, y_ppi = float(columns[12]), float(columns[13])
+        except ValueError:
+            continue
+        # The dominant (largest) image on a scanned page is the scan itself; a small logo or
+        # stamp can be embedded at a much higher resolution and must not decide the page's DPI
+        area = width * height
+        if page_number not in largest or area > largest[page_number][0]:
+            largest[page_number] = (area, min(x_ppi, y_ppi))
+    return {page_number: ppi for page_number, (_, ppi) in largest.items()}
+
+
+def analyze_pdf(pdf_path: str, min_text_chars: int = 20, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Per page: its text layer if usable (no OCR needed) and the resolution of its embedded scan, if any."""
+    # One pdftotext run for the whole document; pages are separated by form feeds
+    page_texts = _run_poppler(["pdftotext", "-layout", "-enc", "UTF-8", pdf_path, "-"], timeout).split("\f")
+    if page_texts and not page_texts[-1].strip():
+        page_texts.pop()
+
+    try:
+        resolutions = _page_image_resolutions(pdf_path, timeout)
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug("Cannot list embedded images of %s: %s", pdf_path, e)
+        resolutions = {}
+
+    pages = []
+    for index, text in enumerate(page_texts):
+        page_number = index + 1
+        pages.append({
+            "page_number": page_number,
+            "text_layer": text if _is_usable_text(text, min_text_chars) else None,
+            "image_ppi": resolutions.get(page_number),
+        })
+    return pages
+
+
+def choose_dpi(image_ppi: Optional[float], min_dpi: int = MIN_DPI, max_dpi: int = MAX_DPI,
+               default_dpi: int = DEFAULT_DPI) -> int:
+    # Rasterizing above the scan's own resolution adds pixels but no detail
+    if not image_ppi:
+        return default_dpi
+    return int(min(max_dpi, max(min_dpi, round(image_ppi))))
+
+
+def refine_dpi(dpi: int, text_height: Optional[float], max_dpi: int = MAX_DPI) -> Optional[int]:
+    """A higher DPI for a low-confidence page, scaled from its measured text height; None if no gain is expected."""
+    if dpi >= max_dpi:
+        return None
+    if text_height:
+        if text_height >= TARGET_TEXT_HEIGHT:
+            # Text is already large enough; resolution is not what limits accuracy
+            return None
+        new_dpi = dpi * TARGET_TEXT_HEIGHT / text_height
+    else:
+        new_dpi = dpi * 1.5
+    return int(min(max_dpi, max(new_dpi, dpi * 1.25)))
+
+
+def rasterize_page(pdf_path: str, page_number: int, dpi: int, timeout: Optional[float] = None) -> "Image.Image":
+    from pdf2image import convert_from_path
+    from pdf2image.exceptions import PDFPopplerTimeoutError
+
+    try:
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number,
+                                   grayscale=True, timeout=timeout or None)
+    except PDFPopplerTimeoutError as e:
+        raise TimeoutError(f"pdftoppm timed out after {timeout}s on page {page_number}") from e
+    return images[0]
+
+
+def summarize_words(data: Dict[str, List[Any]], include_words: bool = False) -> Dict[str, Any]:
+    """Text, mean word confidence and median word height from pytesseract image_to_data(output_type=DICT)."""
+    lines: Dict[Any, List[str]] = {}
+    confidences = []
+    heights = []
+    words = []
+    for index, word in enumerate(data["text"]):
+        confidence = float(data["conf"][index])
+        if confidence < 0 or not word.strip():
+            continue
+        confidences.append(confidence)
+        heights.append(data["height"][index])
+        if include_words:
+            words.append({
+                "text": word, "confidence": confidence, "left": data["left"][index], "top": data["top"][index],
+                "width": data["width"][index], "height": data["height"][index],
+            })
+        key = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+        lines.setdefault(key, []).append(word)
+
+    paragraphs: List[List[str]] = []
+    previous_paragraph = None
+    for (block_number, paragraph_number, _), line in lines.items():
+        if (block_number, paragraph_number) != previous_paragraph:
+            paragraphs.append([])
+            previous_paragraph = (block_number, paragraph_number)
+        paragraphs[-1].append(" ".join(line))
+
+    summary = {
+        "text": "\n\n".join("\n".join(paragraph) for paragraph in paragraphs),
+        "confidence": sum(confidences) / len(confidences) if confidences else None,
+        "text_height": median(heights) if heights else None,
+    }
+    if include_words:
+        summary["words"] = words
+    return summary
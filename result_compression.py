@@ -0,0 +1,121 @@
+import argparse
+import gzip
+import json
+import random
+import sys
+from typing import Dict, Any, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd output is optional; gzip is always available
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+_dictionary_cache: Dict[str, Any] = {}
+
+
+def _load_zstd_dictionary(dictionary_path: Optional[str]):
+    if not dictionary_path:
+        return None
+    if dictionary_path not in _dictionary_cache:
+        with open(dictionary_path, 'rb') as f:
+            _dictionary_cache[dictionary_path] = zstandard.ZstdCompressionDict(f.read())
+    return _dictionary_cache[dictionary_path]
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("zstd compression requires the 'zstandard' package (see environment.yml)")
+
+
+class ResultCodec:
+    """Serializes result dicts to (optionally compressed) JSON bytes."""
+
+    def __init__(self, compression: str = 'none', level: Optional[int] = None, zstd_dictionary: Optional[str] = None):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression}")
+        self.compression = compression
+        self.suffix = COMPRESSION_SUFFIXES[compression]
+        self.level = level
+        self._compressor = None
+        if compression == 'zstd':
+            _require_zstandard()
+            self._compressor = zstandard.ZstdCompressor(
+                level=level or 3, dict_data=_load_zstd_dictionary(zstd_dictionary), write_content_size=True
+            )
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        if self.compression == 'none':
+            return json.dumps(data, indent=2).encode('utf-8')
+
+        # Whitespace is wasted work once the output is compressed anyway
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        if self.compression == 'gzip':
+            return gzip.compress(payload, compresslevel=self.level or 6, mtime=0)
+        return self._compressor.compress(payload)
+
+
+def decode_result(data: bytes, zstd_dictionary: Optional[str] = None) -> Any:
+    """Decode JSON bytes written in any supported compression, detected from the frame header."""
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+    elif data[:4] == ZSTD_MAGIC:
+        _require_zstandard()
+        decompressor = zstandard.ZstdDecompressor(dict_data=_load_zstd_dictionary(zstd_dictionary))
+        try:
+            data = decompressor.decompress(data)
+        except zstandard.ZstdError as e:
+            # Usually a missing or different dictionary; callers treat ValueError as an unreadable result
+            raise ValueError(f"Cannot decompress zstd result: {e}")
+    return json.loads(data)
+
+
+def load_result(path: str, zstd_dictionary: Optional[str] = None) -> Any:
+    with open(path, 'rb') as f:
+        return decode_result(f.read(), zstd_dictionary)
+
+
+def train_zstd_dictionary(sample_paths: List[str], dictionary_path: str, dictionary_size: int = 112640,
+                          max_samples: int = 2000, zstd_dictionary: Optional[str] = None) -> int:
+    """Train a shared dictionary on existing results so small files compress well."""
+    _require_zstandard()
+    if len(sample_paths) > max_samples:
+        sample_paths = random.sample(sample_paths, max_samples)
+    samples = [
+        json.dumps(load_result(path, zstd_dictionary), separators=(',', ':')).encode('utf-8')
+        for path in sample_paths
+    ]
+    dictionary = zstandard.train_dictionary(dictionary_size, samples)
+    with open(dictionary_path, 'wb') as f:
+        f.write(dictionary.as_bytes())
+    return len(samples)
+
+
+if __name__ == "__main__":
+    from output_formatter import iter_result_files
+
+    parser = argparse.ArgumentParser(description="Inspect compressed OCR output or train a zstd dictionary")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    cat_parser = subparsers.add_parser("cat", help="Print a result or metadata file as indented JSON")
+    cat_parser.add_argument("path", help="Path to a .json, .json.gz or .json.zst output file")
+    cat_parser.add_argument("--zstd-dictionary", help="Dictionary the file was compressed with")
+
+    train_parser = subparsers.add_parser("train", help="Train a zstd dictionary from existing results")
+    train_parser.add_argument("output_dir", help="Output directory to sample results from")
+    train_parser.add_argument("dictionary_path", help="Where to write the trained dictionary")
+    train_parser.add_argument("--size", type=int, default=112640, help="Dictionary size in bytes")
+    train_parser.add_argument("--zstd-dictionary", help="Dictionary existing zstd results were compressed with")
+
+    args = parser.parse_args()
+    if args.command == "cat":
+        json.dump(load_result(args.path, args.zstd_dictionary), sys.stdout, indent=2)
+        print()
+    else:
+        paths = [result_path for result_path, _ in iter_result_files(args.output_dir)]
+        count = train_zstd_dictionary(paths, args.dictionary_path, args.size, zstd_dictionary=args.zstd_dictionary)
+        print(f"Trained {args.dictionary_path} from {count} file(s)")
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from ocr_engine import OCREngineError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# category -> (max attempts, multiple of the policy's base delay)
+DEFAULT_RETRY_RULES: Dict[str, Tuple[int, float]] = {
+    "Input Validation": (1, 0.0),  # a corrupt or unsupported file does not get better
+    "Timeout": (2, 1.0),
+    "File System": (4, 0.5),  # NFS/SMB hiccups usually clear within seconds
+    "OCR Engine": (3, 1.0),  # engine crashes, transient subprocess failures
+    "Rate Limit": (6, 5.0),  # cloud engines throttling us back off harder
+}
+
+
+class RetryPolicy:
+    """Retries OCREngineErrors with exponential backoff and full jitter, per error category.
+
+    Critical errors get at most one retry; categories without a rule use `max_attempts`,
+    which also caps every rule.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                 rules: Optional[Dict[str, Tuple[int, float]]] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rules = dict(DEFAULT_RETRY_RULES if rules is None else rules)
+
+    def attempts_allowed(self, error: OCREngineError) -> int:
+        attempts, _ = self.rules.get(error.category, (self.max_attempts, 1.0))
+        if error.severity == "critical":
+            attempts = min(attempts, 2)
+        return min(attempts, self.max_attempts)
+
+    def next_delay(self, error: OCREngineError, attempt: int) -> Optional[float]:
+        """Seconds to wait before attempt + 1, or None if the error is not retried again."""
+        if attempt >= self.attempts_allowed(error):
+            return None
+        _, scale = self.rules.get(error.category, (self.max_attempts, 1.0))
+        return random.uniform(0, min(self.max_delay, self.base_delay * scale * 2 ** (attempt - 1)))
+
+    async def run(self, operation: Callable[[], Awaitable[T]], description: str) -> T:
+        attempt = 1
+        while True:
+            try:
+                return await operation()
+            except OCREngineError as e:
+                e.attempts = attempt
+                delay = self.next_delay(e, attempt)
+                if delay is None:
+                    raise
+                logger.warning(
+                    "%s failed (%s); retrying in %.1fs", description, e, delay,
+                    extra={"category": e.category, "severity": e.severity, "attempt": attempt}
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+class DeadLetterQueue:
+    """Files that still failed after retries, kept as an append-only JSON Lines log.
+
+    A later "resolved" line cancels an entry, so a crash never loses what was recorded;
+    compact() rewrites the file with only the outstanding entries.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-write
+                    logger.warning("Skipping unreadable dead-letter entry", extra={"path": self.path, "line": line_number})
+                    continue
+                if entry.get("resolved"):
+                    self.entries.pop(entry["file_path"], None)
+                else:
+                    self.entries[entry["file_path"]] = entry
+
+    def _append(self, entry: Dict[str, Any]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def record(self, file_path: str, source_path: str, errors: Dict[str, Any]):
+        entry = {"file_path": file_path, "source_path": source_path, "failed_at": time.time(), "errors": errors}
+        self.entries[file_path] = entry
+        self._append(entry)
+
+    def resolve(self, file_path: str):
+        if self.entries.pop(file_path, None) is not None:
+            self._append({"file_path": file_path, "resolved": True})
+
+    def pending(self) -> List[Dict[str, Any]]:
+        return list(self.entries.values())
+
+    def compact(self):
+        if not os.path.exists(self.path):
+            return
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(temporary_path, self.path)
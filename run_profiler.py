@@ -0,0 +1,204 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+
+from archive_input import open_input
+
+logger = logging.getLogger(__name__)
+
+_current_file: contextvars.ContextVar[Optional["FileProfile"]] = contextvars.ContextVar("profiled_file", default=None)
+# Set only for sampled files; the sampler thread reads it out of the context a frame is running in
+_current_stage: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("profiled_stage", default=None)
+
+
+class FileProfile:
+    def __init__(self, file_path: str, sampled: bool):
+        self.file_path = file_path
+        self.sampled = sampled
+        self.stages: Dict[str, float] = {}
+        self.elapsed = 0.0
+        self.file_size: Optional[int] = None
+        self.pages: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "file_path": self.file_path,
+            "elapsed": self.elapsed,
+            "file_size": self.file_size,
+            "pages": self.pages,
+            "stages": dict(sorted(self.stages.items(), key=lambda item: -item[1])),
+            "sampled": self.sampled,
+        }
+
+
+@contextmanager
+def profile_stage(stage: str) -> Iterator[None]:
+    """Time a stage of the current file; a no-op unless a RunProfiler is profiling this file."""
+    profile = _current_file.get()
+    if profile is None:
+        yield
+        return
+    token = _current_stage.set(stage) if profile.sampled else None
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.stages[stage] = profile.stages.get(stage, 0.0) + time.perf_counter() - start_time
+        if token is not None:
+            _current_stage.reset(token)
+
+
+def _runner_context(frame) -> Optional[contextvars.Context]:
+    """The context a frame runs its callee in, if the frame is an asyncio task step or an executor job."""
+    if frame.f_code.co_name not in ("_run", "run"):
+        return None
+    owner = frame.f_locals.get("self")
+    # asyncio.Handle._run runs each task step in the task's context
+    context = getattr(owner, "_context", None)
+    if isinstance(context, contextvars.Context):
+        return context
+    # asyncio.to_thread and OCREngine.run_blocking submit functools.partial(context.run, func, ...) as the work item's fn
+    job = getattr(owner, "fn", None)
+    if isinstance(job, functools.partial) and isinstance(getattr(job.func, "__self__", None), contextvars.Context):
+        return job.func.__self__
+    return None
+
+
+class RunProfiler:
+    """Opt-in per-file stage timing plus a sampling profiler over a random fraction of files.
+
+    Stacks are written in collapsed ("folded") form, rooted at the stage name, for flamegraph.pl or
+    speedscope; the slowest files are reported with their size, dimensions and page count.
+    """
+
+    def __init__(self, output_prefix: str, sample_rate: float = 0.1, top_n: int = 20, interval: float = 0.005):
+        self.output_prefix = output_prefix
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self.interval = interval
+        self.stack_counts: Counter = Counter()
+        self.samples_taken = 0
+        self._profiles: List[FileProfile] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="multiocr-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.write_reports()
+
+    @contextmanager
+    def profile_file(self, file_path: str) -> Iterator[FileProfile]:
+        profile = FileProfile(file_path, random.random() < self.sample_rate)
+        token = _current_file.set(profile)
+        start_time = time.perf_counter()
+        try:
+            yield profile
+        finally:
+            profile.elapsed = time.perf_counter() - start_time
+            _current_file.reset(token)
+            self._profiles.append(profile)
+
+    @staticmethod
+    def record_outcome(profile: FileProfile, metadata: Dict[str, Any], results: Dict[str, Any]):
+        profile.file_size = metadata.get("file_size")
+        page_counts = [len(result.get("pages") or []) for result in results.values() if isinstance(result, dict)]
+        profile.pages = max(page_counts) if page_counts else None
+
+    def _sample_loop(self):
+        own_thread = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                try:
+                    self._sample_thread(frame)
+                except Exception:
+                    # Frames change under us; a torn sample is simply dropped
+                    continue
+
+    def _sample_thread(self, leaf):
+        runner = leaf
+        while runner is not None:
+            context = _runner_context(runner)
+            if context is not None:
+                break
+            runner = runner.f_back
+        stage = context.get(_current_stage) if runner is not None else None
+        if stage is None:
+            return
+
+        # Only the frames above the asyncio/executor machinery that runs the stage
+        stack = []
+        frame = leaf
+        while frame is not runner:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(stage)
+        self.stack_counts[";".join(reversed(stack))] += 1
+        self.samples_taken += 1
+
+    def _dimensions(self, file_path: str) -> Optional[List[int]]:
+        if os.path.splitext(file_path)[1].lower() == '.pdf':
+            return None
+        try:
+            from PIL import Image
+            with open_input(file_path) as f, Image.open(f) as image:
+                return list(image.size)
+        except Exception:
+            return None
+
+    def slowest_files(self) -> List[Dict[str, Any]]:
+        slowest = sorted(self._profiles, key=lambda profile: -profile.elapsed)[:self.top_n]
+        report = []
+        for profile in slowest:
+            entry = profile.to_dict()
+            entry["dimensions"] = self._dimensions(profile.file_path)
+            report.append(entry)
+        return report
+
+    def stage_totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for profile in self._profiles:
+            for stage, seconds in profile.stages.items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    def write_reports(self):
+        directory = os.path.dirname(self.output_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.output_prefix}.collapsed", 'w', encoding='utf-8') as f:
+            for stack, count in self.stack_counts.most_common():
+                f.write(f"{stack} {count}\n")
+        report = {
+            "files_profiled": len(self._profiles),
+            "files_sampled": sum(1 for profile in self._profiles if profile.sampled),
+            "samples": self.samples_taken,
+            "sample_interval": self.interval,
+            "stage_totals": self.stage_totals(),
+            "slowest_files": self.slowest_files(),
+        }
+        with open(f"{self.output_prefix}_report.json", 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info("Profile written", extra={
+            "collapsed_stacks": f"{self.output_prefix}.collapsed", "report": f"{self.output_prefix}_report.json",
+            "samples": self.samples_taken
+        })
@@ -0,0 +1,193 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Any, List, Optional
+
+from output_formatter import iter_result_files
+from result_compression import load_result
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    source_path TEXT NOT NULL UNIQUE,
+    file_type TEXT,
+    file_size INTEGER,
+    modification_time REAL,
+    metadata TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(
+    text,
+    engine UNINDEXED,
+    page_number UNINDEXED,
+    doc_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+-- FTS5 cannot index doc_id, so a document's pages are found (and deleted) by rowid through this table
+CREATE TABLE IF NOT EXISTS document_pages (
+    page_rowid INTEGER PRIMARY KEY,
+    doc_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS document_pages_doc_id ON document_pages (doc_id);
+"""
+
+
+class SearchIndex:
+    """Page-level full-text index over OCR results, backed by SQLite FTS5."""
+
+    def __init__(self, db_path: str, commit_every: int = 200, commit_interval: float = 2.0):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def _delete_pages(self, cursor: sqlite3.Cursor, doc_id: int):
+        rowids = cursor.execute("SELECT page_rowid FROM document_pages WHERE doc_id = ?", (doc_id,)).fetchall()
+        cursor.executemany("DELETE FROM pages WHERE rowid = ?", rowids)
+        cursor.execute("DELETE FROM document_pages WHERE doc_id = ?", (doc_id,))
+
+    def add_result(self, source_path: str, results: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None):
+        """Index (or re-index) every engine's pages for one source file."""
+        metadata = metadata or {}
+        source_path = os.path.abspath(source_path)
+        cursor = self.connection.cursor()
+
+        row = cursor.execute("SELECT doc_id FROM documents WHERE source_path = ?", (source_path,)).fetchone()
+        if row:
+            doc_id = row[0]
+            self._delete_pages(cursor, doc_id)
+            cursor.execute(
+                "UPDATE documents SET file_type = ?, file_size = ?, modification_time = ?, metadata = ?, indexed_at = ? "
+                "WHERE doc_id = ?",
+                (metadata.get("file_type"), metadata.get("file_size"), metadata.get("modification_time"),
+                 json.dumps(metadata), time.time(), doc_id)
+            )
+        else:
+            cursor.execute(
+                "INSERT INTO documents (source_path, file_type, file_size, modification_time, metadata, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (source_path, metadata.get("file_type"), metadata.get("file_size"), metadata.get("modification_time"),
+                 json.dumps(metadata), time.time())
+            )
+            doc_id = cursor.lastrowid
+
+        for engine_name, engine_result in results.items():
+            if not isinstance(engine_result, dict) or "error" in engine_result:
+                continue
+            pages = engine_result.get("pages") or [{"page_number": 1, "text": engine_result.get("text", "")}]
+            for page in pages:
+                if page.get("text"):
+                    cursor.execute(
+                        "INSERT INTO pages (text, engine, page_number, doc_id) VALUES (?, ?, ?, ?)",
+                        (page["text"], engine_name, page.get("page_number"), doc_id)
+                    )
+                    cursor.execute("INSERT INTO document_pages (page_rowid, doc_id) VALUES (?, ?)", (cursor.lastrowid, doc_id))
+
+        self._pending += 1
+        if self._pending >= self.commit_every or time.monotonic() - self._last_commit >= self.commit_interval:
+            self.commit()
+
+    def remove(self, source_path: str):
+        source_path = os.path.abspath(source_path)
+        cursor = self.connection.cursor()
+        row = cursor.execute("SELECT doc_id FROM documents WHERE source_path = ?", (source_path,)).fetchone()
+        if row:
+            self._delete_pages(cursor, row[0])
+            cursor.execute("DELETE FROM documents WHERE doc_id = ?", (row[0],))
+            self.commit()
+
+    def is_current(self, source_path: str, modification_time: Optional[float]) -> bool:
+        row = self.connection.execute(
+            "SELECT modification_time FROM documents WHERE source_path = ?", (os.path.abspath(source_path),)
+        ).fetchone()
+        return bool(row) and row[0] is not None and row[0] == modification_time
+
+    def search(self, query: str, limit: int = 20, engine: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = (
+            "SELECT d.source_path, p.engine, p.page_number, "
+            "snippet(pages, 0, '[', ']', '...', 12), bm25(pages) "
+            "FROM pages p JOIN documents d ON d.doc_id = p.doc_id "
+            "WHERE pages MATCH ?"
+        )
+        params: List[Any] = [query]
+        if engine:
+            sql += " AND p.engine = ?"
+            params.append(engine)
+        sql += " ORDER BY bm25(pages) LIMIT ?"
+        params.append(limit)
+
+        return [
+            {"source_path": source_path, "engine": engine_name, "page_number": page_number, "snippet": snippet, "score": -score}
+            for source_path, engine_name, page_number, snippet, score in self.connection.execute(sql, params)
+        ]
+
+    def index_output_dir(self, output_dir: str, zstd_dictionary: Optional[str] = None) -> int:
+        """Back-fill the index from existing *_ocr_result.json files, skipping unchanged sources."""
+        indexed = 0
+        for result_path, metadata_path in iter_result_files(output_dir):
+            try:
+                metadata = load_result(metadata_path, zstd_dictionary)
+                source_path = metadata.get("file_path") or result_path
+                if self.is_current(source_path, metadata.get("modification_time")):
+                    continue
+                results = load_result(result_path, zstd_dictionary)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable result %s: %s", result_path, e)
+                continue
+            self.add_result(source_path, results, metadata)
+            indexed += 1
+        self.commit()
+        return indexed
+
+    def commit(self):
+        self.connection.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def flush(self):
+        self.commit()
+
+    def close(self):
+        self.commit()
+        self.connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search or build the MultiOCR full-text index")
+    parser.add_argument("--db", default=os.path.join("ocr_output", "search_index.db"), help="Path to the SQLite index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search_parser = subparsers.add_parser("search", help="Find files and pages matching an FTS5 query")
+    search_parser.add_argument("query", help='FTS5 query, e.g. \'"invoice total" AND marysville\'')
+    search_parser.add_argument("--limit", type=int, default=20, help="Maximum number of matching pages")
+    search_parser.add_argument("--engine", help="Only return matches from this engine")
+
+    index_parser = subparsers.add_parser("index", help="Incrementally index an existing output directory")
+    index_parser.add_argument("output_dir", help="Output directory containing *_ocr_result.json files (any layout)")
+    index_parser.add_argument("--zstd-dictionary", help="Dictionary zstd-compressed results were written with")
+
+    args = parser.parse_args()
+    index = SearchIndex(args.db)
+    try:
+        if args.command == "search":
+            start_time = time.perf_counter()
+            matches = index.search(args.query, args.limit, args.engine)
+            for match in matches:
+                print(f"{match['source_path']} [page {match['page_number']}, {match['engine']}]: {' '.join(match['snippet'].split())}")
+            print(f"{len(matches)} match(es) in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+        else:
+            print(f"Indexed {index.index_output_dir(args.output_dir, args.zstd_dictionary)} file(s)")
+    finally:
+        index.close()
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+from ocr_engine_manager import OCREngineManager
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CODES = {"GREEN": 0, "YELLOW": 1, "RED": 2}
+
+
+class StatusServer:
+    """Minimal read-only HTTP endpoint exposing live progress of an OCREngineManager run."""
+
+    def __init__(self, manager: OCREngineManager, host: str = "127.0.0.1", port: int = 8080):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        # Port 0 asks the OS for a free port; report the one actually bound
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Status endpoint listening", extra={"host": self.host, "port": self.port})
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def get_status(self) -> Dict[str, Any]:
+        status = self.manager.get_progress()
+        status["health"] = self.manager.get_health_report()
+        return status
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain headers; the endpoints take no request body
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.decode("latin-1").split()
+            method, path = (parts[0], parts[1]) if len(parts) >= 2 else ("", "")
+            status_code, content_type, body = self._route(method, path.split("?", 1)[0])
+
+            writer.write(
+                f"HTTP/1.1 {status_code}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _route(self, method: str, path: str) -> Tuple[str, str, bytes]:
+        if method != "GET":
+            return "405 Method Not Allowed", "text/plain", b"Method Not Allowed\n"
+        if path in ("/", "/status"):
+            return "200 OK", "application/json", json.dumps(self.get_status(), indent=2).encode()
+        if path == "/health":
+            overall = self.manager.get_overall_health()
+            code = "503 Service Unavailable" if overall == "RED" else "200 OK"
+            return code, "text/plain", f"{overall}\n".encode()
+        if path == "/metrics":
+            return "200 OK", "text/plain; version=0.0.4", self._render_metrics().encode()
+        return "404 Not Found", "text/plain", b"Not Found\n"
+
+    def _render_metrics(self) -> str:
+        progress = self.manager.get_progress()
+        lines = [
+            f"multiocr_queue_depth {progress['queue_depth']}",
+            f"multiocr_files_total {progress['files_total']}",
+            f"multiocr_files_done {progress['files_done']}",
+            f"multiocr_files_failed {progress['files_failed']}",
+            f"multiocr_files_in_progress {progress['files_in_progress']}",
+            f"multiocr_files_per_second {progress['files_per_sec'] or 0}",
+        ]
+        if progress["eta_seconds"] is not None:
+            lines.append(f"multiocr_eta_seconds {progress['eta_seconds']}")
+
+        for name, engine in self.manager.get_health_report()["engines"].items():
+            label = f'engine="{name}"'
+            lines.append(f"multiocr_engine_health{{{label}}} {HEALTH_CODES.get(engine['status'], 2)}")
+            lines.append(f"multiocr_engine_concurrency_limit{{{label}}} {engine['concurrency_limit']}")
+            lines.append(f"multiocr_engine_in_flight{{{label}}} {engine['in_flight']}")
+            for window, stats in engine["windows"].items():
+                window_label = f'{label},window="{window}"'
+                lines.append(f"multiocr_engine_requests{{{window_label}}} {stats['requests']}")
+                lines.append(f"multiocr_engine_failures{{{window_label}}} {stats['failures']}")
+                lines.append(f"multiocr_engine_pages_per_second{{{window_label}}} {stats['pages_per_sec']}")
+                if stats["latency_p99"] is not None:
+                    lines.append(f"multiocr_engine_latency_p99_seconds{{{window_label}}} {stats['latency_p99']}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,153 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+
+correlation_id_var: contextvars.ContextVar = contextvars.ContextVar("correlation_id", default=None)
+source_path_var: contextvars.ContextVar = contextvars.ContextVar("source_path", default=None)
+
+# Attributes every LogRecord carries; anything else was passed through `extra=` and is emitted as a field
+_STANDARD_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextmanager
+def correlation_context(source_path: Optional[str] = None, correlation_id: Optional[str] = None):
+    """Tag every log record emitted in this context (including child asyncio tasks) with one ID."""
+    id_token = correlation_id_var.set(correlation_id or uuid.uuid4().hex[:12])
+    path_token = source_path_var.set(source_path)
+    try:
+        yield correlation_id_var.get()
+    finally:
+        correlation_id_var.reset(id_token)
+        source_path_var.reset(path_token)
+
+
+class ContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Runs on the producing thread/task, before the record crosses the queue
+        record.correlation_id = correlation_id_var.get()
+        record.source_path = source_path_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Let an identical warning/error through at most once per interval, counting the rest."""
+
+    def __init__(self, interval: float = 10.0, min_level: int = logging.WARNING, max_keys: int = 10000):
+        super().__init__()
+        self.interval = interval
+        self.min_level = min_level
+        self.max_keys = max_keys
+        self._seen: Dict[Tuple[str, int, str, Optional[str]], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+
+        # Only truly identical messages collapse: the same error for different files (or under a
+        # different correlation id) still gets through
+        try:
+            message = record.getMessage()
+        except (TypeError, ValueError):
+            message = str(record.msg)
+        key = (record.name, record.levelno, message, getattr(record, "correlation_id", None))
+        now = time.monotonic()
+        with self._lock:
+            last_emitted, suppressed = self._seen.get(key, (None, 0))
+            if last_emitted is not None and now - last_emitted < self.interval:
+                self._seen[key] = (last_emitted, suppressed + 1)
+                return False
+            if len(self._seen) >= self.max_keys:
+                self._seen.clear()
+            self._seen[key] = (now, 0)
+
+        if suppressed:
+            record.suppressed_repeats = suppressed
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_RECORD_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _PreformattedQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the stock prepare(), leave formatting to the listener; only freeze the
+        # message and traceback so the record no longer references live objects
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: int = logging.INFO, log_file: Optional[str] = None, json_format: bool = True,
+                  rate_limit_interval: float = 10.0) -> logging.handlers.QueueListener:
+    """Route all logging through a queue so formatting and I/O happen on a background thread."""
+    global _listener
+    shutdown_logging()
+
+    if log_file:
+        output_handler: logging.Handler = logging.FileHandler(log_file)
+    else:
+        output_handler = logging.StreamHandler(sys.stderr)
+    if json_format:
+        output_handler.setFormatter(JsonFormatter())
+    else:
+        output_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s'))
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = _PreformattedQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    if rate_limit_interval:
+        queue_handler.addFilter(RateLimitFilter(rate_limit_interval))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
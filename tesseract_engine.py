@@ -1,77 +1,405 @@
 import asyncio
-from typing import Dict, Any, List
-from collections import deque
-import pytesseract
-from PIL import Image
+import contextvars
+import logging
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 import os
+import tempfile
 from datetime import datetime
 
-from ocr_engine import OCREngine, OCREngineError
+from ocr_engine import OCREngine, OCREngineError, ResourceProfile
+from archive_input import is_archive_member, open_input
+from engine_version_cache import get_binary_version
+from blank_page import classify_page
+from page_tiling import plan_tiles, stitch_tiles
+from language_detection import candidate_languages, guess_language, languages_for_script, osd_image, parse_osd, spans_several_scripts
+from pdf_rasterizer import (
+    DEFAULT_DPI, MAX_DPI, MIN_DPI, analyze_pdf, choose_dpi, local_pdf_path, rasterize_page, refine_dpi, summarize_words
+)
+
+# pytesseract (which pulls in numpy) and PIL are imported on first use to keep CLI startup fast
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Language detected on earlier pages of the file being processed; later pages try it first
+_document_language: contextvars.ContextVar[Optional[Dict[str, str]]] = contextvars.ContextVar("document_language", default=None)
 
 class TesseractEngine(OCREngine):
+    # Each call runs a tesseract process that keeps one core busy
+    resource_profile = ResourceProfile("cpu", memory_per_page_mb=300)
+
     def __init__(self, engine_options: Dict[str, Any] = None):
         super().__init__(engine_options)
-        self.name = "Tesseract"
+        # Distinct names let several Tesseract configurations run side by side, e.g. for consensus
+        self.name = self.engine_options.get('name', "Tesseract")
         self.supported_file_types = ['.pdf', '.png', '.jpg', '.jpeg', '.tif', '.tiff', '.gif']
-        self.health_queue = deque(maxlen=10)  # Store last 10 operation statuses
         self.initialize_engine()
 
     def initialize_engine(self):
         try:
-            self.tesseract_version = str(pytesseract.get_tesseract_version())  # Convert to string
-            self.health_queue.append(True)
+            import pytesseract
+            # Cached per binary path/size/mtime, so upgrading tesseract is picked up without a manual reset
+            self.tesseract_version = get_binary_version(
+                pytesseract.pytesseract.tesseract_cmd, lambda: str(pytesseract.get_tesseract_version())
+            )
+            logger.debug("Initialized Tesseract", extra={"tesseract_version": self.tesseract_version})
         except Exception as e:
-            self.health_queue.append(False)
             raise OCREngineError(f"Failed to initialize Tesseract: {str(e)}", "OCR Engine", "critical")
 
     async def prepare_file(self, file_path: str) -> str:
-        if not os.path.exists(file_path):
+        from PIL import Image
+        file_extension = os.path.splitext(file_path)[1].lower()
+        # Opening the file doubles as the existence/permission check, saving separate syscalls
+        try:
+            with open_input(file_path) as f:
+                if file_extension == '.pdf':
+                    if f.read(5) != b'%PDF-':
+                        raise ValueError("missing %PDF- header")
+                else:
+                    with Image.open(f) as img:
+                        img.verify()
+        except FileNotFoundError:
             raise OCREngineError(f"File not found: {file_path}", "File System", "error")
-        if not os.access(file_path, os.R_OK):
+        except PermissionError:
             raise OCREngineError(f"No read permission for file: {file_path}", "File System", "error")
-        
-        # Verify file integrity
-        try:
-            with Image.open(file_path) as img:
-                img.verify()
         except Exception as e:
             raise OCREngineError(f"Invalid or corrupted image file: {file_path}. Error: {str(e)}", "Input Validation", "error")
-        
-        file_extension = os.path.splitext(file_path)[1].lower()
+
         if file_extension not in self.supported_file_types:
             raise OCREngineError(f"Unsupported file type: {file_extension}", "Input Validation", "error")
         return file_path
 
     async def process_file(self, prepared_file: str) -> Dict[str, Any]:
+        from PIL import Image
         try:
             start_time = datetime.now()
-            with Image.open(prepared_file) as image:
-                result = await asyncio.to_thread(
-                    pytesseract.image_to_string,
-                    image,
-                    lang=self.engine_options.get('lang', 'eng'),
-                    config=self.engine_options.get('config', '--psm 1')
-                )
+            token = _document_language.set({})
+            try:
+                if os.path.splitext(prepared_file)[1].lower() == '.pdf':
+                    pages = await self._process_pdf(prepared_file)
+                else:
+                    with open_input(prepared_file) as f, Image.open(f) as image:
+                        pages = await self._process_frames(image)
+            finally:
+                _document_language.reset(token)
             processing_time = (datetime.now() - start_time).total_seconds()
-            return {"raw_result": result, "processing_time": processing_time}
+            logger.debug("Tesseract finished", extra={"processing_time": processing_time, "pages": len(pages)})
+            return {"pages": pages, "processing_time": processing_time}
+        except TimeoutError:
+            raise OCREngineError(
+                f"Tesseract timed out after {self.engine_options.get('timeout')}s on {prepared_file}", "Timeout", "error"
+            )
         except Exception as e:
-            self.health_queue.append(False)
             raise OCREngineError(f"Tesseract processing failed: {str(e)}", "OCR Engine", "error")
 
+    async def _process_frames(self, image: "Image.Image") -> List[Dict[str, Any]]:
+        # Multi-frame TIFF/GIF: seek() decodes one frame at a time, and at most
+        # page_concurrency decoded frames are alive while their OCR runs in parallel
+        # Counting TIFF frames walks every IFD, so it stays off the event loop like the decoding
+        frame_count = await self.run_blocking(getattr, image, 'n_frames', 1)
+        semaphore = asyncio.Semaphore(max(1, self.engine_options.get('page_concurrency', 2)))
+        tasks = []
+        try:
+            for frame_index in range(frame_count):
+                await semaphore.acquire()
+                try:
+                    frame = await self.run_blocking(_load_frame, image, frame_index) if frame_count > 1 else image
+                except BaseException:
+                    semaphore.release()
+                    raise
+                tasks.append(asyncio.create_task(self._ocr_page_and_release(frame, frame_index + 1, semaphore)))
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def get_max_batch_size(self) -> int:
+        return self.engine_options.get('max_batch_size', 8)
+
+    async def process_batch(self, prepared_files: List[str]) -> List[Dict[str, Any]]:
+        # One tesseract process over a list of single-page images loads the language model once, not per file
+        blank_flags = await self.run_blocking(self._plan_batch, prepared_files) if len(prepared_files) > 1 else None
+        if blank_flags is None:
+            return await super().process_batch(prepared_files)
+        try:
+            return await self._process_image_list(prepared_files, blank_flags)
+        except Exception as e:
+            logger.warning("Batched Tesseract call failed (%s); processing files individually", e)
+            return await super().process_batch(prepared_files)
+
+    def _plan_batch(self, file_paths: List[str]) -> Optional[List[bool]]:
+        """Blank flag per file if every file can share one tesseract call, else None."""
+        if self.engine_options.get('word_confidences') or self._detects_language():
+            # The list-file call returns plain text in one language for every file
+            return None
+        tile_size = self.engine_options.get('tile_size')
+        blank_flags = []
+        for file_path in file_paths:
+            # Tesseract reads the list file itself, so members and multi-page inputs take the normal path
+            if is_archive_member(file_path) or "\n" in file_path or os.path.splitext(file_path)[1].lower() == '.pdf':
+                return None
+            from PIL import Image
+            with Image.open(file_path) as image:
+                if getattr(image, 'n_frames', 1) > 1 or (tile_size and max(image.size) > tile_size * 1.5):
+                    return None
+                blank_flags.append(
+                    self.engine_options.get('blank_detection', False) and classify_page(image, self.engine_options)["blank"]
+                )
+        return blank_flags
+
+    async def _process_image_list(self, file_paths: List[str], blank_flags: List[bool]) -> List[Dict[str, Any]]:
+        import pytesseract
+        start_time = datetime.now()
+        to_ocr = [file_path for file_path, blank in zip(file_paths, blank_flags) if not blank]
+        texts = iter([])
+        if to_ocr:
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', prefix='multiocr_batch_') as list_file:
+                list_file.write("\n".join(os.path.abspath(file_path) for file_path in to_ocr) + "\n")
+                list_file.flush()
+                output = await self._run_tesseract(pytesseract.image_to_string, list_file.name, pages=len(to_ocr))
+            # Tesseract ends every page with a form feed
+            parts = output.split("\f")
+            if parts and not parts[-1].strip():
+                parts.pop()
+            if len(parts) != len(to_ocr):
+                raise ValueError(f"expected {len(to_ocr)} pages of output, got {len(parts)}")
+            texts = iter(parts)
+
+        processing_time = (datetime.now() - start_time).total_seconds() / len(file_paths)
+        raw_results = []
+        for blank in blank_flags:
+            page = {"page_number": 1, "text": "", "skipped": "blank"} if blank else {"page_number": 1, "text": next(texts)}
+            page["processing_time"] = processing_time
+            raw_results.append({"pages": [page], "processing_time": processing_time, "batch_size": len(file_paths)})
+        return raw_results
+
+    async def _process_pdf(self, file_path: str) -> List[Dict[str, Any]]:
+        # Born-digital pages keep their text layer and cost no OCR; scanned pages are
+        # rasterized at a DPI matched to the embedded scan instead of a fixed default
+        with local_pdf_path(file_path) as pdf_path:
+            pdf_pages = await self.run_blocking(
+                analyze_pdf, pdf_path, self.engine_options.get('min_text_layer_chars', 20), self._poppler_timeout()
+            )
+            semaphore = asyncio.Semaphore(max(1, self.engine_options.get('page_concurrency', 2)))
+
+            async def process_page(pdf_page: Dict[str, Any]) -> Dict[str, Any]:
+                if pdf_page["text_layer"] is not None and not self.engine_options.get('force_ocr'):
+                    return {"page_number": pdf_page["page_number"], "text": pdf_page["text_layer"],
+                            "source": "text_layer", "processing_time": 0.0}
+                async with semaphore:
+                    return await self._ocr_pdf_page(pdf_path, pdf_page)
+
+            tasks = [asyncio.create_task(process_page(pdf_page)) for pdf_page in pdf_pages]
+            try:
+                return list(await asyncio.gather(*tasks))
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+    async def _ocr_pdf_page(self, pdf_path: str, pdf_page: Dict[str, Any]) -> Dict[str, Any]:
+        page_number = pdf_page["page_number"]
+        max_dpi = self.engine_options.get('max_dpi', MAX_DPI)
+        dpi = choose_dpi(pdf_page["image_ppi"], self.engine_options.get('min_dpi', MIN_DPI), max_dpi,
+                         self.engine_options.get('dpi', DEFAULT_DPI))
+        fallback = None
+        try:
+            image = await self.run_blocking(rasterize_page, pdf_path, page_number, dpi, self._poppler_timeout())
+        except TimeoutError:
+            # Same bound on tail latency as OCR timeouts: one more try at reduced resolution
+            scale = self.engine_options.get('timeout_fallback_scale')
+            if not scale:
+                raise
+            reduced_dpi = max(1, int(dpi * scale))
+            logger.warning(
+                "pdftoppm timed out; retrying at reduced resolution", extra={"page_number": page_number, "dpi": reduced_dpi}
+            )
+            image = await self.run_blocking(rasterize_page, pdf_path, page_number, reduced_dpi, self._poppler_timeout())
+            dpi, fallback = reduced_dpi, {"reason": "rasterize_timeout", "dpi": reduced_dpi}
+        page = await self._ocr_page(image, page_number, measure=True)
+        page["dpi"] = dpi
+        if fallback is not None:
+            page.setdefault("fallback", fallback)
+
+        # Only pages that came out poorly pay for a second, higher-resolution pass
+        low_confidence = self.engine_options.get('low_confidence', 60)
+        if fallback is None and page.get("confidence") is not None and page["confidence"] < low_confidence:
+            retry_dpi = refine_dpi(dpi, page.get("text_height"), max_dpi)
+            if retry_dpi:
+                logger.debug("Low OCR confidence; re-rasterizing", extra={
+                    "page_number": page_number, "confidence": page["confidence"], "dpi": dpi, "retry_dpi": retry_dpi
+                })
+                try:
+                    image = await self.run_blocking(rasterize_page, pdf_path, page_number, retry_dpi, self._poppler_timeout())
+                except TimeoutError:
+                    # The first pass already has a usable page
+                    logger.warning("pdftoppm timed out on the high-resolution pass", extra={"page_number": page_number})
+                    return page
+                retry = await self._ocr_page(image, page_number, measure=True)
+                retry["dpi"] = retry_dpi
+                retry["processing_time"] += page["processing_time"]
+                if (retry.get("confidence") or 0) > page["confidence"]:
+                    page = retry
+        return page
+
+    def _poppler_timeout(self) -> Optional[float]:
+        # Rendering a page at high DPI can take longer than OCRing it, so poppler gets a multiple of the page timeout
+        timeout = self.engine_options.get('timeout')
+        return timeout * self.engine_options.get('poppler_timeout_scale', 2.0) if timeout else None
+
+    async def _ocr_page_and_release(self, frame: "Image.Image", page_number: int, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        try:
+            return await self._ocr_page(frame, page_number)
+        finally:
+            semaphore.release()
+
+    async def _ocr_page(self, image: "Image.Image", page_number: int, measure: bool = False) -> Dict[str, Any]:
+        start_time = datetime.now()
+        page = {"page_number": page_number}
+        if self.engine_options.get('blank_detection', False):
+            # Separator pages and blank back sides of duplex scans never reach Tesseract
+            classification = await self.run_blocking(classify_page, image, self.engine_options)
+            if classification["blank"]:
+                logger.debug("Skipping blank page", extra={"page_number": page_number, **classification})
+                page.update({"text": "", "skipped": "blank"})
+                page["processing_time"] = (datetime.now() - start_time).total_seconds()
+                return page
+        try:
+            page.update(await self._recognize_page(image, measure))
+        except TimeoutError:
+            # Bound tail latency: retry once on a reduced-resolution copy of the page
+            scale = self.engine_options.get('timeout_fallback_scale')
+            if not scale:
+                raise
+            factor = max(2, round(1 / scale))
+            logger.warning(
+                "Tesseract timed out; retrying at reduced resolution", extra={"page_number": page_number, "reduce_factor": factor}
+            )
+            reduced = await self.run_blocking(image.reduce, factor)
+            page.update(await self._recognize_page(reduced, measure))
+            page["fallback"] = {"reason": "timeout", "reduce_factor": factor}
+        page["processing_time"] = (datetime.now() - start_time).total_seconds()
+        return page
+
+    def _detects_language(self) -> bool:
+        return bool(self.engine_options.get('language_detection')) and len(candidate_languages(self.engine_options.get('lang', 'eng'))) > 1
+
+    async def _recognize_page(self, image: "Image.Image", measure: bool = False) -> Dict[str, Any]:
+        if not self._detects_language():
+            return await self._recognize(image, measure)
+
+        # Loading every model of 'eng+deu+fra+...' slows each call down; OCR with one language
+        # instead, narrowed to the page's script by OSD and checked against the recognized text
+        import pytesseract
+        candidates = candidate_languages(self.engine_options.get('lang', 'eng'))
+        if spans_several_scripts(candidates):
+            try:
+                osd = await self._run_tesseract(
+                    pytesseract.image_to_osd, osd_image(image), lang='osd', config='--psm 0',
+                    output_type=pytesseract.Output.DICT
+                )
+                script, script_confidence = parse_osd(osd)
+            except (pytesseract.TesseractError, TimeoutError) as e:
+                # No osd.traineddata, or too little text for OSD to decide
+                logger.debug("Script detection failed: %s", e)
+                script, script_confidence = None, 0.0
+            if script_confidence >= self.engine_options.get('min_script_confidence', 1.0):
+                candidates = languages_for_script(script, candidates)
+
+        hint = _document_language.get()
+        hint = hint if hint is not None else {}
+        lang = hint.get("lang") if hint.get("lang") in candidates else candidates[0]
+        result = await self._recognize(image, measure, lang)
+        if len(candidates) > 1:
+            detected = guess_language(result["text"], candidates)
+            if detected is not None and detected != lang:
+                logger.debug("Page language differs from first guess; re-running", extra={"lang": lang, "detected": detected})
+                lang = detected
+                result = await self._recognize(image, measure, lang)
+            if detected is not None:
+                hint["lang"] = detected
+        result["lang"] = lang
+        return result
+
+    async def _recognize(self, image: "Image.Image", measure: bool = False, lang: Optional[str] = None) -> Dict[str, Any]:
+        # measure=True also returns word confidence and text height, at the cost of rebuilding text from words
+        import pytesseract
+        tile_size = self.engine_options.get('tile_size')
+        if tile_size and max(image.size) > tile_size * 1.5:
+            return await self._recognize_tiled(image, tile_size, lang)
+        word_confidences = self.engine_options.get('word_confidences', False)
+        if measure or word_confidences:
+            data = await self._run_tesseract(pytesseract.image_to_data, image, lang=lang, output_type=pytesseract.Output.DICT)
+            return summarize_words(data, include_words=word_confidences)
+        return {"text": await self._run_tesseract(pytesseract.image_to_string, image, lang=lang)}
+
+    async def _recognize_tiled(self, image: "Image.Image", tile_size: int, lang: Optional[str] = None) -> Dict[str, Any]:
+        # Huge single pages (drawings, newspapers) are split into overlapping tiles OCRed in parallel,
+        # then stitched back with words seen by two tiles de-duplicated
+        import pytesseract
+        overlap = self.engine_options.get('tile_overlap', 200)
+        tiles = plan_tiles(image.width, image.height, tile_size, overlap)
+        semaphore = asyncio.Semaphore(max(1, self.engine_options.get('tile_concurrency') or os.cpu_count() or 4))
+
+        async def ocr_tile(tile) -> Dict[str, Any]:
+            async with semaphore:
+                region = image.crop((tile.left, tile.top, tile.right, tile.bottom))
+                return await self._run_tesseract(
+                    pytesseract.image_to_data, region, lang=lang, output_type=pytesseract.Output.DICT
+                )
+
+        tasks = [asyncio.create_task(ocr_tile(tile)) for tile in tiles]
+        try:
+            tile_data = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        result = stitch_tiles(
+            tiles, tile_data, image.width, image.height, overlap, self.engine_options.get('word_confidences', False)
+        )
+        result["tiles"] = len(tiles)
+        return result
+
+    async def _run_tesseract(self, function, image: "Image.Image", pages: int = 1, lang: Optional[str] = None,
+                             config: Optional[str] = None, **kwargs) -> Any:
+        # pytesseract kills the tesseract subprocess itself when the timeout expires
+        timeout = (self.engine_options.get('timeout') or 0) * pages
+        try:
+            return await self.run_blocking(
+                function,
+                image,
+                lang=lang or self.engine_options.get('lang', 'eng'),
+                config=config or self.engine_options.get('config', '--psm 1'),
+                timeout=timeout,
+                **kwargs
+            )
+        except RuntimeError as e:
+            if timeout and 'timeout' in str(e).lower():
+                raise TimeoutError(str(e))
+            raise
+
     async def parse_results(self, raw_results: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            text = raw_results["raw_result"]
-            
+            pages = []
+            for raw_page in raw_results["pages"]:
+                page = {
+                    "page_number": raw_page["page_number"],
+                    "text": raw_page["text"],
+                    "confidence": raw_page.get("confidence"),
+                }
+                for key in ("source", "dpi", "tiles", "skipped", "fallback", "lang", "words"):
+                    if raw_page.get(key):
+                        page[key] = raw_page[key]
+                pages.append(page)
+
             result = {
-                "text": text,
+                # Pages are separated by form feeds, as Tesseract does for multi-page input
+                "text": "\f".join(page["text"] for page in pages),
                 "confidence": None,  # Tesseract doesn't provide overall confidence for image_to_string
-                "pages": [
-                    {
-                        "page_number": 1,
-                        "text": text,
-                        "confidence": None,
-                    }
-                ],
+                "pages": pages,
                 "metadata": {
                     "engine_name": self.name,
                     "tesseract_version": self.tesseract_version,  # This is now a string
@@ -79,11 +407,11 @@ class TesseractEngine(OCREngine):
                     "lang": self.engine_options.get('lang', 'eng'),
                 }
             }
+            if raw_results.get("batch_size"):
+                result["metadata"]["batch_size"] = raw_results["batch_size"]
 
-            self.health_queue.append(True)
             return result
         except Exception as e:
-            self.health_queue.append(False)
             raise OCREngineError(f"Failed to parse Tesseract results: {str(e)}", "OCR Engine", "error")
 
     def get_engine_name(self) -> str:
@@ -93,13 +421,10 @@ class TesseractEngine(OCREngine):
         return self.supported_file_types
 
     def get_engine_health(self) -> str:
-        if not self.health_queue:
-            return "YELLOW"  # No operations performed yet
-        
-        success_rate = sum(self.health_queue) / len(self.health_queue)
-        if success_rate == 1.0 and len(self.health_queue) == self.health_queue.maxlen:
-            return "GREEN"
-        elif success_rate >= 0.7:
-            return "YELLOW"
-        else:
-            return "RED"
+        return self.health_tracker.get_status()
+
+
+def _load_frame(image: "Image.Image", frame_index: int) -> "Image.Image":
+    # Frames are loaded one at a time by the caller, so the shared image is never seeked concurrently
+    image.seek(frame_index)
+    return image.copy()
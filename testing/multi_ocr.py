@@ -1,15 +1,19 @@
 import os
 import argparse
+import importlib
 from file_processor import FileProcessor
-from tesseract_processor import TesseractProcessor
-from google_vision_processor import GoogleVisionProcessor
 
-# Available OCR engines
+# Available OCR engines as (module, class); only the selected ones are imported,
+# so a Tesseract-only run never loads the Google Cloud SDK
 available_engines = {
-    'tesseract': TesseractProcessor,
-    'google_vision': GoogleVisionProcessor
+    'tesseract': ('tesseract_processor', 'TesseractProcessor'),
+    'google_vision': ('google_vision_processor', 'GoogleVisionProcessor')
 }
 
+def load_engine_class(engine_name):
+    module_name, class_name = available_engines[engine_name]
+    return getattr(importlib.import_module(module_name), class_name)
+
 def parse_engines(args):
     """
     Parse the engine flags to determine which OCR engines to use.
@@ -52,10 +56,10 @@ if __name__ == "__main__":
     # Process files with each selected OCR engine
     for engine_name in selected_engines:
         if engine_name == 'tesseract':
-            ocr_engine = TesseractProcessor(output_dir=args.output, debug=args.debug)
+            ocr_engine = load_engine_class(engine_name)(output_dir=args.output, debug=args.debug)
             convert_pdf = True  # Tesseract needs PDF conversion
         elif engine_name == 'google_vision':
-            ocr_engine = GoogleVisionProcessor(output_dir=args.output, debug=args.debug)
+            ocr_engine = load_engine_class(engine_name)(output_dir=args.output, debug=args.debug)
             convert_pdf = False  # Google Vision does not need PDF conversion
 
         print(f"Using {engine_name} engine...")
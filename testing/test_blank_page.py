@@ -0,0 +1,46 @@
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from blank_page import classify_page
+
+A4_300_DPI = (2480, 3508)
+
+
+def _page_with_line(width: int, text_height: int = 42) -> Image.Image:
+    # Glyph-like strokes along one short line, the way a "Page intentionally left blank" sheet looks
+    image = Image.new('L', A4_300_DPI, 255)
+    draw = ImageDraw.Draw(image)
+    top = A4_300_DPI[1] // 2
+    for left in range(401, 401 + width, 20):
+        draw.rectangle([left, top, left + 4, top + text_height - 1], fill=0)
+    return image
+
+
+@pytest.mark.parametrize("width", [150, 300, 400])
+def test_single_line_page_is_not_blank(width):
+    classification = classify_page(_page_with_line(width), {})
+    # The whole-page ink ratio of such a page is well below 0.1%
+    assert classification["ink_ratio"] < 0.001
+    assert not classification["blank"]
+
+
+def test_empty_page_is_blank():
+    assert classify_page(Image.new('L', A4_300_DPI, 245), {})["blank"]
+
+
+def test_dusty_scan_is_blank():
+    image = Image.new('L', A4_300_DPI, 235)
+    draw = ImageDraw.Draw(image)
+    rng = random.Random(7)
+    for _ in range(400):
+        x, y = rng.randrange(A4_300_DPI[0]), rng.randrange(A4_300_DPI[1])
+        draw.ellipse([x, y, x + 6, y + 6], fill=40)
+    assert classify_page(image, {})["blank"]
+
+
+def test_dark_margins_are_ignored():
+    image = Image.new('L', A4_300_DPI, 250)
+    ImageDraw.Draw(image).rectangle([0, 0, 60, A4_300_DPI[1]], fill=0)
+    assert classify_page(image, {})["blank"]
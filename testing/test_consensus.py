@@ -0,0 +1,76 @@
+from consensus import CONSENSUS_KEY, Token, align, build_consensus
+from pdf_rasterizer import summarize_words
+
+
+def _result(text, confidence=90.0, words=None):
+    page = {"page_number": 1, "text": text, "confidence": confidence}
+    if words is not None:
+        page["words"] = words
+    return {"text": text, "confidence": confidence, "pages": [page]}
+
+
+def test_majority_fixes_a_misread_word():
+    results = {
+        "a": _result("The quick brown fox"),
+        "b": _result("The quick hrown fox"),
+        "c": _result("The quick brown fox"),
+    }
+    consensus = build_consensus(results)
+    assert consensus["text"] == "The quick brown fox"
+    assert consensus["metadata"]["engines"] == ["a", "b", "c"]
+    assert consensus["pages"][0]["agreement"] == 0.75
+
+
+def test_spurious_insertion_and_deletion_are_outvoted():
+    results = {
+        "a": _result("invoice total due"),
+        "b": _result("invoice ~ total due"),
+        "c": _result("invoice total"),
+    }
+    assert build_consensus(results)["text"] == "invoice total due"
+
+
+def test_word_confidences_decide_a_two_way_split():
+    def words(text, confidences):
+        return [{"text": word, "confidence": confidence} for word, confidence in zip(text.split(), confidences)]
+
+    results = {
+        "a": _result("pay 100 now", 80.0, words("pay 100 now", [95, 30, 95])),
+        "b": _result("pay 700 now", 80.0, words("pay 700 now", [95, 90, 95])),
+    }
+    assert build_consensus(results)["text"] == "pay 700 now"
+
+
+def test_line_breaks_follow_the_pivot():
+    results = {"a": _result("first line\nsecond line"), "b": _result("first line second line", 50.0)}
+    assert build_consensus(results)["text"] == "first line\nsecond line"
+
+
+def test_needs_two_successful_engines():
+    assert build_consensus({"a": _result("text"), "b": {"error": "crashed"}}) is None
+    previous = build_consensus({"a": _result("x y"), "b": _result("x y")})
+    # An earlier consensus in the results is never voted on
+    assert build_consensus({"a": _result("x y"), "b": {"error": "crashed"}, CONSENSUS_KEY: previous}) is None
+
+
+def test_alignment_of_long_documents_is_exact_on_identical_text():
+    tokens = [Token(f"w{index % 97}", 0.9) for index in range(5000)]
+    pairs = align(tokens, tokens)
+    assert pairs == [(index, index) for index in range(5000)]
+
+
+def test_alignment_marks_gaps():
+    a = [Token(word, 0.9) for word in "a b c d".split()]
+    b = [Token(word, 0.9) for word in "a c d e".split()]
+    assert align(a, b) == [(0, 0), (1, None), (2, 1), (3, 2), (None, 3)]
+
+
+def test_summarize_words_returns_every_word():
+    data = {
+        "text": ["Hello", "world", "", "again"], "conf": [91, 85, -1, 70],
+        "left": [0, 60, 0, 0], "top": [0, 0, 0, 40], "width": [50, 50, 0, 50], "height": [20, 20, 0, 20],
+        "block_num": [1, 1, 1, 1], "par_num": [1, 1, 1, 1], "line_num": [1, 1, 1, 2],
+    }
+    summary = summarize_words(data, include_words=True)
+    assert summary["text"] == "Hello world\nagain"
+    assert [(word["text"], word["confidence"]) for word in summary["words"]] == [("Hello", 91), ("world", 85), ("again", 70)]
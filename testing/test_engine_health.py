@@ -0,0 +1,151 @@
+import asyncio
+
+from engine_health import AdaptiveLimiter, EngineHealthTracker, MemoryBudget
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _record(tracker, clock, at, successes=0, failures=0):
+    clock.now = at
+    for _ in range(successes):
+        tracker.record(True, 0.5)
+    for _ in range(failures):
+        tracker.record(False, 0.5)
+
+
+def test_records_are_bucketed_by_time():
+    clock = _Clock()
+    tracker = EngineHealthTracker(bucket_seconds=10, clock=clock)
+    _record(tracker, clock, 1000.0, successes=2)
+    _record(tracker, clock, 1009.9, failures=1)
+    _record(tracker, clock, 1012.0, successes=1)
+
+    assert [bucket.start for bucket in tracker.buckets] == [1000.0, 1010.0]
+    assert [(bucket.successes, bucket.failures) for bucket in tracker.buckets] == [(2, 1), (1, 0)]
+    assert tracker.counts(60) == {"requests": 4, "successes": 3, "failures": 1, "timeouts": 0}
+
+
+def test_windows_only_count_recent_buckets():
+    clock = _Clock()
+    tracker = EngineHealthTracker(bucket_seconds=10, clock=clock)
+    _record(tracker, clock, 1000.0, failures=3)
+    _record(tracker, clock, 1050.0, successes=2)
+
+    clock.now = 1075.0
+    # The 1000-1010 bucket ended more than a minute ago; the 5 minute window still sees it
+    assert tracker.counts(60)["requests"] == 2
+    assert tracker.counts(300)["requests"] == 5
+
+
+def test_buckets_older_than_the_horizon_expire():
+    clock = _Clock()
+    tracker = EngineHealthTracker(bucket_seconds=10, horizon_seconds=900, clock=clock)
+    _record(tracker, clock, 1000.0, successes=5)
+    _record(tracker, clock, 1500.0, successes=1)
+    assert len(tracker.buckets) == 2
+
+    _record(tracker, clock, 1920.0, successes=1)
+    assert [bucket.start for bucket in tracker.buckets] == [1500.0, 1920.0]
+    assert tracker.counts(900)["requests"] == 2
+
+
+def test_limiter_shrinks_with_failures_and_grows_back():
+    clock = _Clock()
+    tracker = EngineHealthTracker(bucket_seconds=10, clock=clock)
+    limiter = AdaptiveLimiter(tracker, max_concurrency=4, min_concurrency=1, window_seconds=60, min_samples=5)
+
+    _record(tracker, clock, 1000.0, successes=3)
+    # Too few samples to judge yet
+    assert limiter.limit == 4
+
+    _record(tracker, clock, 1001.0, successes=6, failures=3)
+    assert limiter.limit == 2  # 75% success rate halves the limit
+
+    _record(tracker, clock, 1002.0, failures=20)
+    assert limiter.limit == 1
+
+    # Once the failures age out of the window, healthy calls restore full concurrency
+    _record(tracker, clock, 1100.0, successes=10)
+    assert limiter.limit == 4
+
+
+def test_limiter_blocks_at_the_limit():
+    async def scenario():
+        clock = _Clock()
+        tracker = EngineHealthTracker(bucket_seconds=10, clock=clock)
+        _record(tracker, clock, 1000.0, successes=6, failures=2)
+        limiter = AdaptiveLimiter(tracker, max_concurrency=4, min_samples=5)
+        assert limiter.limit == 2
+
+        await limiter.acquire()
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 2
+
+    asyncio.run(scenario())
+
+
+def test_memory_budget_blocks_until_released():
+    async def scenario():
+        budget = MemoryBudget(100)
+        await budget.reserve(60)
+        waiter = asyncio.create_task(budget.reserve(60))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        assert budget.reserved_mb == 60
+
+        await budget.release(60)
+        await asyncio.wait_for(waiter, 1)
+        assert budget.reserved_mb == 60
+
+        await budget.release(60)
+        assert budget.reserved_mb == 0
+
+    asyncio.run(scenario())
+
+
+def test_memory_budget_runs_oversized_calls_alone():
+    async def scenario():
+        budget = MemoryBudget(100)
+        await budget.reserve(500)
+        assert budget.reserved_mb == 100
+        waiter = asyncio.create_task(budget.reserve(1))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await budget.release(500)
+        await asyncio.wait_for(waiter, 1)
+        assert budget.reserved_mb == 1
+
+    asyncio.run(scenario())
+
+
+def test_limiter_reserves_from_the_shared_budget():
+    async def scenario():
+        budget = MemoryBudget(100)
+        first = AdaptiveLimiter(EngineHealthTracker(), 4, memory_budget=budget, memory_per_call_mb=70)
+        second = AdaptiveLimiter(EngineHealthTracker(), 4, memory_budget=budget, memory_per_call_mb=50)
+
+        await first.acquire()
+        waiter = asyncio.create_task(second.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await first.release()
+        await asyncio.wait_for(waiter, 1)
+        assert budget.reserved_mb == 50
+        await second.release()
+        assert budget.reserved_mb == 0 and first.in_flight == second.in_flight == 0
+
+    asyncio.run(scenario())
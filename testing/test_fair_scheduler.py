@@ -0,0 +1,64 @@
+import pytest
+
+from fair_scheduler import InputSource, WeightedFairQueue, make_names_unique
+
+
+def _drain(queue):
+    order = []
+    while not queue.empty():
+        source, _ = queue.get_nowait()
+        order.append(source.name)
+    return order
+
+
+def test_weights_share_the_queue_proportionally():
+    queue = WeightedFairQueue()
+    queue.add_source(InputSource("heavy", weight=3), list(range(30)))
+    queue.add_source(InputSource("light", weight=1), list(range(30)))
+    first = _drain(queue)[:20]
+    assert first.count("heavy") == 15
+    assert first.count("light") == 5
+
+
+def test_higher_priority_is_drained_first():
+    queue = WeightedFairQueue()
+    queue.add_source(InputSource("bulk", weight=10), list(range(5)))
+    queue.add_source(InputSource("urgent", priority=1), list(range(3)))
+    assert _drain(queue) == ["urgent"] * 3 + ["bulk"] * 5
+
+
+def test_idle_source_does_not_bank_credit():
+    queue = WeightedFairQueue()
+    busy = InputSource("busy")
+    queue.add_source(busy, list(range(10)))
+    for _ in range(6):
+        queue.get_nowait()
+    # A source arriving late competes from the current virtual time, not from zero
+    queue.add_source(InputSource("late"), list(range(10)))
+    assert _drain(queue)[:4] in (["late", "busy", "late", "busy"], ["busy", "late", "busy", "late"])
+
+
+def test_items_keep_their_order_within_a_source():
+    queue = WeightedFairQueue()
+    queue.add_source(InputSource("a"), ["a1", "a2", "a3"])
+    queue.add_source(InputSource("b", weight=2), ["b1", "b2"])
+    items = [item for _, item in (queue.get_nowait() for _ in range(len(queue)))]
+    assert [item for item in items if item.startswith("a")] == ["a1", "a2", "a3"]
+    assert [item for item in items if item.startswith("b")] == ["b1", "b2"]
+
+
+def test_same_basename_gets_unique_default_names():
+    sources = [InputSource.parse(spec) for spec in ("/tmp/wfq/a/inbox", "/tmp/wfq/b/inbox@2", "/tmp/wfq/c/outbox")]
+    make_names_unique(sources)
+    assert [source.name for source in sources] == ["a/inbox", "b/inbox", "outbox"]
+    queue = WeightedFairQueue()
+    for source in sources:
+        queue.add_source(source, ["x"])
+    assert len(queue) == 3
+
+
+def test_explicit_duplicate_names_are_rejected():
+    queue = WeightedFairQueue()
+    queue.add_source(InputSource("/a/inbox", name="inbox"), ["x"])
+    with pytest.raises(ValueError):
+        queue.add_source(InputSource("/b/inbox", name="inbox"), ["y"])
@@ -0,0 +1,50 @@
+from page_tiling import plan_tiles, stitch_tiles
+
+WIDTH, HEIGHT, TILE_SIZE, OVERLAP = 1000, 100, 600, 200
+
+
+def _tile_data(tile, words):
+    """image_to_data(output_type=DICT) of a tile holding (text, confidence, left, right) words on one line, in page coordinates."""
+    data = {key: [] for key in ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")}
+    for text, confidence, left, right in words:
+        left, right = max(left, tile.left), min(right, tile.right)
+        data["text"].append(text)
+        data["conf"].append(confidence)
+        data["left"].append(left - tile.left)
+        data["top"].append(40)
+        data["width"].append(right - left)
+        data["height"].append(30)
+        for key in ("block_num", "par_num", "line_num"):
+            data[key].append(1)
+    return data
+
+
+def _stitch(first_tile_words, second_tile_words, include_words=True):
+    tiles = plan_tiles(WIDTH, HEIGHT, TILE_SIZE, OVERLAP)
+    assert [(tile.left, tile.right) for tile in tiles] == [(0, 600), (400, 1000)]
+    data = [_tile_data(tiles[0], first_tile_words), _tile_data(tiles[1], second_tile_words)]
+    return stitch_tiles(tiles, data, WIDTH, HEIGHT, OVERLAP, include_words)
+
+
+def test_word_in_overlap_is_kept_once():
+    result = _stitch([("The", 90, 100, 200), ("Times", 90, 450, 550)], [("Times", 80, 450, 550), ("today", 90, 580, 680)])
+    assert result["text"] == "The Times today"
+
+
+def test_word_wider_than_overlap_is_not_lost():
+    # "Herald" spans 350-650: each tile sees a clipped piece, neither sees it whole
+    result = _stitch([("The", 90, 100, 200), ("Heral", 70, 350, 650)], [("rald", 60, 350, 650), ("News", 90, 660, 760)])
+    assert result["text"] == "The Heral News"
+
+
+def test_clipped_word_gives_way_to_whole_copy():
+    result = _stitch([("Big", 90, 100, 200), ("cu", 40, 560, 640)], [("cut", 95, 560, 640)])
+    assert result["text"].split() == ["Big", "cut"]
+    assert result["words"][1]["width"] == 80
+
+
+def test_words_follow_text_order():
+    result = _stitch([("The", 90, 100, 200), ("Times", 85, 450, 550)], [("Times", 80, 450, 550), ("today", 70, 580, 680)])
+    assert [word["text"] for word in result["words"]] == result["text"].split()
+    assert [word["confidence"] for word in result["words"]] == [90, 85, 70]
+    assert "words" not in _stitch([("The", 90, 100, 200)], [], include_words=False)
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from ocr_engine import OCREngineError
+from retry_policy import DeadLetterQueue, RetryPolicy
+
+
+def _error(category="OCR Engine", severity="error"):
+    return OCREngineError("engine failed", category, severity)
+
+
+def test_attempts_follow_the_category_rules():
+    policy = RetryPolicy(max_attempts=5)
+    assert policy.attempts_allowed(_error("Input Validation")) == 1
+    assert policy.attempts_allowed(_error("File System")) == 4
+    # Rules are capped by max_attempts, and critical errors get at most one retry
+    assert policy.attempts_allowed(_error("Rate Limit")) == 5
+    assert policy.attempts_allowed(_error("Rate Limit", "critical")) == 2
+    assert policy.attempts_allowed(_error("Unknown category")) == 5
+
+
+def test_backoff_is_exponential_with_full_jitter():
+    random.seed(3)
+    policy = RetryPolicy(max_attempts=6, base_delay=2.0, max_delay=10.0, rules={"OCR Engine": (6, 1.0)})
+    for attempt, ceiling in [(1, 2.0), (2, 4.0), (3, 8.0), (4, 10.0), (5, 10.0)]:
+        delays = [policy.next_delay(_error(), attempt) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        assert max(delays) > ceiling * 0.8
+    assert policy.next_delay(_error(), 6) is None
+
+
+def test_base_delay_scales_category_rules():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.5)
+    assert all(policy.next_delay(_error("Rate Limit"), 1) <= 2.5 for _ in range(100))
+    assert policy.next_delay(_error("Input Validation"), 1) is None
+
+
+def test_run_retries_until_success_and_counts_attempts():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.0)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _error()
+        return "done"
+
+    assert asyncio.run(policy.run(flaky, "flaky")) == "done"
+    assert len(calls) == 3
+
+
+def test_run_gives_up_and_reports_attempts():
+    policy = RetryPolicy(max_attempts=2, base_delay=0.0)
+
+    async def failing():
+        raise _error("Timeout")
+
+    with pytest.raises(OCREngineError) as raised:
+        asyncio.run(policy.run(failing, "failing"))
+    assert raised.value.attempts == 2
+
+
+def test_other_exceptions_are_not_retried():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.0)
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        raise KeyError("bug")
+
+    with pytest.raises(KeyError):
+        asyncio.run(policy.run(broken, "broken"))
+    assert len(calls) == 1
+
+
+def test_dead_letters_round_trip(tmp_path):
+    path = str(tmp_path / "failed_files.jsonl")
+    queue = DeadLetterQueue(path)
+    queue.record("/in/a.png", "/in", {"Tesseract": {"error": "crashed", "category": "OCR Engine"}})
+    queue.record("/in/b.png", "/in", {"file": {"error": "unreadable", "category": "File System"}})
+    queue.record("/in/c.png", "/in", {"Tesseract": {"error": "timeout", "category": "Timeout"}})
+    queue.resolve("/in/b.png")
+    queue.resolve("/in/never-failed.png")
+
+    reloaded = DeadLetterQueue(path)
+    assert sorted(entry["file_path"] for entry in reloaded.pending()) == ["/in/a.png", "/in/c.png"]
+    assert reloaded.entries["/in/a.png"]["errors"]["Tesseract"]["category"] == "OCR Engine"
+    assert reloaded.entries["/in/a.png"]["source_path"] == "/in"
+
+    # A later failure of the same file replaces the earlier entry
+    reloaded.record("/in/a.png", "/in", {"Vision": {"error": "quota", "category": "Rate Limit"}})
+    assert list(DeadLetterQueue(path).entries["/in/a.png"]["errors"]) == ["Vision"]
+
+
+def test_compact_keeps_only_outstanding_entries(tmp_path):
+    path = str(tmp_path / "failed_files.jsonl")
+    queue = DeadLetterQueue(path)
+    for name in ("a", "b", "c"):
+        queue.record(f"/in/{name}.png", "/in", {"file": {"error": "x"}})
+    queue.resolve("/in/a.png")
+    queue.compact()
+    with open(path, encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["file_path"] for line in lines] == ["/in/b.png", "/in/c.png"]
+    assert not any(line.get("resolved") for line in lines)
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    path = tmp_path / "failed_files.jsonl"
+    path.write_text(json.dumps({"file_path": "/in/a.png", "source_path": "/in", "errors": {}}) + "\n{\"file_pa",
+                    encoding='utf-8')
+    assert [entry["file_path"] for entry in DeadLetterQueue(str(path)).pending()] == ["/in/a.png"]
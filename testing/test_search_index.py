@@ -0,0 +1,52 @@
+import pytest
+
+from search_index import SearchIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.db"))
+    yield index
+    index.close()
+
+
+def _result(*page_texts):
+    return {"tesseract": {"pages": [{"page_number": number, "text": text} for number, text in enumerate(page_texts, 1)]}}
+
+
+def _page_count(index):
+    return index.connection.execute("SELECT count(*) FROM pages").fetchone()[0]
+
+
+def _page_map_count(index):
+    return index.connection.execute("SELECT count(*) FROM document_pages").fetchone()[0]
+
+
+def test_reindexing_a_source_replaces_its_pages(index, tmp_path):
+    source = str(tmp_path / "scan.pdf")
+    other = str(tmp_path / "other.pdf")
+    index.add_result(source, _result("quarterly invoice", "payment terms"))
+    index.add_result(other, _result("invoice copy"))
+
+    index.add_result(source, _result("revised receipt"))
+
+    assert index.search("payment") == []
+    assert [match["source_path"] for match in index.search("receipt")] == [source]
+    # The other document's pages are untouched
+    assert [match["source_path"] for match in index.search("invoice")] == [other]
+    assert _page_count(index) == _page_map_count(index) == 2
+
+
+def test_remove_drops_pages_and_page_map_rows(index, tmp_path):
+    source = str(tmp_path / "scan.pdf")
+    other = str(tmp_path / "other.pdf")
+    index.add_result(source, _result("quarterly invoice", "payment terms"))
+    index.add_result(other, _result("invoice copy"))
+
+    index.remove(source)
+
+    assert index.search("payment") == []
+    assert [match["source_path"] for match in index.search("invoice")] == [other]
+    assert _page_count(index) == _page_map_count(index) == 1
+    doc_ids = {row[0] for row in index.connection.execute("SELECT doc_id FROM document_pages")}
+    assert doc_ids == {row[0] for row in index.connection.execute("SELECT doc_id FROM documents")}
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from text_metrics import character_error_rate, levenshtein, word_error_rate
+
+
+def _reference_levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, token in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (token != other)))
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.parametrize("reference, hypothesis, distance", [
+    ("", "", 0),
+    ("", "abc", 3),
+    ("abc", "", 3),
+    ("kitten", "sitting", 3),
+    ("flaw", "lawn", 2),
+    ("same", "same", 0),
+    ("a", "b", 1),
+])
+def test_known_distances(reference, hypothesis, distance):
+    assert levenshtein(reference, hypothesis) == distance
+
+
+def test_matches_the_dynamic_programming_table():
+    rng = random.Random(11)
+    for _ in range(300):
+        # Small alphabets and lengths across the 64-bit boundary exercise the carries in the bit vectors
+        alphabet = "ab" if rng.random() < 0.5 else "abcdefgh"
+        a = "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 140)))
+        b = "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 140)))
+        assert levenshtein(a, b) == _reference_levenshtein(a, b)
+
+
+def test_word_sequences():
+    assert levenshtein("the quick brown fox".split(), "the quack brown".split()) == 2
+
+
+def test_error_rates_ignore_layout_whitespace():
+    assert character_error_rate("hello  world\n", "hello world") == 0.0
+    assert word_error_rate("one two three four", "one too three") == 0.5
+    assert character_error_rate("", "") == 0.0
@@ -0,0 +1,56 @@
+from typing import Hashable, Sequence
+
+
+def levenshtein(reference: Sequence[Hashable], hypothesis: Sequence[Hashable]) -> int:
+    """Edit distance between two token sequences (characters, words, ...).
+
+    Myers/Hyyrö bit-parallel algorithm: each DP column is held as bits of one Python int,
+    so the cost is O(len(hypothesis)) big-int operations instead of a full O(m*n) table.
+    """
+    m = len(reference)
+    if m == 0:
+        return len(hypothesis)
+    match_masks = {}
+    for index, token in enumerate(reference):
+        match_masks[token] = match_masks.get(token, 0) | (1 << index)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    positive, negative, score = mask, 0, m
+    for token in hypothesis:
+        match = match_masks.get(token, 0)
+        vertical = match | negative
+        horizontal = ((((match & positive) + positive) & mask) ^ positive) | match
+        horizontal_positive = negative | (~(horizontal | positive) & mask)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & high:
+            score += 1
+        elif horizontal_negative & high:
+            score -= 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & mask
+        horizontal_negative = (horizontal_negative << 1) & mask
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & mask)
+        negative = horizontal_positive & vertical
+    return score
+
+
+def normalize_text(text: str) -> str:
+    # Layout whitespace (line breaks, column gaps, form feeds) is not an OCR error
+    return " ".join(text.split())
+
+
+def character_errors(reference: str, hypothesis: str) -> int:
+    return levenshtein(normalize_text(reference), normalize_text(hypothesis))
+
+
+def word_errors(reference: str, hypothesis: str) -> int:
+    return levenshtein(reference.split(), hypothesis.split())
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    reference = normalize_text(reference)
+    return levenshtein(reference, normalize_text(hypothesis)) / max(1, len(reference))
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    words = reference.split()
+    return levenshtein(words, hypothesis.split()) / max(1, len(words))